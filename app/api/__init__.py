@@ -1,12 +1,18 @@
 from fastapi import APIRouter
 
+from .analytics import router as analytics_router
 from .composer import router as compose_router
 from .expression_rules import router as expression_rule_router
+from .metrics import router as metrics_router
 from .translation_sessions import router as translation_session_router
+from .user_preferences import router as user_preference_router
 
 api_router = APIRouter()
 api_router.include_router(compose_router)
 api_router.include_router(expression_rule_router)
 api_router.include_router(translation_session_router)
+api_router.include_router(user_preference_router)
+api_router.include_router(analytics_router)
+api_router.include_router(metrics_router)
 
 __all__ = ["api_router"]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.models.analytics import SessionAnalyticsGroup, SessionAnalyticsRead
+
+if TYPE_CHECKING:
+    from app.db import SessionAnalyticsRepository
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+def _service() -> SessionAnalyticsRepository:
+    # Imported on first use so mysql.connector stays off the cold-start import path.
+    from app.db import session_analytics_repository
+
+    return session_analytics_repository(read_replica=True)
+
+
+@router.get("/sessions", response_model=SessionAnalyticsRead)
+def session_analytics(
+    group_by: List[Literal["emotion", "intent", "user"]] = Query(
+        ["emotion"], description="Dimensions to group by; repeat the parameter for several"
+    ),
+    bucket: Optional[Literal["hour", "day"]] = Query(None, description="Also group by creation hour or day (UTC)"),
+    user_id: Optional[str] = Query(None, description="Only sessions of this user"),
+    detected_emotion: Optional[str] = Query(None, description="Filter by detected emotion"),
+    detected_intent: Optional[str] = Query(None, description="Filter by detected intent"),
+    start: Optional[datetime] = Query(None, description="Sessions created from this hour on (UTC)"),
+    end: Optional[datetime] = Query(None, description="Sessions created before this hour (UTC)"),
+):
+    """Session counts and average compose confidence, served from the hourly rollup table."""
+    dimensions = list(dict.fromkeys(group_by))
+    service = _service()
+    try:
+        rows = service.distribution(
+            dimensions,
+            bucket=bucket,
+            user_id=user_id,
+            detected_emotion=detected_emotion,
+            detected_intent=detected_intent,
+            start=start,
+            end=end,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+    finally:
+        service.close_connection()
+
+    groups = [SessionAnalyticsGroup(**row) for row in rows]
+    return SessionAnalyticsRead(
+        group_by=dimensions,
+        bucket=bucket,
+        total_sessions=sum(group.session_count for group in groups),
+        groups=groups,
+    )
@@ -1,23 +1,69 @@
 from __future__ import annotations
 
 import logging
+import math
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
 
+from app.api.wire import MSGPACK_RESPONSE, WireRoute, respond
+from app.core.resources import get_resources
 from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+from app.services.admission import AdmissionRejected
 from app.services.composer import SentenceComposer
+from app.services.deadline import (
+    DEADLINE_HEADER,
+    ClientDisconnectedError,
+    ComposeDeadlineExceeded,
+    Deadline,
+    cancel_on_disconnect,
+)
+from app.services.resilience import CircuitOpenError, UpstreamTimeoutError
 
-router = APIRouter(prefix="/compose", tags=["Compose"])
+router = APIRouter(prefix="/compose", tags=["Compose"], route_class=WireRoute)
 logger = logging.getLogger(__name__)
 
 
-@router.post("/sentence", response_model=ComposeSentenceResponse, status_code=200)
-def compose_sentence(request: ComposeSentenceRequest):
+@router.post("/sentence", response_model=ComposeSentenceResponse, status_code=200, responses={200: MSGPACK_RESPONSE})
+async def compose_sentence(
+    request: ComposeSentenceRequest,
+    raw_request: Request,
+    x_compose_deadline_ms: int | None = Header(default=None, alias=DEADLINE_HEADER),
+    x_user_id: str | None = Header(default=None, alias="X-User-Id"),
+):
+    deadline = Deadline.resolve(x_compose_deadline_ms, request.deadline_ms)
+    resources = get_resources()
+    # Standalone calls have no session; bound them per user, or per client address as a fallback.
+    if x_user_id:
+        admission_key = ("user", x_user_id)
+    else:
+        admission_key = ("client", raw_request.client.host if raw_request.client else "unknown")
     try:
         logger.info("Standalone compose request | glosses=%s | letters=%s | context=%s", request.glosses, request.letters, request.context)
-        response = SentenceComposer().compose(request)
+        async with resources.inflight.track():
+            composer = SentenceComposer(api_key=request.openai_api_key, model=request.openai_model)
+            max_wait = deadline.remaining() if deadline is not None else None
+            async with resources.admission.admit([admission_key], max_wait=max_wait):
+                response = await cancel_on_disconnect(
+                    composer.compose_async(request, deadline=deadline, flow=":".join(admission_key)),
+                    raw_request.is_disconnected,
+                )
         logger.info("Standalone compose result | text=%s", response.text)
-        return response
+        return respond(raw_request, response)
+    except ClientDisconnectedError as exc:
+        logger.info("Standalone compose cancelled | %s", exc)
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
+    except ComposeDeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=exc.to_detail()) from exc
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except UpstreamTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     except Exception as exc:
@@ -0,0 +1,68 @@
+"""Read-your-writes with read replicas, carried by the client instead of the worker.
+
+Routers built with ``route_class=ReadYourWritesRoute`` answer every successful write with the time
+it was made, as the ``X-Last-Write`` header and a ``last_write`` cookie (seconds since the epoch).
+Reads that send either back are kept off replicas that have not replayed that far (see
+app.db.base.ReplicaRouter), whichever worker serves them. Clients without a cookie jar echo the
+header. The stamp only matters for DB_READ_YOUR_WRITES_SECONDS, so the cookie expires then.
+
+Worker clocks are compared with each other, so hosts need synchronised clocks (NTP).
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Callable, Coroutine, Optional
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import get_settings
+
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def client_last_write(request: Request) -> Optional[float]:
+    """When the client last wrote, from the header or the cookie; None if absent or malformed."""
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not value:
+        return None
+    try:
+        written = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(written):
+        return None
+    # A stamp from the future (clock skew, or a forged one) counts as now, not as "forever".
+    return min(written, time.time())
+
+
+def stamp_write(response: Response, written: Optional[float] = None) -> None:
+    """Tell the client when it last wrote, so its next reads can avoid lagging replicas."""
+    settings = get_settings()
+    value = f"{time.time() if written is None else written:.3f}"
+    response.headers[LAST_WRITE_HEADER] = value
+    response.set_cookie(
+        LAST_WRITE_COOKIE, value, max_age=math.ceil(settings.read_your_writes_seconds), httponly=True, samesite="lax"
+    )
+
+
+class ReadYourWritesRoute(APIRoute):
+    """APIRoute that stamps successful non-read responses with the time of the write (see module docstring)."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        if not get_settings().db_replicas:
+            return handler
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            if request.method not in _READ_METHODS and response.status_code < 400:
+                stamp_write(response)
+            return response
+
+        return route_handler
@@ -1,29 +1,42 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Request
 
-from app.db import ExpressionRuleMySQLService
+from app.api.consistency import ReadYourWritesRoute, client_last_write
+from app.core.resources import get_resources
 from app.models.expression_rule import (
     ExpressionRuleCreate,
     ExpressionRuleRead,
     ExpressionRuleUpdate,
 )
 
-router = APIRouter(prefix="/expression_rules", tags=["ExpressionRule"])
+if TYPE_CHECKING:
+    from app.db import ExpressionRuleRepository
 
+router = APIRouter(prefix="/expression_rules", tags=["ExpressionRule"], route_class=ReadYourWritesRoute)
 
-def _service() -> ExpressionRuleMySQLService:
-    return ExpressionRuleMySQLService()
+
+def _service(read_replica: bool = False, last_write: Optional[float] = None) -> ExpressionRuleRepository:
+    # Imported on first use so mysql.connector stays off the cold-start import path.
+    from app.db import expression_rule_repository
+
+    return expression_rule_repository(read_replica=read_replica, last_write=last_write)
+
+
+def _invalidate_rule_cache() -> None:
+    get_resources().rule_cache.invalidate()
 
 
 @router.post("", response_model=ExpressionRuleRead, status_code=201)
 def create_expression_rule(rule: ExpressionRuleCreate):
     service = _service()
     try:
-        return service.create(rule)
+        created = service.create(rule)
+        _invalidate_rule_cache()
+        return created
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
     finally:
@@ -32,10 +45,11 @@ def create_expression_rule(rule: ExpressionRuleCreate):
 
 @router.get("", response_model=List[ExpressionRuleRead])
 def list_expression_rules(
+    request: Request,
     emotion: Optional[str] = Query(None, description="Filter by emotion"),
     intent: Optional[str] = Query(None, description="Filter by intent"),
 ):
-    service = _service()
+    service = _service(read_replica=True, last_write=client_last_write(request))
     try:
         return service.list(emotion=emotion, intent=intent)
     except Exception as exc:
@@ -45,8 +59,8 @@ def list_expression_rules(
 
 
 @router.get("/{rule_id}", response_model=ExpressionRuleRead)
-def get_expression_rule(rule_id: UUID = Path(..., description="ID of the rule to retrieve")):
-    service = _service()
+def get_expression_rule(request: Request, rule_id: UUID = Path(..., description="ID of the rule to retrieve")):
+    service = _service(read_replica=True, last_write=client_last_write(request))
     try:
         record = service.get(rule_id)
         if not record:
@@ -67,6 +81,7 @@ def update_expression_rule(rule_id: UUID, update: ExpressionRuleUpdate):
         updated = service.update(rule_id, update)
         if not updated:
             raise HTTPException(status_code=404, detail="ExpressionRule not found")
+        _invalidate_rule_cache()
         return updated
     except HTTPException:
         raise
@@ -83,6 +98,7 @@ def delete_expression_rule(rule_id: UUID):
         deleted = service.delete(rule_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="ExpressionRule not found")
+        _invalidate_rule_cache()
         return {"message": "ExpressionRule deleted successfully."}
     except HTTPException:
         raise
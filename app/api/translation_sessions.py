@@ -1,65 +1,309 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
+import asyncio
 import logging
+import math
+from contextlib import asynccontextmanager, contextmanager
 
-from fastapi import APIRouter, HTTPException, Header, Path, Query
+import anyio
+from fastapi import APIRouter, HTTPException, Header, Path, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 
-from app.db import TranslationSessionMySQLService
+from app.core.config import get_settings
+from app.api.consistency import ReadYourWritesRoute, client_last_write
+from app.api.wire import MSGPACK_RESPONSE, WireRoute, respond, wants_msgpack
+from app.core.resources import get_resources
 from app.models.translation_session import (
+    GlossStreamChunk,
+    GlossStreamStatus,
+    SessionView,
+    TranslationSessionBatchComposeRequest,
+    TranslationSessionBatchComposeResponse,
+    TranslationSessionBatchComposeResult,
     TranslationSessionComposeRequest,
     TranslationSessionCreate,
+    TranslationSessionMinimal,
     TranslationSessionRead,
+    TranslationSessionSearchHit,
+    TranslationSessionSearchPage,
     TranslationSessionUpdate,
 )
+from app.services.admission import AdmissionRejected
+from app.services.deadline import (
+    DEADLINE_HEADER,
+    ClientDisconnectedError,
+    ComposeDeadlineExceeded,
+    Deadline,
+    cancel_on_disconnect,
+)
+from app.services.idempotency import (
+    IDEMPOTENCY_HEADER,
+    MAX_KEY_LENGTH,
+    REPLAYED_HEADER,
+    IdempotencyConflict,
+    IdempotencyKeyReused,
+    IdempotentCall,
+    StoredResponse,
+    request_fingerprint,
+)
+from app.services.resilience import CircuitOpenError, UpstreamTimeoutError
+from app.services.retention import SessionArchive, SessionArchiver
+from app.services.search import decode_cursor, encode_cursor, snippets
+from app.services.summarizer import SummaryQueueFull
 from app.services.translation import TranslationSessionManager
 
-router = APIRouter(prefix="/translation_sessions", tags=["TranslationSession"])
+if TYPE_CHECKING:
+    from app.db import TranslationSessionRepository
+
+
+class SessionRoute(WireRoute, ReadYourWritesRoute):
+    """MessagePack bodies, and the write stamp for read-your-writes."""
+
+
+router = APIRouter(prefix="/translation_sessions", tags=["TranslationSession"], route_class=SessionRoute)
 logger = logging.getLogger(__name__)
 
+VIEW_DESCRIPTION = "`minimal` returns only text, tone and confidence instead of the full session"
 
-def _service() -> TranslationSessionMySQLService:
-    return TranslationSessionMySQLService()
 
+def _service(read_replica: bool = False, last_write: Optional[float] = None) -> TranslationSessionRepository:
+    # Imported on first use so mysql.connector stays off the cold-start import path.
+    from app.db import translation_session_repository
 
-@router.post("", response_model=TranslationSessionRead, status_code=201)
-def create_translation_session(session: TranslationSessionCreate):
-    service = _service()
+    return translation_session_repository(read_replica=read_replica, last_write=last_write)
+
+
+def _reader(request: Request, session_id: Optional[UUID] = None) -> TranslationSessionRepository:
+    """Repository for a read-only endpoint: replicas allowed, except ones behind the client's last write."""
+    written = client_last_write(request)
+    writes = get_resources().writes
+    if session_id is not None and writes is not None:
+        # A write-behind compose lands after the response that stamped the client.
+        landed = writes.written_at(session_id)
+        if landed is not None and (written is None or landed > written):
+            written = landed
+    return _service(read_replica=True, last_write=written)
+
+
+def _sync_user_preferences(session: Optional[TranslationSessionRead]) -> None:
+    """Fold a session's preferred_words into its user's shared preferences."""
+    if not session or not session.user_id or not session.preferred_words:
+        return
+    try:
+        get_resources().preferences.merge(session.user_id, session.preferred_words)
+    except Exception as exc:  # the session write already succeeded; don't fail the request
+        logger.warning("Failed to merge preferred words | user=%s | %s", session.user_id, exc)
+
+
+def _await_pending_writes(session_id: UUID) -> None:
+    """Let queued compose updates land first so a direct write is not overtaken by them."""
+    writes = get_resources().writes
+    if writes is not None and writes.pending_count:
+        anyio.from_thread.run(writes.wait_for_session, session_id)
+
+
+def _idempotency_key(idempotency_key: Optional[str]) -> Optional[str]:
+    if idempotency_key is not None:
+        idempotency_key = idempotency_key.strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+    return idempotency_key
+
+
+@contextmanager
+def _idempotency_errors() -> Iterator[None]:
+    try:
+        yield
+    except IdempotencyConflict as exc:
+        raise HTTPException(
+            status_code=409, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@contextmanager
+def _idempotent(scope: str, idempotency_key: Optional[str], *request: Any) -> Iterator[IdempotentCall]:
+    """Replay or record the response of a request sent with an Idempotency-Key header."""
+    key = _idempotency_key(idempotency_key)
+    with _idempotency_errors():
+        with get_resources().idempotency.call(scope, key, request_fingerprint(scope, *request)) as call:
+            yield call
+
+
+@asynccontextmanager
+async def _idempotent_async(scope: str, idempotency_key: Optional[str], *request: Any) -> AsyncIterator[IdempotentCall]:
+    """`_idempotent` for async handlers: the key's database calls run off the event loop."""
+    key = _idempotency_key(idempotency_key)
+    with _idempotency_errors():
+        async with get_resources().idempotency.call_async(scope, key, request_fingerprint(scope, *request)) as call:
+            yield call
+
+
+async def _complete_compose(
+    call: IdempotentCall, manager: TranslationSessionManager, updated: TranslationSessionRead
+) -> None:
+    body = jsonable_encoder(updated)
+    if manager.queued_write is not None:
+        # Write-behind: the key is stored once the update lands, or freed if it is dropped.
+        call.complete_after(manager.queued_write, 200, body)
+    else:
+        await call.complete_async(200, body)
+
+
+def _session_response(
+    request: Request,
+    session: TranslationSessionRead,
+    view: SessionView,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    content = TranslationSessionMinimal.from_session(session) if view == "minimal" else session
+    return respond(request, content, status_code=status_code, headers=headers)
+
+
+def _replayed(request: Request, stored: StoredResponse, view: SessionView) -> Response:
+    headers = {REPLAYED_HEADER: "true"}
+    if view == "minimal" or wants_msgpack(request):
+        session = TranslationSessionRead.model_validate_json(stored.body)
+        return _session_response(request, session, view, status_code=stored.status_code, headers=headers)
+    # Stored bodies are the full JSON session; send them as they are.
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={**headers, "Vary": "Accept"},
+    )
+
+
+@router.post("", response_model=TranslationSessionRead, status_code=201, responses={201: MSGPACK_RESPONSE})
+def create_translation_session(
+    session: TranslationSessionCreate,
+    request: Request,
+    view: SessionView = Query("full", description=VIEW_DESCRIPTION),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_HEADER),
+):
+    # Fields the client did not send (e.g. a generated id) must not make a retry look different.
+    with _idempotent("create", idempotency_key, session.model_dump(mode="json", exclude_unset=True)) as call:
+        if call.replay is not None:
+            return _replayed(request, call.replay, view)
+        service = _service()
+        try:
+            created = service.create(session)
+            _sync_user_preferences(created)
+            call.complete(201, jsonable_encoder(created))
+            return _session_response(request, created, view, status_code=201)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+        finally:
+            service.close_connection()
+
+
+@router.get("", response_model=List[TranslationSessionRead])
+def list_translation_sessions(
+    request: Request,
+    detected_emotion: Optional[str] = Query(None, description="Filter by detected emotion"),
+    detected_intent: Optional[str] = Query(None, description="Filter by detected intent"),
+):
+    service = _reader(request)
     try:
-        return service.create(session)
+        return service.list(
+            detected_emotion=detected_emotion,
+            detected_intent=detected_intent,
+        )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
     finally:
         service.close_connection()
 
 
-@router.get("", response_model=List[TranslationSessionRead])
-def list_translation_sessions(
+@router.get("/search", response_model=TranslationSessionSearchPage)
+def search_translation_sessions(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words to look for in input_text, adjusted_text and context"),
+    phrase: bool = Query(False, description="Match `q` as an exact phrase instead of any of its words"),
     detected_emotion: Optional[str] = Query(None, description="Filter by detected emotion"),
     detected_intent: Optional[str] = Query(None, description="Filter by detected intent"),
+    user_id: Optional[str] = Query(None, description="Filter by user"),
+    limit: int = Query(20, ge=1, le=100, description="Hits per page"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
 ):
-    service = _service()
+    """Relevance-ordered full-text search with highlighted snippets and keyset pagination."""
     try:
-        return service.list(
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    service = _reader(request)
+    try:
+        # One extra row tells whether another page exists without a COUNT query.
+        rows = service.search(
+            q,
+            phrase=phrase,
             detected_emotion=detected_emotion,
             detected_intent=detected_intent,
+            user_id=user_id,
+            limit=limit + 1,
+            after=after,
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
     finally:
         service.close_connection()
 
+    hits = [
+        TranslationSessionSearchHit(session=session, relevance=relevance, snippets=snippets(session, q, phrase))
+        for session, relevance in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = hits[-1]
+        next_cursor = encode_cursor(last.relevance, str(last.session.id))
+    return TranslationSessionSearchPage(hits=hits, next_cursor=next_cursor)
 
-@router.get("/{session_id}", response_model=TranslationSessionRead)
-def get_translation_session(session_id: UUID = Path(..., description="Translation session ID")):
-    service = _service()
+
+@router.get("/{session_id}", response_model=TranslationSessionRead, responses={200: MSGPACK_RESPONSE})
+def get_translation_session(
+    request: Request,
+    session_id: UUID = Path(..., description="Translation session ID"),
+    include_artifacts: bool = Query(
+        False, description="Merge heavy TTS artifacts (visemes, timings) back into tts_metadata"
+    ),
+    view: SessionView = Query("full", description=VIEW_DESCRIPTION),
+):
+    service = _reader(request, session_id)
     try:
-        record = service.get(session_id)
+        record = service.get(session_id, include_artifacts=include_artifacts)
+        writes = get_resources().writes
+        if writes is not None:
+            record = writes.overlay(record)
         if not record:
             raise HTTPException(status_code=404, detail="TranslationSession not found")
-        return record
+        return _session_response(request, record, view)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+    finally:
+        service.close_connection()
+
+
+@router.get("/{session_id}/artifacts", response_model=Dict[str, Any])
+def get_translation_session_artifacts(
+    request: Request, session_id: UUID = Path(..., description="Translation session ID")
+):
+    """Heavy TTS payloads listed under `tts_metadata.artifacts`, loaded only on request."""
+    service = _reader(request, session_id)
+    try:
+        artifacts = service.get_artifacts(session_id)
+        if artifacts is None:
+            if not service.get(session_id):
+                raise HTTPException(status_code=404, detail="TranslationSession not found")
+            return {}
+        return artifacts
     except HTTPException:
         raise
     except Exception as exc:
@@ -68,14 +312,40 @@ def get_translation_session(session_id: UUID = Path(..., description="Translatio
         service.close_connection()
 
 
-@router.put("/{session_id}", response_model=TranslationSessionRead)
-def update_translation_session(session_id: UUID, session_update: TranslationSessionUpdate):
+@router.get("/{session_id}/archived", response_model=TranslationSessionRead)
+def get_archived_translation_session(session_id: UUID = Path(..., description="Translation session ID")):
+    """Read a session that the retention job moved out of MySQL into the archive."""
+    settings = get_settings()
+    archiver = SessionArchiver(SessionArchive(settings.archive_dir), retention_days=settings.session_retention_days)
+    try:
+        record = archiver.fetch(session_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Archived TranslationSession not found")
+        return record
+    except HTTPException:
+        raise
+    except OSError as exc:
+        raise HTTPException(status_code=500, detail=f"Archive read error: {exc}") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+
+
+@router.put("/{session_id}", response_model=TranslationSessionRead, responses={200: MSGPACK_RESPONSE})
+def update_translation_session(
+    session_id: UUID,
+    session_update: TranslationSessionUpdate,
+    request: Request,
+    view: SessionView = Query("full", description=VIEW_DESCRIPTION),
+):
+    _await_pending_writes(session_id)
     service = _service()
     try:
         updated = service.update(session_id, session_update)
         if not updated:
             raise HTTPException(status_code=404, detail="TranslationSession not found")
-        return updated
+        if session_update.preferred_words:
+            _sync_user_preferences(updated)
+        return _session_response(request, updated, view)
     except HTTPException:
         raise
     except Exception as exc:
@@ -84,19 +354,145 @@ def update_translation_session(session_id: UUID, session_update: TranslationSess
         service.close_connection()
 
 
-@router.post("/{session_id}/compose", response_model=TranslationSessionRead)
+def _compose_error(exc: Exception) -> Tuple[int, Any]:
+    """(status, detail) the compose endpoint answers with for `exc`; used per batch item."""
+    if isinstance(exc, ValueError):
+        return 404, str(exc)
+    if isinstance(exc, ComposeDeadlineExceeded):
+        return 504, exc.to_detail()
+    if isinstance(exc, (AdmissionRejected, CircuitOpenError)):
+        return (429 if isinstance(exc, AdmissionRejected) else 503), {
+            "message": str(exc),
+            "retry_after": math.ceil(exc.retry_after),
+        }
+    if isinstance(exc, UpstreamTimeoutError):
+        return 504, str(exc)
+    if isinstance(exc, RuntimeError):
+        return 500, str(exc)
+    return 502, f"Compose request failed: {exc}"
+
+
+@router.post("/compose_batch", response_model=TranslationSessionBatchComposeResponse, responses={200: MSGPACK_RESPONSE})
+async def compose_sentences_batch(
+    payload: TranslationSessionBatchComposeRequest,
+    request: Request,
+    x_openai_key: str | None = Header(default=None, convert_underscores=False),
+    x_openai_model: str | None = Header(default=None, convert_underscores=False),
+    x_compose_deadline_ms: int | None = Header(default=None, alias=DEADLINE_HEADER),
+):
+    """Compose into many sessions in one request; each item gets its own status and error."""
+    settings = get_settings()
+    if len(payload.items) > settings.compose_batch_max_items:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.compose_batch_max_items} items per batch"
+        )
+    deadline = Deadline.resolve(x_compose_deadline_ms, payload.deadline_ms)
+    service = _service()
+    resources = get_resources()
+    try:
+        manager = TranslationSessionManager(
+            service,
+            api_key=x_openai_key,
+            model=x_openai_model,
+            admission=resources.admission,
+            preferences=resources.preferences,
+            rules=resources.rule_cache,
+            summaries=resources.summaries,
+            writes=resources.writes,
+            speculation=resources.speculation,
+            phrase_index=resources.phrase_index,
+        )
+        items = [
+            (item.session_id, TranslationSessionComposeRequest(glosses=item.glosses, letters=item.letters))
+            for item in payload.items
+        ]
+        async with resources.inflight.track():
+            outcomes = await manager.compose_many(
+                items, deadline=deadline, concurrency=settings.compose_batch_concurrency
+            )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Compose request failed: {exc}") from exc
+    finally:
+        service.close_connection()
+
+    results = []
+    for item, outcome in zip(payload.items, outcomes):
+        if isinstance(outcome, Exception):
+            status, detail = _compose_error(outcome)
+            results.append(TranslationSessionBatchComposeResult(session_id=item.session_id, status=status, error=detail))
+        else:
+            results.append(TranslationSessionBatchComposeResult(session_id=item.session_id, status=200, session=outcome))
+    return respond(request, TranslationSessionBatchComposeResponse(results=results))
+
+
+@router.post("/{session_id}/compose", response_model=TranslationSessionRead, responses={200: MSGPACK_RESPONSE})
 async def compose_sentence_for_session(
     session_id: UUID,
     payload: TranslationSessionComposeRequest,
+    request: Request,
+    view: SessionView = Query("full", description=VIEW_DESCRIPTION),
     x_openai_key: str | None = Header(default=None, convert_underscores=False),
     x_openai_model: str | None = Header(default=None, convert_underscores=False),
+    x_compose_deadline_ms: int | None = Header(default=None, alias=DEADLINE_HEADER),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_HEADER),
 ):
+    deadline = Deadline.resolve(x_compose_deadline_ms, payload.deadline_ms)
     service = _service()
-    manager = TranslationSessionManager(service, api_key=x_openai_key, model=x_openai_model)
+    resources = get_resources()
+    manager = TranslationSessionManager(
+        service,
+        api_key=x_openai_key,
+        model=x_openai_model,
+        admission=resources.admission,
+        preferences=resources.preferences,
+        rules=resources.rule_cache,
+        summaries=resources.summaries,
+        writes=resources.writes,
+        speculation=resources.speculation,
+        phrase_index=resources.phrase_index,
+    )
     try:
-        return await manager.compose(session_id, payload)
+        if payload.partial:
+            speculating = await manager.speculate(session_id, payload)
+            return respond(request, {"session_id": str(session_id), "speculating": speculating}, status_code=202)
+        # A retry may carry a different deadline; it is still the same compose.
+        request_body = payload.model_dump(mode="json", exclude={"deadline_ms"})
+        async with _idempotent_async(f"compose:{session_id}", idempotency_key, request_body) as call:
+            if call.replay is not None:
+                return _replayed(request, call.replay, view)
+            composing = asyncio.ensure_future(manager.compose(session_id, payload, deadline=deadline))
+            try:
+                async with resources.inflight.track():
+                    updated = await cancel_on_disconnect(composing, request.is_disconnected)
+            except BaseException:
+                if composing.done() and not composing.cancelled() and composing.exception() is None:
+                    # The update was written (or queued) before the client left. Freeing the key
+                    # would let a retry append the same glosses again.
+                    await _complete_compose(call, manager, composing.result())
+                raise
+            await _complete_compose(call, manager, updated)
+            return _session_response(request, updated, view)
+    except HTTPException:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ClientDisconnectedError as exc:
+        logger.info("Session compose cancelled | session=%s | %s", session_id, exc)
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
+    except ComposeDeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=exc.to_detail()) from exc
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except UpstreamTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     except Exception as exc:
@@ -105,8 +501,114 @@ async def compose_sentence_for_session(
         service.close_connection()
 
 
+@router.post("/{session_id}/glosses", response_model=GlossStreamStatus, responses={200: MSGPACK_RESPONSE})
+async def stream_glosses_for_session(
+    session_id: UUID,
+    chunk: GlossStreamChunk,
+    request: Request,
+    x_openai_key: str | None = Header(default=None, convert_underscores=False),
+    x_openai_model: str | None = Header(default=None, convert_underscores=False),
+):
+    """Feed a raw recognizer chunk; the session is composed only at utterance boundaries."""
+    if not get_settings().session_affinity:
+        # Chunks of one session spread over workers would be buffered and composed separately.
+        raise HTTPException(
+            status_code=503,
+            detail="Gloss streaming needs every request for a session on one worker; set SESSION_AFFINITY",
+        )
+    resources = get_resources()
+
+    def manager(service: TranslationSessionRepository) -> TranslationSessionManager:
+        return TranslationSessionManager(
+            service,
+            api_key=x_openai_key,
+            model=x_openai_model,
+            admission=resources.admission,
+            preferences=resources.preferences,
+            rules=resources.rule_cache,
+            summaries=resources.summaries,
+            writes=resources.writes,
+            speculation=resources.speculation,
+            phrase_index=resources.phrase_index,
+        )
+
+    # Pause composes run after this request has returned, so each call opens its own connection.
+    async def compose(payload: TranslationSessionComposeRequest) -> TranslationSessionRead:
+        service = _service()
+        try:
+            async with resources.inflight.track():
+                return await manager(service).compose(session_id, payload)
+        finally:
+            service.close_connection()
+
+    async def speculate(payload: TranslationSessionComposeRequest) -> bool:
+        service = _service()
+        try:
+            return await manager(service).speculate(session_id, payload)
+        finally:
+            service.close_connection()
+
+    try:
+        status = await resources.gloss_stream.push(
+            str(session_id), chunk, compose, speculate if resources.speculation is not None else None
+        )
+        return respond(request, status)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ComposeDeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=exc.to_detail()) from exc
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except UpstreamTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Compose request failed: {exc}") from exc
+
+
+@router.post("/{session_id}/summarize", response_model=None, status_code=202)
+async def summarize_translation_session(
+    session_id: UUID,
+    wait: bool = Query(False, description="Wait for the run and return the updated session"),
+):
+    """Queue an incremental summary run; only text after the stored checkpoint is sent to the LLM."""
+    try:
+        pending = get_resources().summaries.schedule(session_id)
+        if not wait:
+            return {"message": "Summarization scheduled.", "session_id": str(session_id)}
+        # Shielded so a client giving up does not cancel a run other waiters may share.
+        session = await asyncio.shield(pending)
+    except SummaryQueueFull as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        ) from exc
+    except UpstreamTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Summarize request failed: {exc}") from exc
+    if session is None:
+        raise HTTPException(status_code=404, detail="TranslationSession not found")
+    return JSONResponse(status_code=200, content=jsonable_encoder(session))
+
+
 @router.delete("/{session_id}", status_code=200)
 def delete_translation_session(session_id: UUID):
+    _await_pending_writes(session_id)
     service = _service()
     try:
         deleted = service.delete(session_id)
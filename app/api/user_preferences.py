@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Path
+
+from app.core.resources import get_resources
+from app.models.user_preference import UserPreferredWordsRead, UserPreferredWordsUpdate
+
+router = APIRouter(prefix="/users", tags=["UserPreference"])
+
+
+@router.get("/{user_id}/preferred_words", response_model=UserPreferredWordsRead)
+def get_user_preferred_words(user_id: str = Path(..., description="External user identifier")):
+    try:
+        return UserPreferredWordsRead(user_id=user_id, preferred_words=get_resources().preferences.get(user_id))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+
+
+@router.put("/{user_id}/preferred_words", response_model=UserPreferredWordsRead)
+def merge_user_preferred_words(user_id: str, update: UserPreferredWordsUpdate):
+    store = get_resources().preferences
+    try:
+        store.merge(user_id, update.preferred_words)
+        return UserPreferredWordsRead(user_id=user_id, preferred_words=store.get(user_id))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
+
+
+@router.delete("/{user_id}/preferred_words/{gloss}", status_code=200)
+def delete_user_preferred_word(user_id: str, gloss: str):
+    try:
+        deleted = get_resources().preferences.delete(user_id, gloss)
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Preferred word not found")
+        return {"message": "Preferred word deleted successfully."}
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Database error: {exc}") from exc
@@ -0,0 +1,93 @@
+"""Content negotiation for the recognizer hot path: JSON or MessagePack on the same endpoints.
+
+Routers built with ``route_class=WireRoute`` accept request bodies sent as
+``Content-Type: application/msgpack``. They are decoded before FastAPI validates them, so the
+same pydantic models and validation errors apply to both encodings. Responses built with
+`respond` are MessagePack when the Accept header lists a MessagePack type before JSON, and JSON
+otherwise. Error responses are always JSON.
+
+``python -m benchmarks.wire_format`` compares payload sizes and encode/decode times.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+import msgpack
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.requests import Request
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = frozenset({MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"})
+_JSON_MEDIA_TYPES = frozenset({"application/json", "application/*", "*/*"})
+
+# OpenAPI `responses` entry advertising the MessagePack encoding of an endpoint's response.
+MSGPACK_RESPONSE = {"content": {MSGPACK_MEDIA_TYPE: {}}}
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True when Accept names a MessagePack type before any JSON (or wildcard) type."""
+    for value in request.headers.get("accept", "").split(","):
+        media_type = _media_type(value)
+        if media_type in MSGPACK_MEDIA_TYPES:
+            return True
+        if media_type in _JSON_MEDIA_TYPES:
+            return False
+    return False
+
+
+def respond(
+    request: Request, content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Encode `content` (a model, or anything jsonable_encoder takes) in the negotiated format."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if wants_msgpack(request):
+        data = content.model_dump(mode="json") if isinstance(content, BaseModel) else jsonable_encoder(content)
+        return Response(msgpack.packb(data), status_code=status_code, headers=headers, media_type=MSGPACK_MEDIA_TYPE)
+    if isinstance(content, BaseModel):
+        # Serialized by pydantic-core directly, skipping jsonable_encoder's Python-level walk.
+        return Response(
+            content.model_dump_json(), status_code=status_code, headers=headers, media_type="application/json"
+        )
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
+
+
+async def _as_json_request(request: Request) -> Request:
+    body = await request.body()
+    if not body:
+        return request
+    try:
+        decoded = msgpack.unpackb(body, raw=False)
+    except Exception as exc:
+        raise RequestValidationError(
+            [{"type": "msgpack_invalid", "loc": ("body",), "msg": "Body is not valid MessagePack", "input": None}]
+        ) from exc
+    headers = [(name, value) for name, value in request.scope["headers"] if name != b"content-type"]
+    scope = {**request.scope, "headers": [*headers, (b"content-type", b"application/json")]}
+    converted = Request(scope, request.receive)
+    # Starlette caches the raw and parsed body on these attributes; FastAPI reads json() for JSON bodies.
+    converted._body = body
+    converted._json = decoded
+    return converted
+
+
+class WireRoute(APIRoute):
+    """APIRoute whose endpoints also accept MessagePack request bodies."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if _media_type(request.headers.get("content-type", "")) in MSGPACK_MEDIA_TYPES:
+                request = await _as_json_request(request)
+            return await handler(request)
+
+        return route_handler
@@ -5,6 +5,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
+from typing import List
 
 from dotenv import load_dotenv
 
@@ -13,12 +14,196 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(".env"), override=False)
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may use, honouring affinity masks and cgroup quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux platforms
+        cpus = os.cpu_count() or 1
+
+    # Containers (Docker, Cloud Run) express CPU limits as a cgroup v2 quota rather than affinity.
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
 class Settings:
     def __init__(self) -> None:
         self.fastapi_port: int = int(os.environ.get("FASTAPI_PORT", 8000))
         self.title: str = os.environ.get("FASTAPI_TITLE", "ASL Emotion Agent API")
         self.version: str = os.environ.get("FASTAPI_VERSION", "1.0.0")
 
+        # Server process settings. APP_ENV=production switches `python -m app.main` to the
+        # multi-worker entry point; PORT follows the Cloud Run convention.
+        self.environment: str = os.environ.get("APP_ENV", "development")
+        self.host: str = os.environ.get("HOST", "0.0.0.0")
+        self.port: int = int(os.environ.get("PORT", 8080))
+        self.workers: int = int(os.environ.get("WEB_CONCURRENCY") or available_cpus())
+        # True when every request for a session reaches the same worker process: a single worker,
+        # or a load balancer that routes by session. State kept per worker (write-behind queue,
+        # gloss stream buffers, speculations) is only consistent with it.
+        self.session_affinity: bool = _env_bool("SESSION_AFFINITY", not (self.is_production and self.workers > 1))
+        self.graceful_shutdown_seconds: float = float(os.environ.get("GRACEFUL_SHUTDOWN_SECONDS", 20))
+
+        # Shared per-worker resources created by the application lifespan.
+        self.db_pool_size: int = int(os.environ.get("DB_POOL_SIZE", 5))
+        self.rule_cache_ttl_seconds: float = float(os.environ.get("RULE_CACHE_TTL_SECONDS", 60))
+        # Read replicas (DB_REPLICA_HOSTS, see app.db.base). Writes then hand the client their time, and
+        # its reads skip replicas behind it (app.api.consistency). The stamp stops mattering once the lag
+        # tolerance plus one lag sample (2 s) and the 1 s lag granularity have passed.
+        self.db_replicas: bool = bool(os.environ.get("DB_REPLICA_HOSTS", "").strip())
+        self.read_your_writes_seconds: float = float(
+            os.environ.get("DB_READ_YOUR_WRITES_SECONDS") or float(os.environ.get("DB_REPLICA_MAX_LAG_SECONDS", 5)) + 3
+        )
+        self.openai_client_cache_size: int = int(os.environ.get("OPENAI_CLIENT_CACHE_SIZE", 32))
+        self.preferences_cache_ttl_seconds: float = float(os.environ.get("PREFERENCES_CACHE_TTL_SECONDS", 300))
+
+        # Cold start. PREWARM_MODE: "background" opens DB/LLM connections after the server binds,
+        # "startup" does it before accepting traffic, "off" leaves everything to the first request.
+        self.prewarm_mode: str = os.environ.get("PREWARM_MODE", "background").lower()
+        # Optional OpenAPI document precomputed at build time (python -m app.scripts.export_openapi).
+        self.openapi_schema_path: str | None = os.environ.get("OPENAPI_SCHEMA_PATH") or None
+
+        # Resilience around the OpenAI compose call (see app.services.resilience).
+        self.compose_timeout_seconds: float = float(os.environ.get("COMPOSE_TIMEOUT_SECONDS", 8))
+        self.compose_total_timeout_seconds: float = float(os.environ.get("COMPOSE_TOTAL_TIMEOUT_SECONDS", 20))
+        self.compose_max_retries: int = int(os.environ.get("COMPOSE_MAX_RETRIES", 2))
+        self.compose_retry_backoff_seconds: float = float(os.environ.get("COMPOSE_RETRY_BACKOFF_SECONDS", 0.2))
+        self.compose_retry_backoff_max_seconds: float = float(os.environ.get("COMPOSE_RETRY_BACKOFF_MAX_SECONDS", 2))
+        self.compose_hedge_enabled: bool = _env_bool("COMPOSE_HEDGE_ENABLED", True)
+        self.compose_hedge_quantile: float = float(os.environ.get("COMPOSE_HEDGE_QUANTILE", 0.95))
+        self.compose_hedge_min_delay_seconds: float = float(os.environ.get("COMPOSE_HEDGE_MIN_DELAY_SECONDS", 0.3))
+        self.compose_breaker_failure_threshold: int = int(os.environ.get("COMPOSE_BREAKER_FAILURE_THRESHOLD", 5))
+        self.compose_breaker_reset_seconds: float = float(os.environ.get("COMPOSE_BREAKER_RESET_SECONDS", 30))
+        # "local" answers with the rule-based GlossFallbackComposer while OpenAI is degraded;
+        # "none" fails fast with 503/504 instead.
+        self.compose_fallback: str = os.environ.get("COMPOSE_FALLBACK", "none").lower()
+
+        # Admission control for compose (per worker). Per-key limits bound a single user/session.
+        self.compose_max_concurrency: int = int(os.environ.get("COMPOSE_MAX_CONCURRENCY", 64))
+        self.compose_max_per_user: int = int(os.environ.get("COMPOSE_MAX_PER_USER", 4))
+        self.compose_max_per_session: int = int(os.environ.get("COMPOSE_MAX_PER_SESSION", 2))
+        self.compose_queue_size: int = int(os.environ.get("COMPOSE_QUEUE_SIZE", 128))
+        self.compose_max_queued_per_key: int = int(os.environ.get("COMPOSE_MAX_QUEUED_PER_KEY", 4))
+        self.compose_queue_timeout_seconds: float = float(os.environ.get("COMPOSE_QUEUE_TIMEOUT_SECONDS", 2))
+
+        # Upstream scheduler: slots per worker and per-model rate budgets ("model=rps:burst,...").
+        self.scheduler_max_in_flight: int = int(os.environ.get("SCHEDULER_MAX_IN_FLIGHT", 32))
+        self.scheduler_model_rates: str = os.environ.get("SCHEDULER_MODEL_RATES", "")
+        self.scheduler_default_rate: float = float(os.environ.get("SCHEDULER_DEFAULT_RATE", 0))
+
+        # Session persistence. "sync" writes and re-reads on the request path; "async" answers
+        # composes before MySQL is updated (write-behind queue, app.services.persistence). A compose
+        # rebuilds glosses and context from what its worker has seen, so "async" needs
+        # SESSION_AFFINITY; without it the queue is not used.
+        self.session_write_mode: str = os.environ.get("SESSION_WRITE_MODE", "sync").lower()
+        self.session_write_shards: int = int(os.environ.get("SESSION_WRITE_SHARDS", 4))
+        self.session_write_queue_size: int = int(os.environ.get("SESSION_WRITE_QUEUE_SIZE", 256))
+        self.session_write_max_attempts: int = int(os.environ.get("SESSION_WRITE_MAX_ATTEMPTS", 8))
+        # Directory for the crash-recovery journal; empty disables it. Journal lines survive a
+        # process crash; SESSION_WRITE_JOURNAL_FSYNC also makes them survive a host crash.
+        self.session_write_journal_dir: str | None = os.environ.get("SESSION_WRITE_JOURNAL_DIR") or None
+        self.session_write_journal_fsync: bool = _env_bool("SESSION_WRITE_JOURNAL_FSYNC", False)
+
+        # Retention (python -m app.scripts.archive_sessions): sessions not updated for this many
+        # days move to gzip NDJSON files under ARCHIVE_DIR.
+        self.session_retention_days: int = int(os.environ.get("SESSION_RETENTION_DAYS", 90))
+        self.archive_dir: str = os.environ.get("ARCHIVE_DIR", "archive")
+        self.archive_chunk_size: int = int(os.environ.get("ARCHIVE_CHUNK_SIZE", 500))
+
+        # Speculative composition of gloss prefixes sent with `partial: true` (see
+        # app.services.speculation). Off by default: every partial costs an upstream call. Speculations
+        # are kept per worker, so they are only used with SESSION_AFFINITY.
+        self.speculative_compose: bool = _env_bool("SPECULATIVE_COMPOSE", False)
+        self.speculative_max_in_flight: int = int(os.environ.get("SPECULATIVE_MAX_IN_FLIGHT", 8))
+        self.speculative_prefixes_per_session: int = int(os.environ.get("SPECULATIVE_PREFIXES_PER_SESSION", 4))
+        self.speculative_ttl_seconds: float = float(os.environ.get("SPECULATIVE_TTL_SECONDS", 30))
+
+        # Gloss-stream input stage for POST /translation_sessions/{id}/glosses (see
+        # app.services.gloss_stream): repeats and flicker are dropped, and a compose runs only
+        # at a boundary gloss, a `final` chunk, or after GLOSS_PAUSE_MS without chunks. Buffers are
+        # per worker, so the endpoint answers 503 without SESSION_AFFINITY.
+        self.gloss_pause_ms: int = int(os.environ.get("GLOSS_PAUSE_MS", 800))
+        self.gloss_dedupe_window_ms: int = int(os.environ.get("GLOSS_DEDUPE_WINDOW_MS", 500))
+        self.gloss_flicker_window_ms: int = int(os.environ.get("GLOSS_FLICKER_WINDOW_MS", 300))
+        self.gloss_min_confidence: float = float(os.environ.get("GLOSS_MIN_CONFIDENCE", 0.35))
+        self.gloss_boundary_glosses: List[str] = [
+            gloss.strip() for gloss in os.environ.get("GLOSS_BOUNDARY_GLOSSES", ".,?,!").split(",") if gloss.strip()
+        ]
+        self.gloss_max_utterance: int = int(os.environ.get("GLOSS_MAX_UTTERANCE", 40))
+
+        # Fingerspelled letters are resolved into words locally (app.services.fingerspelling)
+        # against the built-in vocabulary plus this file of names / domain words, one per line.
+        self.fingerspell_lexicon_path: str | None = os.environ.get("FINGERSPELL_LEXICON_PATH") or None
+        self.fingerspell_max_distance: int = int(os.environ.get("FINGERSPELL_MAX_DISTANCE", 2))
+
+        # Phrase index built by python -m app.scripts.mine_phrases (see app.services.phrase_index).
+        # Empty disables local phrase hits.
+        self.phrase_index_path: str | None = os.environ.get("PHRASE_INDEX_PATH") or None
+
+        # Semantic compose cache (app.services.semantic_cache): reuses the sentence of the same
+        # glosses reordered or with a drifted context, never of a different gloss set. Off by default.
+        self.semantic_cache: bool = _env_bool("SEMANTIC_CACHE", False)
+        self.semantic_cache_size: int = int(os.environ.get("SEMANTIC_CACHE_SIZE", 4096))
+        self.semantic_cache_dimensions: int = int(os.environ.get("SEMANTIC_CACHE_DIMENSIONS", 512))
+        self.semantic_cache_threshold: float = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.92))
+        self.semantic_cache_ttl_seconds: float = float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", 3600))
+
+        # Shared compose cache tier on a Redis-protocol server (app.services.redis_cache), with a
+        # local exact-match L1 whose TTL bounds how stale a worker's copy can get. Empty URL: off.
+        self.compose_cache_redis_url: str | None = os.environ.get("COMPOSE_CACHE_REDIS_URL") or None
+        self.compose_cache_redis_prefix: str = os.environ.get("COMPOSE_CACHE_REDIS_PREFIX", "aslagent:compose:")
+        self.compose_cache_redis_ttl_seconds: float = float(os.environ.get("COMPOSE_CACHE_REDIS_TTL_SECONDS", 86400))
+        self.compose_cache_redis_timeout_ms: int = int(os.environ.get("COMPOSE_CACHE_REDIS_TIMEOUT_MS", 50))
+        self.compose_cache_batch_ms: float = float(os.environ.get("COMPOSE_CACHE_BATCH_MS", 2))
+        self.compose_cache_l1_size: int = int(os.environ.get("COMPOSE_CACHE_L1_SIZE", 2048))
+        self.compose_cache_l1_ttl_seconds: float = float(os.environ.get("COMPOSE_CACHE_L1_TTL_SECONDS", 30))
+
+        # Tiered model routing (app.services.routing): composes go to OPENAI_MODEL first and are
+        # escalated to COMPOSE_STRONG_MODEL below a logprob confidence. Empty: no routing.
+        self.compose_strong_model: str | None = os.environ.get("COMPOSE_STRONG_MODEL") or None
+        self.compose_escalate_below: float = float(os.environ.get("COMPOSE_ESCALATE_BELOW", 0.75))
+        self.compose_fast_max_glosses: int = int(os.environ.get("COMPOSE_FAST_MAX_GLOSSES", 12))
+        self.compose_escalate_min_remaining_ms: int = int(os.environ.get("COMPOSE_ESCALATE_MIN_REMAINING_MS", 500))
+        # Models asked for token logprobs (default: OPENAI_MODEL and COMPOSE_STRONG_MODEL). Any other
+        # model, e.g. one picked by X-OpenAI-Model, gets the heuristic confidence instead.
+        self.compose_logprob_models: List[str] = [
+            model.strip() for model in os.environ.get("COMPOSE_LOGPROB_MODELS", "").split(",") if model.strip()
+        ] or [model for model in (os.environ.get("OPENAI_MODEL", "gpt-4o-mini"), self.compose_strong_model) if model]
+
+        # POST /translation_sessions/compose_batch: items per request and sessions composed at once.
+        self.compose_batch_max_items: int = int(os.environ.get("COMPOSE_BATCH_MAX_ITEMS", 100))
+        self.compose_batch_concurrency: int = int(os.environ.get("COMPOSE_BATCH_CONCURRENCY", 16))
+
+        # Idempotency-Key on session create / compose (app.services.idempotency): how long responses
+        # are replayed, how long an unfinished attempt holds its key, and the per-worker LRU size.
+        self.idempotency_ttl_seconds: float = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 86400))
+        self.idempotency_lease_seconds: float = float(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", 60))
+        self.idempotency_cache_size: int = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 4096))
+
+        # Background session summarization (see app.services.summarizer).
+        self.summary_workers: int = int(os.environ.get("SUMMARY_WORKERS", 2))
+        self.summary_queue_size: int = int(os.environ.get("SUMMARY_QUEUE_SIZE", 64))
+        self.summary_min_new_chars: int = int(os.environ.get("SUMMARY_MIN_NEW_CHARS", 400))
+        self.summary_max_chunk_chars: int = int(os.environ.get("SUMMARY_MAX_CHUNK_CHARS", 6000))
+        self.summary_model: str | None = os.environ.get("SUMMARY_MODEL") or None
+
+    @property
+    def is_production(self) -> bool:
+        return self.environment.lower() in {"production", "prod"}
+
 
 @lru_cache
 def get_settings() -> Settings:
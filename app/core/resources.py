@@ -0,0 +1,266 @@
+"""Per-worker shared resources managed by the FastAPI lifespan."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+from app.core.config import Settings, get_settings
+
+if TYPE_CHECKING:
+    from app.services.compose_cache import ComposeCache
+
+
+class InflightTracker:
+    """Counts in-flight compose operations so shutdown can wait for them to finish."""
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        self._count += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._count -= 1
+            if self._count == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until nothing is in flight. Returns False if the timeout elapsed first."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class AppResources:
+    """Owns the DB pool, OpenAI clients, caches, admission, scheduler and background workers."""
+
+    def __init__(self, settings: Optional[Settings] = None) -> None:
+        from app.services.admission import AdmissionController
+        from app.services.expression_rules import ExpressionRuleCache
+        from app.services.fingerspelling import FingerspellingResolver
+        from app.services.gloss_stream import GlossStreamStage
+        from app.services.idempotency import IdempotencyStore
+        from app.services.persistence import SessionWriteQueue
+        from app.services.phrase_index import PhraseIndex
+        from app.services.preferences import UserPreferenceStore
+        from app.services.scheduler import ComposeScheduler, parse_model_rates
+        from app.services.speculation import SpeculativeComposer
+        from app.services.summarizer import SessionSummarizer, SummaryWorker
+
+        self.settings = settings or get_settings()
+        self.logger = logging.getLogger(__name__)
+        self.inflight = InflightTracker()
+        self.rule_cache = ExpressionRuleCache(ttl_seconds=self.settings.rule_cache_ttl_seconds)
+        self.preferences = UserPreferenceStore(ttl_seconds=self.settings.preferences_cache_ttl_seconds)
+        self.idempotency = IdempotencyStore(
+            ttl_seconds=self.settings.idempotency_ttl_seconds,
+            lease_seconds=self.settings.idempotency_lease_seconds,
+            cache_size=self.settings.idempotency_cache_size,
+        )
+        self.fingerspelling = FingerspellingResolver.from_file(
+            self.settings.fingerspell_lexicon_path, max_distance=self.settings.fingerspell_max_distance
+        )
+        self.admission = AdmissionController(
+            max_concurrent=self.settings.compose_max_concurrency,
+            per_key_limits={
+                "user": self.settings.compose_max_per_user,
+                "client": self.settings.compose_max_per_user,
+                "session": self.settings.compose_max_per_session,
+            },
+            max_queue=self.settings.compose_queue_size,
+            max_queued_per_key=self.settings.compose_max_queued_per_key,
+            max_wait=self.settings.compose_queue_timeout_seconds,
+        )
+        default_rate = self.settings.scheduler_default_rate
+        self.scheduler = ComposeScheduler(
+            max_in_flight=self.settings.scheduler_max_in_flight,
+            model_rates=parse_model_rates(self.settings.scheduler_model_rates),
+            default_rate=(default_rate, default_rate) if default_rate > 0 else None,
+        )
+        self.writes: Optional[SessionWriteQueue] = None
+        if self.settings.session_write_mode == "async" and not self.settings.session_affinity:
+            # Another worker's compose would read the row before this worker's queued update lands
+            # and write back glosses/context without it.
+            self.logger.warning(
+                "SESSION_WRITE_MODE=async needs SESSION_AFFINITY; writing sessions synchronously | workers=%d",
+                self.settings.workers,
+            )
+        elif self.settings.session_write_mode == "async":
+            self.writes = SessionWriteQueue(
+                shards=self.settings.session_write_shards,
+                shard_queue_size=self.settings.session_write_queue_size,
+                max_attempts=self.settings.session_write_max_attempts,
+                journal_dir=self.settings.session_write_journal_dir,
+                journal_fsync=self.settings.session_write_journal_fsync,
+            )
+        self.speculation: Optional[SpeculativeComposer] = None
+        if self.settings.speculative_compose and not self.settings.session_affinity:
+            # The final compose would usually reach another worker than its partials and miss them,
+            # so every speculation would be an upstream call for nothing.
+            self.logger.warning(
+                "SPECULATIVE_COMPOSE needs SESSION_AFFINITY; speculation disabled | workers=%d",
+                self.settings.workers,
+            )
+        elif self.settings.speculative_compose:
+            self.speculation = SpeculativeComposer(
+                max_in_flight=self.settings.speculative_max_in_flight,
+                prefixes_per_session=self.settings.speculative_prefixes_per_session,
+                ttl_seconds=self.settings.speculative_ttl_seconds,
+            )
+        self.phrase_index = PhraseIndex.load(self.settings.phrase_index_path)
+        self.compose_cache: Optional[ComposeCache] = self._compose_cache()
+        self.gloss_stream = GlossStreamStage(
+            pause_seconds=self.settings.gloss_pause_ms / 1000,
+            dedupe_window_seconds=self.settings.gloss_dedupe_window_ms / 1000,
+            flicker_window_seconds=self.settings.gloss_flicker_window_ms / 1000,
+            min_confidence=self.settings.gloss_min_confidence,
+            boundary_glosses=self.settings.gloss_boundary_glosses,
+            max_utterance_glosses=self.settings.gloss_max_utterance,
+        )
+        self.summaries = SummaryWorker(
+            SessionSummarizer(
+                model=self.settings.summary_model, max_chunk_chars=self.settings.summary_max_chunk_chars
+            ),
+            workers=self.settings.summary_workers,
+            queue_size=self.settings.summary_queue_size,
+            min_new_chars=self.settings.summary_min_new_chars,
+        )
+        self._prewarm_task: Optional[asyncio.Task] = None
+
+    def _compose_cache(self) -> Optional[ComposeCache]:
+        from app.services.compose_cache import LocalComposeCache, TieredComposeCache
+
+        layers: List[ComposeCache] = []
+        if self.settings.semantic_cache:
+            # numpy is only imported when the cache is enabled.
+            from app.services.semantic_cache import SemanticComposeCache
+
+            layers.append(
+                SemanticComposeCache(
+                    capacity=self.settings.semantic_cache_size,
+                    dimensions=self.settings.semantic_cache_dimensions,
+                    threshold=self.settings.semantic_cache_threshold,
+                    ttl_seconds=self.settings.semantic_cache_ttl_seconds,
+                )
+            )
+        if self.settings.compose_cache_redis_url:
+            from app.services.redis_cache import RedisClient, RedisComposeCache
+
+            layers.append(
+                LocalComposeCache(
+                    capacity=self.settings.compose_cache_l1_size,
+                    ttl_seconds=self.settings.compose_cache_l1_ttl_seconds,
+                )
+            )
+            layers.append(
+                RedisComposeCache(
+                    RedisClient(self.settings.compose_cache_redis_url),
+                    prefix=self.settings.compose_cache_redis_prefix,
+                    ttl_seconds=self.settings.compose_cache_redis_ttl_seconds,
+                    timeout_seconds=self.settings.compose_cache_redis_timeout_ms / 1000,
+                    batch_seconds=self.settings.compose_cache_batch_ms / 1000,
+                )
+            )
+        if len(layers) > 1:
+            return TieredComposeCache(layers)
+        return layers[0] if layers else None
+
+    async def startup(self) -> None:
+        # Importing app.db pulls in mysql.connector, so it happens here rather than at app import.
+        from app.db import configure_backend
+
+        configure_backend(self.settings.db_pool_size)
+        if self.writes is not None:
+            # Also replays updates left in the journal by a crashed worker.
+            self.writes.start()
+        self.summaries.start()
+        mode = self.settings.prewarm_mode
+        if mode == "startup":
+            await self.prewarm()
+        elif mode == "background":
+            # Scheduled now, but only gets the loop once lifespan startup returns and uvicorn binds.
+            self._prewarm_task = asyncio.create_task(self.prewarm())
+        self.logger.info("Worker resources ready | prewarm=%s", mode)
+
+    async def prewarm(self) -> None:
+        """Open the DB pool (or SQLite file), load the rule cache and build the default OpenAI client."""
+        from app.db import prepare_backend
+        from app.services.composer import get_openai_clients
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            ready = await asyncio.to_thread(prepare_backend)
+            if ready:
+                await asyncio.to_thread(self.rule_cache.warm)
+            api_key = os.environ.get("OPENAI_API_KEY")
+            if api_key:
+                await asyncio.to_thread(get_openai_clients, api_key)
+        except Exception as exc:  # pre-warm is best effort; requests retry lazily
+            self.logger.warning("Pre-warm failed | %s", exc)
+            return
+        self.logger.info(
+            "Pre-warm complete | db_ready=%s | elapsed_ms=%.1f",
+            ready,
+            (loop.time() - started) * 1000,
+        )
+
+    async def shutdown(self) -> None:
+        from app.db import close_backend
+        from app.services.composer import close_openai_clients
+
+        if self._prewarm_task is not None and not self._prewarm_task.done():
+            self._prewarm_task.cancel()
+
+        if self.inflight.count:
+            self.logger.info("Draining in-flight composes | count=%d", self.inflight.count)
+            drained = await self.inflight.drain(self.settings.graceful_shutdown_seconds)
+            if not drained:
+                self.logger.warning("Shutdown timeout with %d compose(s) still in flight", self.inflight.count)
+
+        # Utterances still buffered are composed now, before the write queue flushes.
+        await self.gloss_stream.stop(timeout=max(1.0, self.settings.graceful_shutdown_seconds / 4))
+        if self.speculation is not None:
+            await self.speculation.stop()
+        if self.writes is not None:
+            await self.writes.stop(timeout=max(1.0, self.settings.graceful_shutdown_seconds / 2))
+        # Summaries are resumable from their checkpoint, so they get whatever grace time is left.
+        await self.summaries.stop(timeout=max(1.0, self.settings.graceful_shutdown_seconds / 4))
+        await close_openai_clients()
+        if self.compose_cache is not None:
+            await self.compose_cache.close()
+        if self.phrase_index is not None:
+            self.phrase_index.close()
+        await asyncio.to_thread(close_backend)
+        self.logger.info("Worker resources closed")
+
+
+_resources: Optional[AppResources] = None
+
+
+def set_resources(resources: Optional[AppResources]) -> None:
+    global _resources
+    _resources = resources
+
+
+def get_resources() -> AppResources:
+    """Resources of the running worker; created lazily when no lifespan ran (scripts, tests)."""
+    global _resources
+    if _resources is None:
+        _resources = AppResources()
+    return _resources
@@ -1,9 +1,51 @@
-"""MySQL-backed data services for the ASL Agent API."""
+"""Data services for the ASL Agent API (MySQL, or embedded SQLite via DB_BACKEND)."""
 
+from .analytics_service import SessionAnalyticsMySQLService
 from .expression_rule_service import ExpressionRuleMySQLService
+from .idempotency_service import IdempotencyMySQLService
+from .repository import (
+    ExpressionRuleRepository,
+    IdempotencyRepository,
+    SessionAnalyticsRepository,
+    SessionArchiveRepository,
+    TranslationSessionRepository,
+    UserPreferenceRepository,
+    close_backend,
+    configure_backend,
+    database_backend,
+    expression_rule_repository,
+    idempotency_repository,
+    prepare_backend,
+    session_analytics_repository,
+    session_archive_repository,
+    translation_session_repository,
+    user_preference_repository,
+)
+from .session_archive_service import SessionArchiveMySQLService
 from .translation_session_service import TranslationSessionMySQLService
+from .user_preference_service import UserPreferenceMySQLService
 
 __all__ = [
     "ExpressionRuleMySQLService",
+    "ExpressionRuleRepository",
+    "IdempotencyMySQLService",
+    "IdempotencyRepository",
+    "SessionAnalyticsMySQLService",
+    "SessionAnalyticsRepository",
+    "SessionArchiveMySQLService",
+    "SessionArchiveRepository",
     "TranslationSessionMySQLService",
+    "TranslationSessionRepository",
+    "UserPreferenceMySQLService",
+    "UserPreferenceRepository",
+    "close_backend",
+    "configure_backend",
+    "database_backend",
+    "expression_rule_repository",
+    "idempotency_repository",
+    "prepare_backend",
+    "session_analytics_repository",
+    "session_archive_repository",
+    "translation_session_repository",
+    "user_preference_repository",
 ]
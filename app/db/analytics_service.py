@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import MySQLService
+
+# API dimension -> rollup column it groups and is returned as.
+GROUP_COLUMNS = {
+    "emotion": ("detected_emotion", "detected_emotion"),
+    "intent": ("detected_intent", "detected_intent"),
+    "user": ("user_key", "user_id"),
+}
+# Time bucket -> expression over the hourly bucket_start column.
+BUCKET_EXPRESSIONS = {"hour": "bucket_start", "day": "DATE(bucket_start)"}
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    # DATE() comes back as a date from MySQL and as text from SQLite.
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return datetime.fromisoformat(str(value))
+
+
+class SessionAnalyticsMySQLService(MySQLService):
+    """Emotion/intent distributions read from the translation_session_rollups table."""
+
+    def distribution(
+        self,
+        group_by: Sequence[str],
+        bucket: Optional[str] = None,
+        user_id: Optional[str] = None,
+        detected_emotion: Optional[str] = None,
+        detected_intent: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Session counts and average compose confidence per group.
+
+        `start` / `end` are applied to whole hours: a session counts when the hour it was created
+        in starts within [start, end).
+        """
+        unknown = [dimension for dimension in group_by if dimension not in GROUP_COLUMNS]
+        if unknown or (bucket is not None and bucket not in BUCKET_EXPRESSIONS):
+            raise ValueError(f"Unsupported grouping: {', '.join(unknown) or bucket}")
+
+        selected = [f"{GROUP_COLUMNS[dimension][0]} AS {GROUP_COLUMNS[dimension][1]}" for dimension in group_by]
+        grouped = [GROUP_COLUMNS[dimension][0] for dimension in group_by]
+        if bucket is not None:
+            selected.append(f"{BUCKET_EXPRESSIONS[bucket]} AS bucket_start")
+            grouped.append(BUCKET_EXPRESSIONS[bucket])
+
+        clauses = []
+        params: List[Any] = []
+        if user_id is not None:
+            clauses.append("user_key = %s")
+            params.append(user_id)
+        if detected_emotion:
+            clauses.append("detected_emotion = %s")
+            params.append(detected_emotion)
+        if detected_intent:
+            clauses.append("detected_intent = %s")
+            params.append(detected_intent)
+        if start is not None:
+            clauses.append("bucket_start >= %s")
+            params.append(start)
+        if end is not None:
+            clauses.append("bucket_start < %s")
+            params.append(end)
+
+        query = (
+            f"SELECT {', '.join([*selected, 'SUM(session_count) AS session_count', 'SUM(confidence_sum) AS confidence_sum'])} "
+            "FROM translation_session_rollups"
+        )
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if grouped:
+            query += f" GROUP BY {', '.join(grouped)}"
+        query += " ORDER BY " + ("bucket_start, " if bucket is not None else "") + "session_count DESC"
+
+        # Replica lag only delays the counts by a few seconds, so any fresh-enough replica will do.
+        cursor = self.read_cursor()
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        groups = []
+        for row in rows:
+            count = int(row.pop("session_count") or 0)
+            total = float(row.pop("confidence_sum") or 0)
+            if count <= 0:
+                # Every session of the group was deleted (or nothing matched at all).
+                continue
+            if "user_id" in row:
+                row["user_id"] = row["user_id"] or None
+            if "bucket_start" in row:
+                row["bucket_start"] = _as_datetime(row["bucket_start"])
+            groups.append({**row, "session_count": count, "avg_compose_confidence": round(total / count, 4)})
+        return groups
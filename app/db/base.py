@@ -1,39 +1,275 @@
 from __future__ import annotations
 
+import itertools
+import logging
 import os
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# One pool per worker process. The lifespan only records the size (see app.core.resources);
+# connections are opened on first use or by the background pre-warm, never during import.
+_pool: Optional[MySQLConnectionPool] = None
+_pool_size: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def build_db_config() -> Dict[str, Any]:
+    config = {
+        "host": os.environ.get("DB_HOST"),
+        "user": os.environ.get("DB_USER"),
+        "password": os.environ.get("DB_PASSWORD"),
+        "database": os.environ.get("DB_NAME"),
+        "port": int(os.environ.get("DB_PORT", "3306")),
+    }
+
+    missing = [key for key, value in config.items() if value in (None, "")]
+    if missing:
+        joined = ", ".join(missing)
+        raise RuntimeError(
+            f"Missing MySQL environment variables: {joined}. "
+            "Set DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, and optionally DB_PORT."
+        )
+
+    return config
+
+
+def enable_pool(size: int) -> None:
+    global _pool_size
+    _pool_size = max(1, size)
+
+
+def get_pool() -> Optional[MySQLConnectionPool]:
+    """Return the process-wide pool, creating it on first use. None when pooling is unavailable."""
+    global _pool, _pool_size
+    if _pool is not None or _pool_size is None:
+        return _pool
+    with _pool_lock:
+        if _pool is not None or _pool_size is None:
+            return _pool
+        try:
+            config = build_db_config()
+        except RuntimeError as exc:
+            logger.warning("MySQL pool disabled | %s", exc)
+            _pool_size = None
+            return None
+        try:
+            _pool = MySQLConnectionPool(pool_name="aslagent", pool_size=_pool_size, **config)
+        except Error as exc:  # pragma: no cover - requires live DB
+            logger.warning("MySQL pool unavailable | unable to connect: %s", exc)
+            return None
+        logger.info("MySQL pool ready | size=%d | host=%s", _pool_size, config["host"])
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool, _pool_size, _replica_router, _replica_router_built
+    with _pool_lock:
+        _pool_size = None
+        router, _replica_router = _replica_router, None
+        # Rebuilt on next use (e.g. a later lifespan in the same process), with the pool size then set.
+        _replica_router_built = False
+        if router is not None:
+            router.close()
+        if _pool is None:
+            return
+        # Idle connections are closed here; checked-out ones close when returned.
+        _pool._remove_connections()
+        _pool = None
+
+
+def replica_configs() -> List[Dict[str, Any]]:
+    """Connection settings for DB_REPLICA_HOSTS ("host[:port],..."); credentials match the primary."""
+    hosts = [entry.strip() for entry in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if entry.strip()]
+    if not hosts:
+        return []
+    base = build_db_config()
+    configs = []
+    for entry in hosts:
+        host, _, port = entry.partition(":")
+        configs.append({**base, "host": host, "port": int(port or base["port"])})
+    return configs
+
+
+class ReplicaRouter:
+    """Routes read-only queries to replicas that are within the staleness tolerance.
+
+    Replica lag is sampled from SHOW REPLICA STATUS at most every `lag_check_interval` seconds.
+    Callers that recently wrote pass the time of that write (`last_write`, wall clock, carried by
+    the client; see app.api.consistency): only replicas known to have replayed past it qualify,
+    so clients see their own writes whichever worker served them.
+    """
+
+    def __init__(
+        self,
+        configs: List[Dict[str, Any]],
+        max_lag_seconds: float = 5.0,
+        lag_check_interval: float = 2.0,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        self.configs = configs
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.pool_size = pool_size
+        self._pools: Dict[int, MySQLConnectionPool] = {}
+        self._lag: Dict[int, Tuple[float, Optional[float]]] = {}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def _usable(self, checked: Tuple[float, Optional[float]], last_write: Optional[float]) -> bool:
+        """Whether a lag sample (monotonic time, lag) allows reading after a write at `last_write`."""
+        checked_at, lag = checked
+        if lag is None or lag > self.max_lag_seconds:
+            return False
+        if last_write is None:
+            return True
+        # At the sample the replica had applied everything committed `lag` seconds earlier, and it
+        # only moves forward. Seconds_Behind_Source is whole seconds, hence the extra second.
+        replayed_until = time.time() - (time.monotonic() - checked_at) - lag - 1.0
+        return replayed_until >= last_write
+
+    def _open(self, index: int):
+        config = self.configs[index]
+        if self.pool_size is None:
+            return mysql.connector.connect(**config)
+        with self._lock:
+            pool = self._pools.get(index)
+            if pool is None:
+                pool = MySQLConnectionPool(pool_name=f"aslagent-replica-{index}", pool_size=self.pool_size, **config)
+                self._pools[index] = pool
+        try:
+            return pool.get_connection()
+        except PoolError:
+            return mysql.connector.connect(**config)
+
+    @staticmethod
+    def measure_lag(connection) -> Optional[float]:
+        """Seconds behind the primary; 0 for a standalone server, None if replication is broken."""
+        cursor = connection.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error:  # MySQL < 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+            row = cursor.fetchone()
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        if not row:
+            return 0.0
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return float(lag) if lag is not None else None
+
+    def _fresh_enough(self, index: int, connection, last_write: Optional[float]) -> bool:
+        now = time.monotonic()
+        checked = self._lag.get(index)
+        if checked is None or now - checked[0] >= self.lag_check_interval:
+            try:
+                lag = self.measure_lag(connection)
+            except Error as exc:
+                logger.warning("Replica lag check failed | replica=%s | %s", self.configs[index]["host"], exc)
+                lag = None
+            checked = (now, lag)
+            self._lag[index] = checked
+        return self._usable(checked, last_write)
+
+    def connect_reader(self, last_write: Optional[float] = None):
+        """A connection to a replica that is up to date (and past `last_write`), or None for the primary."""
+        start = next(self._order)
+        for offset in range(len(self.configs)):
+            index = (start + offset) % len(self.configs)
+            checked = self._lag.get(index)
+            if checked is not None and time.monotonic() - checked[0] < self.lag_check_interval:
+                if not self._usable(checked, last_write):
+                    continue  # known to be stale; skip without opening a connection
+            try:
+                connection = self._open(index)
+            except Error as exc:
+                logger.warning("Replica unavailable | replica=%s | %s", self.configs[index]["host"], exc)
+                self._lag[index] = (time.monotonic(), None)
+                continue
+            if self._fresh_enough(index, connection, last_write):
+                return connection
+            connection.close()
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool._remove_connections()
+
+
+_replica_router: Optional[ReplicaRouter] = None
+_replica_router_built = False
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    """Process-wide router, or None when no DB_REPLICA_HOSTS are configured."""
+    global _replica_router, _replica_router_built
+    if _replica_router is not None or _replica_router_built:
+        return _replica_router
+    with _pool_lock:
+        if not _replica_router_built:
+            configs = replica_configs()
+            if configs:
+                max_lag = float(os.environ.get("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+                _replica_router = ReplicaRouter(configs, max_lag_seconds=max_lag, pool_size=_pool_size)
+                logger.info("MySQL replicas enabled | count=%d | max_lag=%.1fs", len(configs), max_lag)
+            _replica_router_built = True
+    return _replica_router
 
 
 class MySQLService:
     """Base helper that manages connections to the MySQL database."""
 
-    def __init__(self) -> None:
+    # Appended to a SELECT that must lock the rows it reads until commit.
+    LOCK_ROWS = " FOR UPDATE"
+    # INSERT that skips rows whose key already exists (rowcount 0) instead of failing.
+    INSERT_IGNORE = "INSERT IGNORE"
+
+    @staticmethod
+    def upsert_clause(key_columns: List[str], update_columns: List[str]) -> str:
+        """Conflict clause for an INSERT that updates `update_columns` when the key exists."""
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(f"{column} = VALUES({column})" for column in update_columns)
+
+    @staticmethod
+    def increment_clause(key_columns: List[str], counter_columns: List[str]) -> str:
+        """Conflict clause for an INSERT that adds to `counter_columns` when the key exists."""
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{column} = {column} + VALUES({column})" for column in counter_columns
+        )
+
+    def __init__(self, read_replica: bool = False, last_write: Optional[float] = None) -> None:
         self.db_config = self._build_db_config()
-        self.connection = self._connect()
+        # Opt-in: read-only queries may go to a replica (see read_cursor), and the primary is then
+        # only connected if needed. Services used inside a compose keep the default so their
+        # reads and writes stay on the primary. `last_write` is the caller's last write, if recent.
+        self.read_replica = read_replica
+        self.last_write = last_write
+        self.connection = None if read_replica else self._connect()
+        self._replica_connection = None
 
     def _build_db_config(self) -> Dict[str, Any]:
-        config = {
-            "host": os.environ.get("DB_HOST"),
-            "user": os.environ.get("DB_USER"),
-            "password": os.environ.get("DB_PASSWORD"),
-            "database": os.environ.get("DB_NAME"),
-            "port": int(os.environ.get("DB_PORT", "3306")),
-        }
-
-        missing = [key for key, value in config.items() if value in (None, "")]
-        if missing:
-            joined = ", ".join(missing)
-            raise RuntimeError(
-                f"Missing MySQL environment variables: {joined}. "
-                "Set DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, and optionally DB_PORT."
-            )
-
-        return config
+        return build_db_config()
 
     def _connect(self):
+        pool = get_pool()
+        if pool is not None:
+            try:
+                return pool.get_connection()
+            except PoolError:
+                # Pool exhausted: fall back to a dedicated connection rather than failing the request.
+                logger.debug("MySQL pool exhausted; opening a dedicated connection")
+            except Error as exc:  # pragma: no cover - requires live DB
+                raise RuntimeError(f"Unable to connect to MySQL: {exc}") from exc
         try:
             return mysql.connector.connect(**self.db_config)
         except Error as exc:  # pragma: no cover - requires live DB
@@ -44,6 +280,20 @@ class MySQLService:
             self.connection = self._connect()
         return self.connection.cursor(dictionary=True)
 
+    def read_cursor(self):
+        """Cursor for a read-only query: a fresh-enough replica when allowed, else the primary."""
+        router = get_replica_router() if self.read_replica else None
+        if router is None:
+            return self.cursor()
+        if self._replica_connection is None or not self._replica_connection.is_connected():
+            self._replica_connection = router.connect_reader(self.last_write)
+            if self._replica_connection is None:
+                return self.cursor()
+        return self._replica_connection.cursor(dictionary=True)
+
     def close_connection(self) -> None:
+        # For pooled connections close() hands the connection back to the pool.
         if self.connection and self.connection.is_connected():
             self.connection.close()
+        if self._replica_connection is not None and self._replica_connection.is_connected():
+            self._replica_connection.close()
@@ -35,7 +35,7 @@ class ExpressionRuleMySQLService(MySQLService):
             query += " WHERE " + " AND ".join(clauses)
         query += " ORDER BY updated_at DESC"
 
-        cursor = self.cursor()
+        cursor = self.read_cursor()
         try:
             cursor.execute(query, params)
             rows = cursor.fetchall()
@@ -44,7 +44,7 @@ class ExpressionRuleMySQLService(MySQLService):
             cursor.close()
 
     def get(self, rule_id: UUID) -> Optional[ExpressionRuleRead]:
-        cursor = self.cursor()
+        cursor = self.read_cursor()
         try:
             cursor.execute("SELECT * FROM expression_rules WHERE id = %s", (str(rule_id),))
             row = cursor.fetchone()
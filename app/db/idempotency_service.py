@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from mysql.connector import Error
+
+from .base import MySQLService
+
+
+class IdempotencyMySQLService(MySQLService):
+    """Stored responses of requests sent with an Idempotency-Key (idempotency_keys table)."""
+
+    def claim(self, scope: str, key: str, fingerprint: str, lease_until: datetime) -> Optional[Dict[str, Any]]:
+        """Reserve `key` for a new attempt; None when reserved, else the live row holding it."""
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "DELETE FROM idempotency_keys WHERE scope = %s AND idem_key = %s AND expires_at <= %s",
+                (scope, key, datetime.utcnow()),
+            )
+            cursor.execute(
+                f"{self.INSERT_IGNORE} INTO idempotency_keys (scope, idem_key, fingerprint, expires_at) "
+                "VALUES (%s, %s, %s, %s)",
+                (scope, key, fingerprint, lease_until),
+            )
+            row = None
+            if cursor.rowcount <= 0:
+                cursor.execute(
+                    "SELECT fingerprint, status_code, response_body, expires_at FROM idempotency_keys "
+                    "WHERE scope = %s AND idem_key = %s",
+                    (scope, key),
+                )
+                row = cursor.fetchone()
+            self.connection.commit()
+            return row
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to claim idempotency key: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def complete(self, scope: str, key: str, status_code: int, response_body: str, expires_at: datetime) -> None:
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "UPDATE idempotency_keys SET status_code = %s, response_body = %s, expires_at = %s "
+                "WHERE scope = %s AND idem_key = %s",
+                (status_code, response_body, expires_at, scope, key),
+            )
+            self.connection.commit()
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to store idempotent response: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def release(self, scope: str, key: str) -> None:
+        """Drop an unfinished reservation so a retry runs the request again."""
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "DELETE FROM idempotency_keys WHERE scope = %s AND idem_key = %s AND status_code IS NULL",
+                (scope, key),
+            )
+            self.connection.commit()
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to release idempotency key: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def purge_expired(self) -> int:
+        cursor = self.cursor()
+        try:
+            cursor.execute("DELETE FROM idempotency_keys WHERE expires_at <= %s", (datetime.utcnow(),))
+            purged = cursor.rowcount
+            self.connection.commit()
+            return purged
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to purge idempotency keys: {exc}") from exc
+        finally:
+            cursor.close()
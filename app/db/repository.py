@@ -0,0 +1,230 @@
+"""Storage interfaces and the DB_BACKEND switch.
+
+Callers obtain services through the factories below and depend only on these protocols, so the
+same code runs on MySQL (default) or the embedded SQLite backend (DB_BACKEND=sqlite).
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+from uuid import UUID
+
+from app.models.expression_rule import ExpressionRuleCreate, ExpressionRuleRead, ExpressionRuleUpdate
+from app.models.translation_session import (
+    TranslationSessionCreate,
+    TranslationSessionRead,
+    TranslationSessionUpdate,
+)
+
+
+class TranslationSessionRepository(Protocol):
+    def list(
+        self, detected_emotion: Optional[str] = None, detected_intent: Optional[str] = None
+    ) -> List[TranslationSessionRead]: ...
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        detected_emotion: Optional[str] = None,
+        detected_intent: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[TranslationSessionRead, float]]: ...
+
+    def get(self, session_id: UUID, include_artifacts: bool = False) -> Optional[TranslationSessionRead]: ...
+
+    def get_artifacts(self, session_id: UUID) -> Optional[Dict[str, Any]]: ...
+
+    def create(self, payload: TranslationSessionCreate) -> TranslationSessionRead: ...
+
+    def get_many(self, session_ids: Sequence[UUID]) -> Dict[str, TranslationSessionRead]: ...
+
+    def update(self, session_id: UUID, payload: TranslationSessionUpdate) -> Optional[TranslationSessionRead]: ...
+
+    def update_many(self, updates: Sequence[Tuple[UUID, TranslationSessionUpdate]]) -> List[str]: ...
+
+    def save_summary(
+        self,
+        session_id: UUID,
+        summary_text: str,
+        summary_topics: List[str],
+        summary_action_items: List[str],
+        checkpoint: int,
+        expected_checkpoint: int,
+    ) -> bool: ...
+
+    def move_tts_artifacts(
+        self, after_id: str, limit: int, dry_run: bool = False
+    ) -> Tuple[Optional[str], int, int]: ...
+
+    def phrase_pairs(self, after_id: str, limit: int) -> Tuple[Optional[str], List[Dict[str, Any]]]: ...
+
+    def delete(self, session_id: UUID) -> bool: ...
+
+    def close_connection(self) -> None: ...
+
+
+class ExpressionRuleRepository(Protocol):
+    def list(self, emotion: Optional[str] = None, intent: Optional[str] = None) -> List[ExpressionRuleRead]: ...
+
+    def get(self, rule_id: UUID) -> Optional[ExpressionRuleRead]: ...
+
+    def create(self, payload: ExpressionRuleCreate) -> ExpressionRuleRead: ...
+
+    def update(self, rule_id: UUID, payload: ExpressionRuleUpdate) -> Optional[ExpressionRuleRead]: ...
+
+    def delete(self, rule_id: UUID) -> bool: ...
+
+    def close_connection(self) -> None: ...
+
+
+class UserPreferenceRepository(Protocol):
+    def get(self, user_id: str) -> Dict[str, str]: ...
+
+    def upsert(self, user_id: str, preferred_words: Dict[str, str]) -> None: ...
+
+    def delete(self, user_id: str, gloss: str) -> bool: ...
+
+    def close_connection(self) -> None: ...
+
+
+class SessionArchiveRepository(Protocol):
+    def count_expired(self, cutoff: datetime) -> int: ...
+
+    def fetch_expired(self, cutoff: datetime, limit: int) -> List[TranslationSessionRead]: ...
+
+    def mark_archived(self, records: List[TranslationSessionRead], paths: Dict[str, str], cutoff: datetime) -> int: ...
+
+    def archive_path(self, session_id: UUID) -> Optional[str]: ...
+
+    def close_connection(self) -> None: ...
+
+
+class SessionAnalyticsRepository(Protocol):
+    def distribution(
+        self,
+        group_by: Sequence[str],
+        bucket: Optional[str] = None,
+        user_id: Optional[str] = None,
+        detected_emotion: Optional[str] = None,
+        detected_intent: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def close_connection(self) -> None: ...
+
+
+class IdempotencyRepository(Protocol):
+    def claim(self, scope: str, key: str, fingerprint: str, lease_until: datetime) -> Optional[Dict[str, Any]]: ...
+
+    def complete(self, scope: str, key: str, status_code: int, response_body: str, expires_at: datetime) -> None: ...
+
+    def release(self, scope: str, key: str) -> None: ...
+
+    def purge_expired(self) -> int: ...
+
+    def close_connection(self) -> None: ...
+
+
+def database_backend() -> str:
+    """"mysql" (default) or "sqlite"."""
+    backend = os.environ.get("DB_BACKEND", "mysql").strip().lower()
+    if backend not in {"mysql", "sqlite"}:
+        raise RuntimeError(f"Unsupported DB_BACKEND '{backend}'; use 'mysql' or 'sqlite'.")
+    return backend
+
+
+def translation_session_repository(read_replica: bool = False, last_write: Optional[float] = None) -> TranslationSessionRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import TranslationSessionSQLiteService
+
+        return TranslationSessionSQLiteService()
+    from .translation_session_service import TranslationSessionMySQLService
+
+    return TranslationSessionMySQLService(read_replica=read_replica, last_write=last_write)
+
+
+def expression_rule_repository(read_replica: bool = False, last_write: Optional[float] = None) -> ExpressionRuleRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import ExpressionRuleSQLiteService
+
+        return ExpressionRuleSQLiteService()
+    from .expression_rule_service import ExpressionRuleMySQLService
+
+    return ExpressionRuleMySQLService(read_replica=read_replica, last_write=last_write)
+
+
+def user_preference_repository() -> UserPreferenceRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import UserPreferenceSQLiteService
+
+        return UserPreferenceSQLiteService()
+    from .user_preference_service import UserPreferenceMySQLService
+
+    return UserPreferenceMySQLService()
+
+
+def session_archive_repository() -> SessionArchiveRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import SessionArchiveSQLiteService
+
+        return SessionArchiveSQLiteService()
+    from .session_archive_service import SessionArchiveMySQLService
+
+    return SessionArchiveMySQLService()
+
+
+def session_analytics_repository(read_replica: bool = False) -> SessionAnalyticsRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import SessionAnalyticsSQLiteService
+
+        return SessionAnalyticsSQLiteService()
+    from .analytics_service import SessionAnalyticsMySQLService
+
+    return SessionAnalyticsMySQLService(read_replica=read_replica)
+
+
+def idempotency_repository() -> IdempotencyRepository:
+    if database_backend() == "sqlite":
+        from .sqlite import IdempotencySQLiteService
+
+        return IdempotencySQLiteService()
+    from .idempotency_service import IdempotencyMySQLService
+
+    return IdempotencyMySQLService()
+
+
+def configure_backend(pool_size: int) -> None:
+    """Called by the worker lifespan; records the pool size without connecting."""
+    if database_backend() == "mysql":
+        from .base import enable_pool
+
+        enable_pool(pool_size)
+
+
+def prepare_backend() -> bool:
+    """Open the connection pool (MySQL) or the database file (SQLite). False if unavailable."""
+    if database_backend() == "sqlite":
+        from .sqlite import ensure_schema, sqlite_path
+
+        ensure_schema(sqlite_path())
+        return True
+    from .base import get_pool
+
+    return get_pool() is not None
+
+
+def close_backend() -> None:
+    if database_backend() == "sqlite":
+        from .sqlite import close_all
+
+        close_all()
+        return
+    from .base import close_pool
+
+    close_pool()
@@ -8,13 +8,24 @@ import mysql.connector
 from mysql.connector import Error
 
 from schema_sql import (
+    COLUMN_MIGRATIONS,
     DEFAULT_DB_NAME,
     DEFAULT_DB_PASSWORD,
     DEFAULT_DB_USER,
     EXPRESSION_RULES_SEED_SQL,
     EXPRESSION_RULES_TABLE_SQL,
+    IDEMPOTENCY_KEYS_TABLE_SQL,
+    INDEX_MIGRATIONS,
+    SESSION_ARCHIVE_INDEX_TABLE_SQL,
+    SESSION_ROLLUPS_BACKFILL_SQL,
+    SESSION_ROLLUPS_CLEAR_SQL,
+    SESSION_ROLLUPS_TABLE_SQL,
+    TRANSLATION_SESSION_ARTIFACTS_TABLE_SQL,
     TRANSLATION_SESSIONS_SEED_SQL,
     TRANSLATION_SESSIONS_TABLE_SQL,
+    USER_PREFERRED_WORDS_BACKFILL_SQL,
+    USER_PREFERRED_WORDS_TABLE_NAME,
+    USER_PREFERRED_WORDS_TABLE_SQL,
 )
 
 
@@ -72,15 +83,76 @@ def create_database_and_user(args: argparse.Namespace) -> None:
 def create_tables(args: argparse.Namespace) -> None:
     conn = connect(args.host, args.port, args.root_user, args.root_password, args.db_name)
     try:
-        run_statements(conn, [EXPRESSION_RULES_TABLE_SQL, TRANSLATION_SESSIONS_TABLE_SQL])
+        run_statements(
+            conn,
+            [
+                EXPRESSION_RULES_TABLE_SQL,
+                TRANSLATION_SESSIONS_TABLE_SQL,
+                TRANSLATION_SESSION_ARTIFACTS_TABLE_SQL,
+                USER_PREFERRED_WORDS_TABLE_SQL,
+                SESSION_ARCHIVE_INDEX_TABLE_SQL,
+                SESSION_ROLLUPS_TABLE_SQL,
+                IDEMPOTENCY_KEYS_TABLE_SQL,
+            ],
+        )
+    finally:
+        conn.close()
+
+
+def migrate_tables(args: argparse.Namespace) -> None:
+    """Add columns and indexes introduced after a database was first bootstrapped."""
+    conn = connect(args.host, args.port, args.root_user, args.root_password, args.db_name)
+    cursor = conn.cursor()
+    try:
+        for table, column, definition in COLUMN_MIGRATIONS:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                (args.db_name, table, column),
+            )
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN {definition}")
+        for table, index, definition in INDEX_MIGRATIONS:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s",
+                (args.db_name, table, index),
+            )
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"ALTER TABLE `{table}` ADD {definition}")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def backfill_tables(args: argparse.Namespace) -> None:
+    """Fill tables derived from translation_sessions; runs on every bootstrap, before the app writes."""
+    conn = connect(args.host, args.port, args.root_user, args.root_password, args.db_name)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT 1 FROM {USER_PREFERRED_WORDS_TABLE_NAME} LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute(USER_PREFERRED_WORDS_BACKFILL_SQL)
+        # Clear and recount in one transaction; the recount replaces rows, so repeating it is safe.
+        cursor.execute(SESSION_ROLLUPS_CLEAR_SQL)
+        cursor.execute(SESSION_ROLLUPS_BACKFILL_SQL)
+        conn.commit()
     finally:
+        cursor.close()
         conn.close()
 
 
 def seed_tables(args: argparse.Namespace) -> None:
     conn = connect(args.host, args.port, args.root_user, args.root_password, args.db_name)
     try:
-        run_statements(conn, [EXPRESSION_RULES_SEED_SQL, TRANSLATION_SESSIONS_SEED_SQL])
+        run_statements(
+            conn,
+            [
+                EXPRESSION_RULES_SEED_SQL,
+                TRANSLATION_SESSIONS_SEED_SQL,
+            ],
+        )
     finally:
         conn.close()
 
@@ -91,8 +163,10 @@ def main() -> int:
     try:
         create_database_and_user(args)
         create_tables(args)
+        migrate_tables(args)
         if not args.skip_seed:
             seed_tables(args)
+        backfill_tables(args)
     except Error as exc:
         print(f"MySQL error: {exc}")
         return 1
@@ -6,6 +6,11 @@ DEFAULT_DB_PASSWORD = "changeme"
 
 EXPRESSION_RULES_TABLE_NAME = "expression_rules"
 TRANSLATION_SESSIONS_TABLE_NAME = "translation_sessions"
+USER_PREFERRED_WORDS_TABLE_NAME = "user_preferred_words"
+TRANSLATION_SESSION_ARTIFACTS_TABLE_NAME = "translation_session_artifacts"
+SESSION_ARCHIVE_INDEX_TABLE_NAME = "translation_session_archive_index"
+SESSION_ROLLUPS_TABLE_NAME = "translation_session_rollups"
+IDEMPOTENCY_KEYS_TABLE_NAME = "idempotency_keys"
 
 EXPRESSION_RULES_TABLE_SQL = f"""
 CREATE TABLE IF NOT EXISTS {EXPRESSION_RULES_TABLE_NAME} (
@@ -41,14 +46,137 @@ CREATE TABLE IF NOT EXISTS {TRANSLATION_SESSIONS_TABLE_NAME} (
     summary_text TEXT NULL,
     summary_topics JSON NOT NULL,
     summary_action_items JSON NOT NULL,
+    summary_checkpoint INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_sessions_emotion (detected_emotion),
     INDEX idx_sessions_intent (detected_intent),
-    INDEX idx_sessions_user (user_id)
+    INDEX idx_sessions_user (user_id),
+    INDEX idx_sessions_updated (updated_at),
+    FULLTEXT INDEX ft_sessions_text (input_text, adjusted_text, context)
 );
 """
 
+# Heavy per-utterance TTS payloads (visemes, timings, inline audio) as zlib-compressed JSON,
+# split out of translation_sessions.tts_metadata so listing and updating sessions stays cheap.
+TRANSLATION_SESSION_ARTIFACTS_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TRANSLATION_SESSION_ARTIFACTS_TABLE_NAME} (
+    session_id CHAR(36) PRIMARY KEY,
+    tts_artifacts MEDIUMBLOB NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_artifacts_session FOREIGN KEY (session_id)
+        REFERENCES {TRANSLATION_SESSIONS_TABLE_NAME} (id) ON DELETE CASCADE
+);
+"""
+
+# Where each archived session was written (see app.services.retention); the session row itself
+# is deleted from translation_sessions.
+SESSION_ARCHIVE_INDEX_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SESSION_ARCHIVE_INDEX_TABLE_NAME} (
+    session_id CHAR(36) PRIMARY KEY,
+    user_id VARCHAR(64) NULL,
+    archive_path VARCHAR(512) NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_archive_user (user_id)
+);
+"""
+
+# Hourly session counts per (user, emotion, intent), kept in step with translation_sessions by
+# every create/update/delete so the analytics endpoint never scans sessions. user_key is '' for
+# sessions without a user_id. Archived sessions stay counted.
+SESSION_ROLLUPS_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SESSION_ROLLUPS_TABLE_NAME} (
+    bucket_start DATETIME NOT NULL,
+    user_key VARCHAR(64) NOT NULL DEFAULT '',
+    detected_emotion VARCHAR(50) NOT NULL,
+    detected_intent VARCHAR(50) NOT NULL,
+    session_count INT NOT NULL DEFAULT 0,
+    confidence_sum DOUBLE NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, user_key, detected_emotion, detected_intent),
+    INDEX idx_rollups_user (user_key, bucket_start)
+);
+"""
+
+# Responses of requests sent with an Idempotency-Key (see app.services.idempotency). A row with a
+# NULL status_code is a request still in progress; its expires_at is the lease of that attempt.
+IDEMPOTENCY_KEYS_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {IDEMPOTENCY_KEYS_TABLE_NAME} (
+    scope VARCHAR(64) NOT NULL,
+    idem_key VARCHAR(255) NOT NULL,
+    fingerprint CHAR(64) NOT NULL,
+    status_code SMALLINT NULL,
+    response_body MEDIUMTEXT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (scope, idem_key),
+    INDEX idx_idempotency_expires (expires_at)
+);
+"""
+
+# Columns added after the first release: (table, column, ADD COLUMN definition). The bootstrap
+# applies the ones missing from an existing database.
+COLUMN_MIGRATIONS = [
+    (TRANSLATION_SESSIONS_TABLE_NAME, "summary_checkpoint", "summary_checkpoint INT NOT NULL DEFAULT 0 AFTER summary_action_items"),
+]
+
+# Indexes added after the first release: (table, index name, ADD definition).
+INDEX_MIGRATIONS = [
+    (TRANSLATION_SESSIONS_TABLE_NAME, "idx_sessions_updated", "INDEX idx_sessions_updated (updated_at)"),
+    (
+        TRANSLATION_SESSIONS_TABLE_NAME,
+        "ft_sessions_text",
+        "FULLTEXT INDEX ft_sessions_text (input_text, adjusted_text, context)",
+    ),
+]
+
+USER_PREFERRED_WORDS_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {USER_PREFERRED_WORDS_TABLE_NAME} (
+    user_id VARCHAR(64) NOT NULL,
+    gloss VARCHAR(128) NOT NULL,
+    preferred_word VARCHAR(255) NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, gloss)
+);
+"""
+
+# Folds the preferred_words of every existing session into the per-user table; newer sessions win.
+# The bootstrap runs it only while the table is empty: later, it would bring back words users deleted.
+USER_PREFERRED_WORDS_BACKFILL_SQL = f"""
+INSERT INTO {USER_PREFERRED_WORDS_TABLE_NAME} (user_id, gloss, preferred_word)
+SELECT s.user_id, jt.gloss, JSON_UNQUOTE(JSON_EXTRACT(s.preferred_words, CONCAT('$."', jt.gloss, '"')))
+FROM {TRANSLATION_SESSIONS_TABLE_NAME} s,
+     JSON_TABLE(JSON_KEYS(s.preferred_words), '$[*]' COLUMNS (gloss VARCHAR(128) PATH '$')) jt
+WHERE s.user_id IS NOT NULL
+ORDER BY s.updated_at
+ON DUPLICATE KEY UPDATE preferred_word = VALUES(preferred_word);
+"""
+
+# Recounts translation_session_rollups from translation_sessions on every bootstrap, before the app
+# writes: sessions from before the table existed get counted, and rows the app skewed by moving such
+# sessions out of a bucket (negative counts) are replaced. Hours holding archived sessions are left
+# alone, since those sessions are gone from translation_sessions but stay counted.
+_UNARCHIVED_HOUR = f"""NOT EXISTS (
+    SELECT 1 FROM {SESSION_ARCHIVE_INDEX_TABLE_NAME} a
+    WHERE a.created_at >= {{alias}}.bucket_start AND a.created_at < {{alias}}.bucket_start + INTERVAL 1 HOUR
+)"""
+SESSION_ROLLUPS_CLEAR_SQL = f"""
+DELETE r FROM {SESSION_ROLLUPS_TABLE_NAME} r
+WHERE {_UNARCHIVED_HOUR.format(alias="r")};
+"""
+SESSION_ROLLUPS_BACKFILL_SQL = f"""
+INSERT INTO {SESSION_ROLLUPS_TABLE_NAME} (bucket_start, user_key, detected_emotion, detected_intent, session_count, confidence_sum)
+SELECT s.bucket_start, s.user_key, s.detected_emotion, s.detected_intent, COUNT(*), SUM(s.compose_confidence)
+FROM (
+    SELECT CAST(DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00') AS DATETIME) AS bucket_start,
+           COALESCE(user_id, '') AS user_key, detected_emotion, detected_intent, compose_confidence
+    FROM {TRANSLATION_SESSIONS_TABLE_NAME}
+) s
+WHERE {_UNARCHIVED_HOUR.format(alias="s")}
+GROUP BY 1, 2, 3, 4
+ON DUPLICATE KEY UPDATE session_count = VALUES(session_count), confidence_sum = VALUES(confidence_sum);
+"""
+
 EXPRESSION_RULES_SEED_SQL = f"""
 INSERT INTO {EXPRESSION_RULES_TABLE_NAME} (id, emotion, intent, punctuation_adjustment, tts_tone, confidence_threshold)
 VALUES
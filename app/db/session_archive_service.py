@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from mysql.connector import Error
+
+from app.models.translation_session import TranslationSessionRead
+from .translation_session_service import ARTIFACTS_MARKER, TranslationSessionMySQLService, decode_artifacts
+
+
+class SessionArchiveMySQLService(TranslationSessionMySQLService):
+    """Selects expired sessions and swaps them for translation_session_archive_index rows."""
+
+    def count_expired(self, cutoff: datetime) -> int:
+        cursor = self.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) AS total FROM translation_sessions WHERE updated_at < %s", (cutoff,))
+            return int(cursor.fetchone()["total"])
+        finally:
+            cursor.close()
+
+    def fetch_expired(self, cutoff: datetime, limit: int) -> List[TranslationSessionRead]:
+        """Oldest sessions last updated before `cutoff`, with their TTS artifacts merged back in."""
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "SELECT s.*, a.tts_artifacts FROM translation_sessions s "
+                "LEFT JOIN translation_session_artifacts a ON a.session_id = s.id "
+                "WHERE s.updated_at < %s ORDER BY s.updated_at, s.id LIMIT %s",
+                (cutoff, limit),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        records = []
+        for row in rows:
+            blob = row.pop("tts_artifacts", None)
+            record = self._row_to_model(row)
+            if blob:
+                tts_metadata = {key: value for key, value in record.tts_metadata.items() if key != ARTIFACTS_MARKER}
+                record.tts_metadata = {**tts_metadata, **decode_artifacts(blob)}
+            records.append(record)
+        return records
+
+    def mark_archived(self, records: List[TranslationSessionRead], paths: Dict[str, str], cutoff: datetime) -> int:
+        """Index the archived sessions and delete them from the hot table in one transaction.
+
+        Sessions updated after they were read (no longer older than `cutoff`) are left alone.
+        """
+        if not records:
+            return 0
+        by_id = {str(record.id): record for record in records}
+        placeholders = ", ".join(["%s"] * len(by_id))
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                f"SELECT id FROM translation_sessions WHERE id IN ({placeholders}) AND updated_at < %s" + self.LOCK_ROWS,
+                [*by_id, cutoff],
+            )
+            expired = [row["id"] for row in cursor.fetchall()]
+            if expired:
+                cursor.executemany(
+                    "INSERT INTO translation_session_archive_index (session_id, user_id, archive_path, created_at) "
+                    "VALUES (%s, %s, %s, %s) " + self.upsert_clause(["session_id"], ["archive_path"]),
+                    [(session_id, by_id[session_id].user_id, paths[session_id], by_id[session_id].created_at) for session_id in expired],
+                )
+                # translation_session_rollups is left alone: analytics keep counting archived sessions.
+                cursor.execute(
+                    f"DELETE FROM translation_sessions WHERE id IN ({', '.join(['%s'] * len(expired))})",
+                    expired,
+                )
+            self.connection.commit()
+            return len(expired)
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to archive translation sessions: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def archive_path(self, session_id: UUID) -> Optional[str]:
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "SELECT archive_path FROM translation_session_archive_index WHERE session_id = %s",
+                (str(session_id),),
+            )
+            row = cursor.fetchone()
+            return row["archive_path"] if row else None
+        finally:
+            cursor.close()
@@ -0,0 +1,364 @@
+"""Embedded SQLite backend (DB_BACKEND=sqlite) for tests, benchmarks and single-box deployments.
+
+The SQLite services reuse the SQL of the MySQL services. The connection wrapper below accepts
+`%s` placeholders and returns dict rows the way mysql.connector's dictionary cursor does, and
+only the upsert / row-locking clauses differ. The database runs in WAL mode, so readers never
+block the single writer. Each thread keeps one open connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mysql.connector import Error
+
+from app.models.translation_session import TranslationSessionRead
+
+from .analytics_service import SessionAnalyticsMySQLService
+from .expression_rule_service import ExpressionRuleMySQLService
+from .idempotency_service import IdempotencyMySQLService
+from .session_archive_service import SessionArchiveMySQLService
+from .translation_session_service import TranslationSessionMySQLService
+from .user_preference_service import UserPreferenceMySQLService
+
+logger = logging.getLogger(__name__)
+
+# Same tables as app/db/scripts/schema_sql.py; JSON columns are TEXT holding JSON documents.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expression_rules (
+    id TEXT PRIMARY KEY,
+    emotion TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    punctuation_adjustment TEXT NOT NULL,
+    tts_tone TEXT NOT NULL,
+    confidence_threshold REAL NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_emotion_intent ON expression_rules (emotion, intent);
+
+CREATE TABLE IF NOT EXISTS translation_sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NULL,
+    glosses TEXT NOT NULL,
+    letters TEXT NULL,
+    preferred_words TEXT NOT NULL,
+    context TEXT NULL,
+    input_text TEXT NOT NULL,
+    compose_confidence REAL NOT NULL,
+    compose_alternatives TEXT NOT NULL,
+    detected_emotion TEXT NOT NULL,
+    detected_intent TEXT NOT NULL,
+    emphasis TEXT NOT NULL,
+    adjusted_text TEXT NOT NULL,
+    tts_metadata TEXT NOT NULL,
+    tool_metadata TEXT NOT NULL,
+    summary_text TEXT NULL,
+    summary_topics TEXT NOT NULL,
+    summary_action_items TEXT NOT NULL,
+    summary_checkpoint INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_emotion ON translation_sessions (detected_emotion);
+CREATE INDEX IF NOT EXISTS idx_sessions_intent ON translation_sessions (detected_intent);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON translation_sessions (user_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON translation_sessions (updated_at);
+
+-- FTS5 counterpart of the ft_sessions_text FULLTEXT index, kept in sync by triggers. It refers to
+-- sessions by rowid, so rebuild it after a VACUUM:
+--   INSERT INTO translation_sessions_fts (translation_sessions_fts) VALUES ('rebuild');
+CREATE VIRTUAL TABLE IF NOT EXISTS translation_sessions_fts USING fts5(
+    input_text, adjusted_text, context, content='translation_sessions', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS translation_sessions_fts_insert AFTER INSERT ON translation_sessions BEGIN
+    INSERT INTO translation_sessions_fts (rowid, input_text, adjusted_text, context)
+    VALUES (new.rowid, new.input_text, new.adjusted_text, new.context);
+END;
+CREATE TRIGGER IF NOT EXISTS translation_sessions_fts_delete AFTER DELETE ON translation_sessions BEGIN
+    INSERT INTO translation_sessions_fts (translation_sessions_fts, rowid, input_text, adjusted_text, context)
+    VALUES ('delete', old.rowid, old.input_text, old.adjusted_text, old.context);
+END;
+CREATE TRIGGER IF NOT EXISTS translation_sessions_fts_update
+AFTER UPDATE OF input_text, adjusted_text, context ON translation_sessions BEGIN
+    INSERT INTO translation_sessions_fts (translation_sessions_fts, rowid, input_text, adjusted_text, context)
+    VALUES ('delete', old.rowid, old.input_text, old.adjusted_text, old.context);
+    INSERT INTO translation_sessions_fts (rowid, input_text, adjusted_text, context)
+    VALUES (new.rowid, new.input_text, new.adjusted_text, new.context);
+END;
+
+CREATE TABLE IF NOT EXISTS translation_session_artifacts (
+    session_id TEXT PRIMARY KEY REFERENCES translation_sessions (id) ON DELETE CASCADE,
+    tts_artifacts BLOB NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_preferred_words (
+    user_id TEXT NOT NULL,
+    gloss TEXT NOT NULL,
+    preferred_word TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, gloss)
+);
+
+CREATE TABLE IF NOT EXISTS translation_session_archive_index (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NULL,
+    archive_path TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_archive_user ON translation_session_archive_index (user_id);
+
+CREATE TABLE IF NOT EXISTS translation_session_rollups (
+    bucket_start TIMESTAMP NOT NULL,
+    user_key TEXT NOT NULL DEFAULT '',
+    detected_emotion TEXT NOT NULL,
+    detected_intent TEXT NOT NULL,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    confidence_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, user_key, detected_emotion, detected_intent)
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_user ON translation_session_rollups (user_key, bucket_start);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    idem_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status_code INTEGER NULL,
+    response_body TEXT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (scope, idem_key)
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency_keys (expires_at);
+"""
+
+# Stored as "YYYY-MM-DD HH:MM:SS[.ffffff]", which sorts and compares correctly as text.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+
+_local = threading.local()
+_lock = threading.Lock()
+_prepared: set = set()
+_connections: List[sqlite3.Connection] = []
+
+
+def sqlite_path() -> str:
+    return os.environ.get("SQLITE_PATH", "aslagent.db")
+
+
+def ensure_schema(path: str) -> None:
+    """Create the database file and tables once per process."""
+    with _lock:
+        if path in _prepared:
+            return
+        connection = sqlite3.connect(path)
+        try:
+            # WAL is a property of the database file, so setting it once is enough.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SQLITE_SCHEMA)
+            connection.commit()
+        finally:
+            connection.close()
+        _prepared.add(path)
+        logger.info("SQLite backend ready | path=%s", path)
+
+
+def _open(path: str) -> sqlite3.Connection:
+    ensure_schema(path)
+    connection = sqlite3.connect(
+        path, detect_types=sqlite3.PARSE_DECLTYPES, timeout=5.0, check_same_thread=False
+    )
+    connection.execute("PRAGMA foreign_keys=ON")
+    # With WAL, NORMAL only risks the last transactions on power loss, never corruption.
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with _lock:
+        _connections.append(connection)
+    return connection
+
+
+def connect(path: Optional[str] = None) -> "SQLiteConnection":
+    """The calling thread's connection to `path` (opened on first use)."""
+    path = path or sqlite_path()
+    cache: Dict[str, sqlite3.Connection] = getattr(_local, "connections", None) or {}
+    _local.connections = cache
+    raw = cache.get(path)
+    if raw is None:
+        raw = cache[path] = _open(path)
+    return SQLiteConnection(raw)
+
+
+def close_all() -> None:
+    with _lock:
+        connections = list(_connections)
+        _connections.clear()
+    for connection in connections:
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+    _local.connections = {}
+
+
+class SQLiteCursor:
+    """mysql.connector-style dictionary cursor over sqlite3."""
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self._cursor = cursor
+
+    @staticmethod
+    def _sql(query: str) -> str:
+        return query.replace("%s", "?")
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        try:
+            self._cursor.execute(self._sql(query), tuple(params or ()))
+        except sqlite3.Error as exc:
+            raise Error(msg=str(exc)) from exc
+
+    def executemany(self, query: str, seq_params) -> None:
+        try:
+            self._cursor.executemany(self._sql(query), [tuple(params) for params in seq_params])
+        except sqlite3.Error as exc:
+            raise Error(msg=str(exc)) from exc
+
+    def _as_dict(self, row) -> Dict[str, Any]:
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self) -> Optional[Dict[str, Any]]:
+        row = self._cursor.fetchone()
+        return self._as_dict(row) if row is not None else None
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        return [self._as_dict(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Per-thread connection handle; close() only ends any open transaction."""
+
+    def __init__(self, raw: sqlite3.Connection) -> None:
+        self._raw = raw
+
+    def cursor(self, dictionary: bool = True) -> SQLiteCursor:
+        return SQLiteCursor(self._raw.cursor())
+
+    def commit(self) -> None:
+        self._raw.commit()
+
+    def rollback(self) -> None:
+        self._raw.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        if self._raw.in_transaction:
+            self._raw.rollback()
+
+
+class SQLiteService:
+    """Mixin placed before a MySQL service class to run the same queries on SQLite."""
+
+    LOCK_ROWS = ""  # SQLite has a single writer; rows read in a write transaction cannot change
+    INSERT_IGNORE = "INSERT OR IGNORE"
+
+    @staticmethod
+    def upsert_clause(key_columns: List[str], update_columns: List[str]) -> str:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in update_columns)
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
+
+    @staticmethod
+    def increment_clause(key_columns: List[str], counter_columns: List[str]) -> str:
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in counter_columns)
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
+
+    def __init__(self, read_replica: bool = False, last_write: Optional[float] = None) -> None:
+        self.db_config = {"path": sqlite_path()}
+        self.read_replica = False
+        self.last_write = None
+        self._replica_connection = None
+
+    @property
+    def connection(self) -> SQLiteConnection:
+        # Resolved per call: services are often built on the event loop and used via to_thread.
+        return connect(self.db_config["path"])
+
+    def cursor(self):
+        return self.connection.cursor(dictionary=True)
+
+    def read_cursor(self):
+        return self.cursor()
+
+    def close_connection(self) -> None:
+        self.connection.close()
+
+
+class TranslationSessionSQLiteService(SQLiteService, TranslationSessionMySQLService):
+    """translation_sessions on SQLite."""
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        detected_emotion: Optional[str] = None,
+        detected_intent: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[TranslationSessionRead, float]]:
+        # FTS5 instead of MATCH ... AGAINST; relevance is the negated bm25 score (higher is better).
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        if phrase:
+            match = '"' + " ".join(terms) + '"'
+        else:
+            match = " OR ".join(f'"{term}"' for term in terms)
+        clauses, params = self._search_filters(detected_emotion, detected_intent, user_id, prefix="s.")
+        inner = (
+            "SELECT s.*, -bm25(translation_sessions_fts) AS relevance FROM translation_sessions_fts "
+            "JOIN translation_sessions s ON s.rowid = translation_sessions_fts.rowid "
+            "WHERE translation_sessions_fts MATCH %s" + "".join(f" AND {clause}" for clause in clauses)
+        )
+        sql = f"SELECT * FROM ({inner})"
+        values: List[Any] = [match, *params]
+        if after is not None:
+            sql += " WHERE relevance < %s OR (relevance = %s AND id > %s)"
+            values.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY relevance DESC, id LIMIT %s"
+        values.append(limit)
+        return self._search_rows(sql, values)
+
+
+class ExpressionRuleSQLiteService(SQLiteService, ExpressionRuleMySQLService):
+    """expression_rules on SQLite."""
+
+
+class UserPreferenceSQLiteService(SQLiteService, UserPreferenceMySQLService):
+    """user_preferred_words on SQLite."""
+
+
+class SessionArchiveSQLiteService(SQLiteService, SessionArchiveMySQLService):
+    """Retention queries on SQLite."""
+
+
+class SessionAnalyticsSQLiteService(SQLiteService, SessionAnalyticsMySQLService):
+    """Rollup queries on SQLite."""
+
+
+class IdempotencySQLiteService(SQLiteService, IdempotencyMySQLService):
+    """idempotency_keys on SQLite."""
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+import zlib
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from mysql.connector import Error
@@ -15,6 +16,48 @@ from app.models.translation_session import (
 from .base import MySQLService
 
 
+# Per-utterance TTS payloads (viseme tracks, timings, inline audio) live in the
+# translation_session_artifacts side table so the hot row stays small.
+HEAVY_TTS_KEYS = frozenset({"visemes", "viseme_timings", "word_timings", "audio_base64", "audio_data"})
+# Any other tts_metadata value whose JSON is larger than this is treated as heavy as well.
+HEAVY_TTS_VALUE_BYTES = 512
+# Key left in the row's tts_metadata listing what was moved out, e.g. {"artifacts": ["visemes"]}.
+ARTIFACTS_MARKER = "artifacts"
+
+# Columns counted in translation_session_rollups; changing any of them moves the session between
+# rollup rows.
+ROLLUP_COLUMNS = ("user_id", "detected_emotion", "detected_intent", "compose_confidence")
+
+
+def split_tts_metadata(tts_metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split tts_metadata into the part stored in the row and the heavy artifacts."""
+    light: Dict[str, Any] = {}
+    heavy: Dict[str, Any] = {}
+    for key, value in tts_metadata.items():
+        if key == ARTIFACTS_MARKER:
+            continue
+        if key in HEAVY_TTS_KEYS or len(json.dumps(value)) > HEAVY_TTS_VALUE_BYTES:
+            heavy[key] = value
+        else:
+            light[key] = value
+    if heavy:
+        light[ARTIFACTS_MARKER] = sorted(heavy)
+    return light, heavy
+
+
+def rollup_bucket(created_at: datetime) -> datetime:
+    """Hour a session is counted under in translation_session_rollups."""
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def encode_artifacts(artifacts: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(artifacts, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_artifacts(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
 class TranslationSessionMySQLService(MySQLService):
     """CRUD operations for the translation_sessions table."""
 
@@ -63,7 +106,7 @@ class TranslationSessionMySQLService(MySQLService):
             query += " WHERE " + " AND ".join(clauses)
         query += " ORDER BY updated_at DESC"
 
-        cursor = self.cursor()
+        cursor = self.read_cursor()
         try:
             cursor.execute(query, params)
             rows = cursor.fetchall()
@@ -71,18 +114,140 @@ class TranslationSessionMySQLService(MySQLService):
         finally:
             cursor.close()
 
-    def get(self, session_id: UUID) -> Optional[TranslationSessionRead]:
-        cursor = self.cursor()
+    @staticmethod
+    def _search_filters(
+        detected_emotion: Optional[str], detected_intent: Optional[str], user_id: Optional[str], prefix: str = ""
+    ) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("detected_emotion", detected_emotion), ("detected_intent", detected_intent), ("user_id", user_id)):
+            if value:
+                clauses.append(f"{prefix}{column} = %s")
+                params.append(value)
+        return clauses, params
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        detected_emotion: Optional[str] = None,
+        detected_intent: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[TranslationSessionRead, float]]:
+        """Sessions whose input_text, adjusted_text or context match `query`, best first.
+
+        Uses the ft_sessions_text FULLTEXT index: natural-language mode for words, boolean mode
+        for an exact phrase. `after` is the (relevance, id) of the last hit of the previous page.
+        """
+        if phrase:
+            against, mode = '"' + query.replace('"', " ") + '"', "IN BOOLEAN MODE"
+        else:
+            against, mode = query, "IN NATURAL LANGUAGE MODE"
+        match = f"MATCH(input_text, adjusted_text, context) AGAINST (%s {mode})"
+        clauses, params = self._search_filters(detected_emotion, detected_intent, user_id)
+        sql = f"SELECT *, {match} AS relevance FROM translation_sessions WHERE {match}"
+        sql += "".join(f" AND {clause}" for clause in clauses)
+        values: List[Any] = [against, against, *params]
+        if after is not None:
+            # HAVING can use the alias, so MATCH() is evaluated once per candidate row.
+            sql += " HAVING relevance < %s OR (relevance = %s AND id > %s)"
+            values.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY relevance DESC, id LIMIT %s"
+        values.append(limit)
+        return self._search_rows(sql, values)
+
+    def _search_rows(self, sql: str, values: List[Any]) -> List[Tuple[TranslationSessionRead, float]]:
+        cursor = self.read_cursor()
+        try:
+            cursor.execute(sql, values)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        hits = []
+        for row in rows:
+            relevance = float(row.pop("relevance"))
+            hits.append((self._row_to_model(row), relevance))
+        return hits
+
+    def get(self, session_id: UUID, include_artifacts: bool = False) -> Optional[TranslationSessionRead]:
+        cursor = self.read_cursor()
         try:
             cursor.execute("SELECT * FROM translation_sessions WHERE id = %s", (str(session_id),))
             row = cursor.fetchone()
-            return self._row_to_model(row) if row else None
+            if not row:
+                return None
+            record = self._row_to_model(row)
+        finally:
+            cursor.close()
+
+        if include_artifacts and ARTIFACTS_MARKER in record.tts_metadata:
+            artifacts = self.get_artifacts(session_id) or {}
+            tts_metadata = {key: value for key, value in record.tts_metadata.items() if key != ARTIFACTS_MARKER}
+            record.tts_metadata = {**tts_metadata, **artifacts}
+        return record
+
+    def get_artifacts(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        cursor = self.read_cursor()
+        try:
+            cursor.execute(
+                "SELECT tts_artifacts FROM translation_session_artifacts WHERE session_id = %s",
+                (str(session_id),),
+            )
+            row = cursor.fetchone()
+            return decode_artifacts(row["tts_artifacts"]) if row else None
         finally:
             cursor.close()
 
+    def _save_artifacts(self, cursor, session_id: str, artifacts: Dict[str, Any]) -> None:
+        # Runs inside the caller's transaction.
+        if artifacts:
+            cursor.execute(
+                "INSERT INTO translation_session_artifacts (session_id, tts_artifacts) VALUES (%s, %s) "
+                + self.upsert_clause(["session_id"], ["tts_artifacts"]),
+                (session_id, encode_artifacts(artifacts)),
+            )
+        else:
+            cursor.execute("DELETE FROM translation_session_artifacts WHERE session_id = %s", (session_id,))
+
+    def _apply_rollups(self, cursor, removed: Optional[Dict[str, Any]], added: Optional[Dict[str, Any]]) -> None:
+        """Move a session between rollup rows. Runs inside the caller's transaction.
+
+        `removed` / `added` hold the ROLLUP_COLUMNS and created_at of the row before / after the
+        write (None for inserts / deletes).
+        """
+        changes = []
+        for row, sign in ((removed, -1), (added, 1)):
+            if row is not None:
+                key = (rollup_bucket(row["created_at"]), row["user_id"] or "", row["detected_emotion"], row["detected_intent"])
+                changes.append((key, sign, sign * float(row["compose_confidence"])))
+        if len(changes) == 2 and changes[0][0] == changes[1][0] and changes[0][2] + changes[1][2] == 0:
+            return
+        # Always lock rollup rows in key order so concurrent moves cannot deadlock.
+        for key, count, confidence in sorted(changes, key=lambda change: change[0]):
+            cursor.execute(
+                "INSERT INTO translation_session_rollups "
+                "(bucket_start, user_key, detected_emotion, detected_intent, session_count, confidence_sum) "
+                "VALUES (%s, %s, %s, %s, %s, %s) "
+                + self.increment_clause(
+                    ["bucket_start", "user_key", "detected_emotion", "detected_intent"],
+                    ["session_count", "confidence_sum"],
+                ),
+                (*key, count, confidence),
+            )
+
+    def _rollup_row(self, cursor, session_id: str) -> Optional[Dict[str, Any]]:
+        cursor.execute(
+            f"SELECT created_at, {', '.join(ROLLUP_COLUMNS)} FROM translation_sessions WHERE id = %s" + self.LOCK_ROWS,
+            (session_id,),
+        )
+        return cursor.fetchone()
+
     def create(self, payload: TranslationSessionCreate) -> TranslationSessionRead:
         now = datetime.utcnow()
         record = TranslationSessionRead(**payload.model_dump(), created_at=now, updated_at=now)
+        tts_metadata, artifacts = split_tts_metadata(record.tts_metadata)
 
         cursor = self.cursor()
         try:
@@ -103,7 +268,7 @@ class TranslationSessionMySQLService(MySQLService):
                     record.detected_intent,
                     json.dumps(record.emphasis),
                     record.adjusted_text,
-                    json.dumps(record.tts_metadata),
+                    json.dumps(tts_metadata),
                     json.dumps(record.tool_metadata),
                     record.summary_text,
                     json.dumps(record.summary_topics),
@@ -112,6 +277,9 @@ class TranslationSessionMySQLService(MySQLService):
                     record.updated_at,
                 ),
             )
+            if artifacts:
+                self._save_artifacts(cursor, str(record.id), artifacts)
+            self._apply_rollups(cursor, None, record.model_dump(include={"created_at", *ROLLUP_COLUMNS}))
             self.connection.commit()
             return record
         except Error as exc:
@@ -120,10 +288,31 @@ class TranslationSessionMySQLService(MySQLService):
         finally:
             cursor.close()
 
-    def update(self, session_id: UUID, payload: TranslationSessionUpdate) -> Optional[TranslationSessionRead]:
+    def get_many(self, session_ids: Sequence[UUID]) -> Dict[str, TranslationSessionRead]:
+        """Sessions by id (as str) in one query; missing ids are left out.
+
+        Always reads the primary: callers (batch composes) are about to write these rows.
+        """
+        ids = list(dict.fromkeys(str(session_id) for session_id in session_ids))
+        if not ids:
+            return {}
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                f"SELECT * FROM translation_sessions WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                ids,
+            )
+            return {row["id"]: self._row_to_model(row) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def _update_columns(
+        self, session_id: UUID, payload: TranslationSessionUpdate
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Column values for an UPDATE (JSON encoded, updated_at set) and the TTS artifacts to save."""
         data = payload.model_dump(exclude_unset=True)
         if not data:
-            return self.get(session_id)
+            return data, None
 
         json_fields = {
             "glosses",
@@ -136,20 +325,52 @@ class TranslationSessionMySQLService(MySQLService):
             "summary_topics",
             "summary_action_items",
         }
+        artifacts: Optional[Dict[str, Any]] = None
+        if data.get("tts_metadata") is not None:
+            listed = data["tts_metadata"].get(ARTIFACTS_MARKER) or []
+            data["tts_metadata"], artifacts = split_tts_metadata(data["tts_metadata"])
+            missing = [key for key in listed if key not in artifacts]
+            if missing:
+                # Written back from a read without artifacts: keep the ones the marker still lists.
+                stored = self.get_artifacts(session_id) or {}
+                artifacts.update({key: stored[key] for key in missing if key in stored})
+                if artifacts:
+                    data["tts_metadata"][ARTIFACTS_MARKER] = sorted(artifacts)
         for column in list(data.keys()):
             if column in json_fields and data[column] is not None:
                 data[column] = json.dumps(data[column])
         data["updated_at"] = datetime.utcnow()
+        return data, artifacts
 
+    def _execute_update(
+        self, cursor, session_id: str, data: Dict[str, Any], artifacts: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Apply one prepared update inside the caller's transaction; False if the row is gone."""
         set_clause = ", ".join(f"{column} = %s" for column in data.keys())
-        values = list(data.values()) + [str(session_id)]
+        values = list(data.values()) + [session_id]
+        previous = None
+        if any(column in data for column in ROLLUP_COLUMNS):
+            previous = self._rollup_row(cursor, session_id)
+        cursor.execute(
+            f"UPDATE translation_sessions SET {set_clause} WHERE id = %s",
+            values,
+        )
+        updated = cursor.rowcount > 0
+        if artifacts is not None and updated:
+            self._save_artifacts(cursor, session_id, artifacts)
+        if previous is not None:
+            current = {**previous, **{column: data[column] for column in ROLLUP_COLUMNS if column in data}}
+            self._apply_rollups(cursor, previous, current)
+        return updated
+
+    def update(self, session_id: UUID, payload: TranslationSessionUpdate) -> Optional[TranslationSessionRead]:
+        data, artifacts = self._update_columns(session_id, payload)
+        if not data:
+            return self.get(session_id)
 
         cursor = self.cursor()
         try:
-            cursor.execute(
-                f"UPDATE translation_sessions SET {set_clause} WHERE id = %s",
-                values,
-            )
+            self._execute_update(cursor, str(session_id), data, artifacts)
             self.connection.commit()
         except Error as exc:
             self.connection.rollback()
@@ -159,11 +380,143 @@ class TranslationSessionMySQLService(MySQLService):
 
         return self.get(session_id)
 
+    def update_many(self, updates: Sequence[Tuple[UUID, TranslationSessionUpdate]]) -> List[str]:
+        """Apply several updates in one transaction; returns the ids that still existed.
+
+        Unlike `update` the rows are not read back: callers already hold the updated sessions.
+        """
+        prepared = []
+        for session_id, payload in updates:
+            data, artifacts = self._update_columns(session_id, payload)
+            if data:
+                prepared.append((str(session_id), data, artifacts))
+        if not prepared:
+            return []
+        # Session rows are locked in id order so concurrent batches do not deadlock on them.
+        prepared.sort(key=lambda update: update[0])
+
+        cursor = self.cursor()
+        try:
+            updated = [
+                session_id
+                for session_id, data, artifacts in prepared
+                if self._execute_update(cursor, session_id, data, artifacts)
+            ]
+            self.connection.commit()
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to update translation sessions: {exc}") from exc
+        finally:
+            cursor.close()
+        return updated
+
+    def save_summary(
+        self,
+        session_id: UUID,
+        summary_text: str,
+        summary_topics: List[str],
+        summary_action_items: List[str],
+        checkpoint: int,
+        expected_checkpoint: int,
+    ) -> bool:
+        """Store a summary and advance the checkpoint, unless another run already moved it."""
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "UPDATE translation_sessions SET summary_text = %s, summary_topics = %s, summary_action_items = %s, "
+                "summary_checkpoint = %s, updated_at = %s WHERE id = %s AND summary_checkpoint = %s",
+                (
+                    summary_text,
+                    json.dumps(summary_topics),
+                    json.dumps(summary_action_items),
+                    checkpoint,
+                    datetime.utcnow(),
+                    str(session_id),
+                    expected_checkpoint,
+                ),
+            )
+            saved = cursor.rowcount > 0
+            self.connection.commit()
+            return saved
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to save session summary: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def move_tts_artifacts(self, after_id: str, limit: int, dry_run: bool = False) -> Tuple[Optional[str], int, int]:
+        """Migrate one chunk of rows (keyset on id) to the side table.
+
+        Returns (last id scanned or None when done, rows scanned, rows moved).
+        """
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "SELECT id, tts_metadata FROM translation_sessions WHERE id > %s ORDER BY id LIMIT %s",
+                (after_id, limit),
+            )
+            rows = cursor.fetchall()
+            moved = 0
+            for row in rows:
+                self._deserialize_json_column(row, "tts_metadata")
+                tts_metadata = row["tts_metadata"]
+                light, heavy = split_tts_metadata(tts_metadata)
+                if not heavy:
+                    continue
+                moved += 1
+                if dry_run:
+                    continue
+                if ARTIFACTS_MARKER in tts_metadata:
+                    # Partly migrated earlier: keep what is already in the side table.
+                    existing = self.get_artifacts(UUID(row["id"])) or {}
+                    heavy = {**existing, **heavy}
+                    light[ARTIFACTS_MARKER] = sorted(heavy)
+                cursor.execute(
+                    # Keep updated_at so the migration does not reorder session listings.
+                    "UPDATE translation_sessions SET tts_metadata = %s, updated_at = updated_at WHERE id = %s",
+                    (json.dumps(light), row["id"]),
+                )
+                self._save_artifacts(cursor, row["id"], heavy)
+            self.connection.commit()
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to move TTS artifacts: {exc}") from exc
+        finally:
+            cursor.close()
+        last_id = rows[-1]["id"] if len(rows) == limit else None
+        return last_id, len(rows), moved
+
+    def phrase_pairs(self, after_id: str, limit: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """One keyset page of (glosses, adjusted_text, compose_confidence) for phrase mining.
+
+        Only sessions whose context is their adjusted_text, i.e. composed once, are returned:
+        `glosses` accumulates across composes while adjusted_text is only the latest sentence.
+        Returns (last id of the page or None when done, rows).
+        """
+        # A full scan: keep it on a replica when one is configured.
+        cursor = self.read_cursor()
+        try:
+            cursor.execute(
+                "SELECT id, glosses, adjusted_text, compose_confidence FROM translation_sessions "
+                "WHERE id > %s AND context = adjusted_text ORDER BY id LIMIT %s",
+                (after_id, limit),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        for row in rows:
+            self._deserialize_json_column(row, "glosses")
+        last_id = rows[-1]["id"] if len(rows) == limit else None
+        return last_id, rows
+
     def delete(self, session_id: UUID) -> bool:
         cursor = self.cursor()
         try:
+            previous = self._rollup_row(cursor, str(session_id))
             cursor.execute("DELETE FROM translation_sessions WHERE id = %s", (str(session_id),))
             deleted = cursor.rowcount > 0
+            if deleted and previous is not None:
+                self._apply_rollups(cursor, previous, None)
             self.connection.commit()
             return deleted
         except Error as exc:
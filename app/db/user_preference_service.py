@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from mysql.connector import Error
+
+from .base import MySQLService
+
+
+class UserPreferenceMySQLService(MySQLService):
+    """Per-user gloss → preferred word overrides stored in the user_preferred_words table."""
+
+    def get(self, user_id: str) -> Dict[str, str]:
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "SELECT gloss, preferred_word FROM user_preferred_words WHERE user_id = %s",
+                (user_id,),
+            )
+            return {row["gloss"]: row["preferred_word"] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def upsert(self, user_id: str, preferred_words: Dict[str, str]) -> None:
+        if not preferred_words:
+            return
+        cursor = self.cursor()
+        try:
+            cursor.executemany(
+                "INSERT INTO user_preferred_words (user_id, gloss, preferred_word) VALUES (%s, %s, %s) "
+                + self.upsert_clause(["user_id", "gloss"], ["preferred_word"]),
+                [(user_id, gloss, word) for gloss, word in preferred_words.items()],
+            )
+            self.connection.commit()
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to save preferred words: {exc}") from exc
+        finally:
+            cursor.close()
+
+    def delete(self, user_id: str, gloss: str) -> bool:
+        cursor = self.cursor()
+        try:
+            cursor.execute(
+                "DELETE FROM user_preferred_words WHERE user_id = %s AND gloss = %s",
+                (user_id, gloss),
+            )
+            deleted = cursor.rowcount > 0
+            self.connection.commit()
+            return deleted
+        except Error as exc:
+            self.connection.rollback()
+            raise RuntimeError(f"Failed to delete preferred word: {exc}") from exc
+        finally:
+            cursor.close()
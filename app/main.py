@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import importlib.util
+import json
 import logging
 import os
+from contextlib import asynccontextmanager
+from pathlib import Path
 
-import uvicorn
 from fastapi import FastAPI
 
 from app.api import api_router
 from app.core.config import get_settings
+from app.core.resources import AppResources, set_resources
 
 
 logging.basicConfig(
@@ -18,7 +22,23 @@ logging.basicConfig(
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker process: shared pools/clients live for the worker, not the request.
+    resources = AppResources(settings)
+    await resources.startup()
+    app.state.resources = resources
+    set_resources(resources)
+    try:
+        yield
+    finally:
+        await resources.shutdown()
+        set_resources(None)
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.title,
     version=settings.version,
     description=(
@@ -38,6 +58,14 @@ app = FastAPI(
             "name": "TranslationSession",
             "description": "Operations for processing ASL model outputs and generating expressive metadata",
         },
+        {
+            "name": "UserPreference",
+            "description": "Per-user gloss → preferred word overrides shared across sessions",
+        },
+        {
+            "name": "Analytics",
+            "description": "Pre-aggregated emotion/intent distributions of translation sessions",
+        },
         {
             "name": "ComposeSentence",
             "description": "Compose fluent English sentences from ASL glosses using OpenAI",
@@ -54,14 +82,58 @@ app = FastAPI(
 app.include_router(api_router)
 
 
+def _openapi_schema():
+    # FastAPI already builds the schema lazily on the first /docs or /openapi.json hit; a document
+    # exported at image build time skips even that work on cold instances.
+    if app.openapi_schema is None and settings.openapi_schema_path:
+        path = Path(settings.openapi_schema_path)
+        if path.is_file():
+            app.openapi_schema = json.loads(path.read_text())
+    return FastAPI.openapi(app)
+
+
+app.openapi = _openapi_schema
+
+
 @app.get("/")
 def root():
     return {"message": "ASL Agent API is running. See /docs for details."}
 
 
 def run() -> None:
+    import uvicorn
+
     uvicorn.run("app.main:app", host="0.0.0.0", port=8080, reload=True)
 
 
+def run_production() -> None:
+    """Multi-worker server without the reload file watcher, for containers and Cloud Run."""
+    import uvicorn
+
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    logging.getLogger(__name__).info(
+        "Starting production server | workers=%d | loop=%s | http=%s",
+        settings.workers,
+        "uvloop" if has_uvloop else "asyncio",
+        "httptools" if has_httptools else "h11",
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        loop="uvloop" if has_uvloop else "asyncio",
+        http="httptools" if has_httptools else "h11",
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        timeout_graceful_shutdown=int(settings.graceful_shutdown_seconds),
+        log_config=None,
+    )
+
+
 if __name__ == "__main__":
-    run()
+    if settings.is_production:
+        run_production()
+    else:
+        run()
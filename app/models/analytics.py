@@ -0,0 +1,20 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class SessionAnalyticsGroup(BaseModel):
+    detected_emotion: Optional[str] = Field(None, json_schema_extra={"example": "happy"})
+    detected_intent: Optional[str] = Field(None, json_schema_extra={"example": "statement"})
+    user_id: Optional[str] = Field(None, description="Set when grouping by user; null for sessions without one.")
+    bucket_start: Optional[datetime] = Field(None, description="Start of the hour or day (UTC) when grouping by time.")
+    session_count: int = Field(..., ge=0, json_schema_extra={"example": 42})
+    avg_compose_confidence: float = Field(..., json_schema_extra={"example": 0.87})
+
+
+class SessionAnalyticsRead(BaseModel):
+    group_by: List[str] = Field(..., json_schema_extra={"example": ["emotion", "intent"]})
+    bucket: Optional[str] = Field(None, json_schema_extra={"example": "day"})
+    total_sessions: int = Field(..., ge=0, description="Sum of session_count over all groups.")
+    groups: List[SessionAnalyticsGroup] = Field(default_factory=list)
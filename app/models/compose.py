@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
 class ComposeSentenceRequest(BaseModel):
     glosses: List[str] = Field(..., description="Ordered list of glosses or words to compose.", json_schema_extra={"example": ["IX-1", "GOOD", "IDEA"]})
     letters: Optional[List[str]] = Field(None, description="Optional detected finger-spelled letters.", json_schema_extra={"example": ["A", "I"]})
+    spelled_words: Optional[List[str]] = Field(
+        None,
+        description="Words spelled by `letters`, if the caller already resolved them. "
+        "Otherwise the server resolves `letters` against its fingerspelling lexicon.",
+        json_schema_extra={"example": ["John"]},
+    )
     context: Optional[str] = Field(None, description="Additional conversational context.", json_schema_extra={"example": "Brainstorming a new sprint plan."})
     openai_api_key: Optional[str] = Field(
         None,
@@ -18,9 +24,29 @@ class ComposeSentenceRequest(BaseModel):
         description="Optional per-request model override.",
         json_schema_extra={"example": "gpt-4o-mini"},
     )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Optional time budget in milliseconds. Past it the compose is cancelled and 504 is returned.",
+        json_schema_extra={"example": 1500},
+    )
+    priority: Optional[Literal["interactive", "batch"]] = Field(
+        None,
+        description="Scheduling class. Batch jobs should send 'batch' so they never delay live subtitles.",
+        json_schema_extra={"example": "interactive"},
+    )
 
 
 class ComposeSentenceResponse(BaseModel):
     text: str = Field(..., description="Fluent English sentence produced by the composer.", json_schema_extra={"example": "That's a good idea for our next sprint."})
-    confidence: Optional[float] = Field(None, description="Optional heuristic confidence for the generation.", json_schema_extra={"example": 0.92})
+    confidence: Optional[float] = Field(
+        None,
+        description="Geometric-mean token probability of the sentence, when the model returns logprobs.",
+        json_schema_extra={"example": 0.92},
+    )
     model: str = Field(..., description="OpenAI model used for generation.", json_schema_extra={"example": "gpt-4o-mini"})
+    route: Optional[Literal["fast", "escalated", "strong"]] = Field(
+        None,
+        description="Tier that produced the sentence when tiered model routing is on.",
+        json_schema_extra={"example": "fast"},
+    )
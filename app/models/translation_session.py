@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Literal
 from uuid import UUID, uuid4
 from datetime import datetime
 from pydantic import BaseModel, Field
@@ -138,6 +138,12 @@ class TranslationSessionCreate(TranslationSessionBase):
 
 
 class TranslationSessionRead(TranslationSessionBase):
+    summary_checkpoint: int = Field(
+        0,
+        ge=0,
+        description="Length of `context` already folded into the summary; maintained by the summarizer.",
+        json_schema_extra={"example": 0},
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -230,6 +236,18 @@ class TranslationSessionComposeRequest(BaseModel):
         description="Optional letters from fingerspelling.",
         json_schema_extra={"example": ["A", "I"]},
     )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Optional time budget in milliseconds. Past it nothing is persisted and 504 is returned.",
+        json_schema_extra={"example": 1500},
+    )
+    partial: bool = Field(
+        False,
+        description="The signer is still signing: `glosses` is a prefix of the utterance. It is composed "
+        "speculatively in the background (202) and nothing is persisted.",
+        json_schema_extra={"example": False},
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -241,3 +259,125 @@ class TranslationSessionComposeRequest(BaseModel):
             ]
         }
     }
+
+
+SessionView = Literal["full", "minimal"]
+
+
+class TranslationSessionMinimal(BaseModel):
+    """What a live caption/TTS client needs from a session; returned for `view=minimal`."""
+
+    text: str = Field(
+        ..., description="The session's adjusted_text.", json_schema_extra={"example": "What time is it?"}
+    )
+    tone: Optional[str] = Field(
+        None, description="tts_metadata.tone, when set.", json_schema_extra={"example": "neutral"}
+    )
+    confidence: float = Field(..., description="The session's compose_confidence.", json_schema_extra={"example": 0.9})
+
+    @classmethod
+    def from_session(cls, session: "TranslationSessionRead") -> "TranslationSessionMinimal":
+        tone = (session.tts_metadata or {}).get("tone")
+        return cls(
+            text=session.adjusted_text,
+            tone=tone if isinstance(tone, str) else None,
+            confidence=session.compose_confidence,
+        )
+
+
+class TranslationSessionBatchComposeItem(BaseModel):
+    session_id: UUID = Field(..., description="Session to compose into.")
+    glosses: List[str] = Field(
+        ...,
+        description="Incoming glosses/words from the ASL recognizer.",
+        json_schema_extra={"example": ["IX-1", "FINISH", "WORK"]},
+    )
+    letters: Optional[List[str]] = Field(
+        None,
+        description="Optional letters from fingerspelling.",
+        json_schema_extra={"example": ["A", "I"]},
+    )
+
+
+class TranslationSessionBatchComposeRequest(BaseModel):
+    items: List[TranslationSessionBatchComposeItem] = Field(
+        ...,
+        min_length=1,
+        description="Composes to run. Items for the same session run in order; other sessions run concurrently.",
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Optional time budget for the whole batch. Items not composed in time fail with 504.",
+        json_schema_extra={"example": 1500},
+    )
+
+
+class TranslationSessionBatchComposeResult(BaseModel):
+    session_id: UUID
+    status: int = Field(
+        ..., description="HTTP status the single compose endpoint would have returned.", json_schema_extra={"example": 200}
+    )
+    session: Optional[TranslationSessionRead] = Field(None, description="The session after the compose, on success.")
+    error: Optional[Any] = Field(None, description="Error detail, on failure.")
+
+
+class TranslationSessionBatchComposeResponse(BaseModel):
+    results: List[TranslationSessionBatchComposeResult] = Field(
+        default_factory=list, description="One result per request item, in request order."
+    )
+
+
+class TranslationSessionSearchHit(BaseModel):
+    session: TranslationSessionRead
+    relevance: float = Field(..., description="Full-text relevance; higher is better.", json_schema_extra={"example": 1.52})
+    snippets: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Per matching field, an HTML-escaped excerpt with matches wrapped in <mark>.",
+        json_schema_extra={"example": {"adjusted_text": "Can we <mark>reschedule</mark> the meeting?"}},
+    )
+
+
+class TranslationSessionSearchPage(BaseModel):
+    hits: List[TranslationSessionSearchHit] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page."
+    )
+
+
+class GlossStreamChunk(BaseModel):
+    glosses: List[str] = Field(
+        default_factory=list,
+        description="Glosses recognized since the previous chunk, repeats and all.",
+        json_schema_extra={"example": ["IX-1", "IX-1", "FINISH", "WORK"]},
+    )
+    confidences: Optional[List[float]] = Field(
+        None,
+        description="Recognizer confidence per gloss (0-1), aligned with `glosses`; missing entries count as 1.",
+        json_schema_extra={"example": [0.9, 0.9, 0.8, 0.95]},
+    )
+    letters: Optional[List[str]] = Field(
+        None,
+        description="Fingerspelled letters recognized since the previous chunk.",
+        json_schema_extra={"example": ["J", "O"]},
+    )
+    final: bool = Field(
+        False,
+        description="The recognizer saw the end of the utterance: compose what is buffered now.",
+        json_schema_extra={"example": False},
+    )
+
+
+class GlossStreamStatus(BaseModel):
+    session_id: str
+    trigger: Optional[str] = Field(
+        None,
+        description="Why this chunk composed the utterance (`boundary`, `final` or `length`); null while buffering.",
+        json_schema_extra={"example": "boundary"},
+    )
+    session: Optional[TranslationSessionRead] = Field(None, description="The session after the compose, if one ran.")
+    buffered_glosses: List[str] = Field(default_factory=list, description="Cleaned glosses waiting for a boundary.")
+    buffered_letters: List[str] = Field(default_factory=list)
+    chunks: int = Field(0, description="Chunks received for this session by this worker.")
+    composes: int = Field(0, description="Composes those chunks triggered.")
+    llm_calls_saved: int = Field(0, description="`chunks - composes`, ignoring chunks still buffered.")
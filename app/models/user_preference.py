@@ -0,0 +1,20 @@
+from __future__ import annotations
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class UserPreferredWordsRead(BaseModel):
+    user_id: str = Field(..., description="External user identifier.", json_schema_extra={"example": "user_123"})
+    preferred_words: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Gloss → preferred word overrides merged across all of the user's sessions.",
+        json_schema_extra={"example": {"GOOD": "fantastic"}},
+    )
+
+
+class UserPreferredWordsUpdate(BaseModel):
+    preferred_words: Dict[str, str] = Field(
+        ...,
+        description="Overrides to add or replace; glosses not listed are kept.",
+        json_schema_extra={"example": {"GOOD": "great"}},
+    )
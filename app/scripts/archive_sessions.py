@@ -0,0 +1,50 @@
+"""Retention job: archive translation sessions older than the retention window.
+
+Meant for cron / a scheduled Cloud Run job, e.g. ``python -m app.scripts.archive_sessions``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+
+
+def parse_args() -> argparse.Namespace:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Move old translation sessions to gzip NDJSON archives.")
+    parser.add_argument("--older-than-days", type=int, default=settings.session_retention_days, help="Retention window")
+    parser.add_argument("--archive-dir", default=settings.archive_dir, help="Archive root directory")
+    parser.add_argument("--chunk-size", type=int, default=settings.archive_chunk_size, help="Sessions per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between chunks")
+    parser.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks")
+    parser.add_argument("--dry-run", action="store_true", help="Only count sessions that would be archived")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s | %(message)s")
+
+    from app.services.retention import SessionArchive, SessionArchiver
+
+    archiver = SessionArchiver(
+        SessionArchive(args.archive_dir),
+        retention_days=args.older_than_days,
+        chunk_size=args.chunk_size,
+        pause_seconds=args.pause,
+    )
+    try:
+        stats = archiver.run(max_chunks=args.max_chunks, dry_run=args.dry_run)
+    except RuntimeError as exc:
+        print(f"Archival stopped: {exc}")
+        return 1
+    print(json.dumps({"cutoff": archiver.cutoff().isoformat(), "dry_run": args.dry_run, **stats}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
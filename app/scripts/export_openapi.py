@@ -0,0 +1,33 @@
+"""Export the OpenAPI document so containers can serve it without generating it at runtime."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write the ASL Agent OpenAPI schema to a file.")
+    parser.add_argument("--output", default="openapi.json", help="Destination path for the schema")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    from fastapi import FastAPI
+
+    from app.main import app
+
+    # Call the stock generator so a stale OPENAPI_SCHEMA_PATH file is never re-exported.
+    schema = FastAPI.openapi(app)
+    output = Path(args.output)
+    output.write_text(json.dumps(schema, separators=(",", ":")))
+    print(f"OpenAPI schema written to {output} ({output.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
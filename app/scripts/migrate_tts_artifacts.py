@@ -0,0 +1,54 @@
+"""Move heavy tts_metadata payloads of existing sessions into translation_session_artifacts.
+
+Runs in small keyset-paginated chunks (one transaction each) so it can run against a live
+database and be resumed with --after-id.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Split heavy TTS artifacts out of translation_sessions.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between chunks")
+    parser.add_argument("--after-id", default="", help="Resume after this session id")
+    parser.add_argument("--dry-run", action="store_true", help="Count rows to move without writing")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    from app.db import translation_session_repository
+
+    service = translation_session_repository()
+    after_id: str | None = args.after_id
+    scanned = moved = 0
+    try:
+        while after_id is not None:
+            last_id, chunk_scanned, chunk_moved = service.move_tts_artifacts(
+                after_id, max(1, args.chunk_size), dry_run=args.dry_run
+            )
+            scanned += chunk_scanned
+            moved += chunk_moved
+            print(f"chunk after={after_id or '-'} scanned={chunk_scanned} moved={chunk_moved}")
+            after_id = last_id
+            if after_id is not None and args.pause > 0:
+                time.sleep(args.pause)
+    except RuntimeError as exc:
+        print(f"Migration stopped: {exc} (resume with --after-id {after_id})")
+        return 1
+    finally:
+        service.close_connection()
+
+    verb = "would move" if args.dry_run else "moved"
+    print(f"Done: scanned {scanned} sessions, {verb} artifacts for {moved}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
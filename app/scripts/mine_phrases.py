@@ -0,0 +1,62 @@
+"""Mine frequent gloss sequences and their accepted sentences into the phrase index file.
+
+Meant for a nightly job, e.g. ``python -m app.scripts.mine_phrases --output phrase_index.bin``.
+Workers pick the new file up on their next start (PHRASE_INDEX_PATH).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build the phrase index from translation_sessions.")
+    parser.add_argument(
+        "--output", default=settings.phrase_index_path or "phrase_index.bin", help="Index file to write"
+    )
+    parser.add_argument("--min-count", type=int, default=3, help="Sessions needed before a phrase is indexed")
+    parser.add_argument("--max-glosses", type=int, default=8, help="Longest gloss sequence indexed")
+    parser.add_argument(
+        "--min-share", type=float, default=0.5, help="Share of sessions the chosen sentence must account for"
+    )
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Sessions per query")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks")
+    parser.add_argument("--version", default=None, help="Index version label (default: UTC build time)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    from app.db import translation_session_repository
+    from app.services.phrase_index import PhraseMiner
+
+    miner = PhraseMiner(min_count=args.min_count, max_glosses=args.max_glosses, min_share=args.min_share)
+    service = translation_session_repository(read_replica=True)
+    after_id: str | None = ""
+    try:
+        while after_id is not None:
+            after_id, rows = service.phrase_pairs(after_id, max(1, args.chunk_size))
+            for row in rows:
+                miner.add(row["glosses"] or [], row["adjusted_text"], row["compose_confidence"])
+            if after_id is not None and args.pause > 0:
+                time.sleep(args.pause)
+    except RuntimeError as exc:
+        print(f"Mining stopped: {exc}")
+        return 1
+    finally:
+        service.close_connection()
+
+    version, entries = miner.write(args.output, version=args.version)
+    print(json.dumps({"output": args.output, "version": version, "scanned": miner.scanned, "phrases": entries}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Admission control for compose: global and per-user/per-session concurrency with a bounded queue."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Iterable, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+# An admission key is (kind, id), e.g. ("user", "user_123") or ("session", "<uuid>").
+AdmissionKey = Tuple[str, str]
+
+QUEUE_DEPTH = REGISTRY.gauge("compose_admission_queue_depth", "Compose requests waiting for admission")
+IN_FLIGHT = REGISTRY.gauge("compose_admission_in_flight", "Compose requests currently admitted")
+WAIT_SECONDS = REGISTRY.histogram("compose_admission_wait_seconds", "Time spent waiting for admission")
+REJECTED = REGISTRY.counter(
+    "compose_admission_rejected_total", "Compose requests rejected by admission control", ["reason"]
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a compose cannot be admitted; maps to 429 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Compose rejected by admission control: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("keys", "future")
+
+    def __init__(self, keys: Tuple[AdmissionKey, ...], future: asyncio.Future) -> None:
+        self.keys = keys
+        self.future = future
+
+
+class AdmissionController:
+    """Bounds concurrent compose calls per worker.
+
+    A request needs a global slot plus a slot for each of its keys. If none is free it joins a
+    bounded FIFO queue. A full queue, too many queued requests for one key, or a wait longer
+    than `max_wait` rejects the request, so one noisy client cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        per_key_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 128,
+        max_queued_per_key: int = 4,
+        max_wait: float = 2.0,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_key_limits = per_key_limits or {}
+        self.max_queue = max(0, max_queue)
+        self.max_queued_per_key = max(0, max_queued_per_key)
+        self.max_wait = max_wait
+        self.logger = logging.getLogger(__name__)
+        self._active_total = 0
+        self._active: Dict[AdmissionKey, int] = {}
+        self._queued: Dict[AdmissionKey, int] = {}
+        self._queue: Deque[_Waiter] = deque()
+        # EWMA of how long an admitted compose holds its slot; drives the Retry-After estimate.
+        self._avg_hold = 1.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _can_run(self, keys: Iterable[AdmissionKey]) -> bool:
+        if self._active_total >= self.max_concurrent:
+            return False
+        for key in keys:
+            limit = self.per_key_limits.get(key[0])
+            if limit is not None and self._active.get(key, 0) >= limit:
+                return False
+        return True
+
+    def _take(self, keys: Iterable[AdmissionKey]) -> None:
+        self._active_total += 1
+        for key in keys:
+            self._active[key] = self._active.get(key, 0) + 1
+        IN_FLIGHT.set(self._active_total)
+
+    def _release(self, keys: Iterable[AdmissionKey]) -> None:
+        self._active_total -= 1
+        for key in keys:
+            remaining = self._active.get(key, 0) - 1
+            if remaining > 0:
+                self._active[key] = remaining
+            else:
+                self._active.pop(key, None)
+        IN_FLIGHT.set(self._active_total)
+        self._dispatch()
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        try:
+            self._queue.remove(waiter)
+        except ValueError:
+            return
+        for key in waiter.keys:
+            remaining = self._queued.get(key, 0) - 1
+            if remaining > 0:
+                self._queued[key] = remaining
+            else:
+                self._queued.pop(key, None)
+        QUEUE_DEPTH.set(len(self._queue))
+
+    def _dispatch(self) -> None:
+        # FIFO, but skip waiters blocked on their own per-key limit so they don't stall everyone.
+        for waiter in list(self._queue):
+            if self._active_total >= self.max_concurrent:
+                break
+            if waiter.future.done() or not self._can_run(waiter.keys):
+                continue
+            self._dequeue(waiter)
+            self._take(waiter.keys)
+            waiter.future.set_result(None)
+
+    def retry_after(self) -> float:
+        backlog = len(self._queue) + 1
+        return max(1.0, math.ceil(self._avg_hold * backlog / self.max_concurrent))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        REJECTED.inc(reason=reason)
+        self.logger.warning("Compose admission rejected | reason=%s | queue=%d", reason, len(self._queue))
+        return AdmissionRejected(reason, self.retry_after())
+
+    async def _acquire(self, keys: Tuple[AdmissionKey, ...], max_wait: float) -> None:
+        started = time.monotonic()
+        if self._can_run(keys):
+            self._take(keys)
+            WAIT_SECONDS.observe(0.0)
+            return
+        if len(self._queue) >= self.max_queue:
+            raise self._reject("queue_full")
+        if any(self._queued.get(key, 0) >= self.max_queued_per_key for key in keys):
+            raise self._reject("key_queue_full")
+
+        waiter = _Waiter(keys, asyncio.get_running_loop().create_future())
+        self._queue.append(waiter)
+        for key in keys:
+            self._queued[key] = self._queued.get(key, 0) + 1
+        QUEUE_DEPTH.set(len(self._queue))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._dequeue(waiter)
+                waiter.future.cancel()
+                raise self._reject("wait_timeout")
+            # Granted in the same tick the timer fired: keep the slot.
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(keys)
+            else:
+                self._dequeue(waiter)
+                waiter.future.cancel()
+            raise
+        WAIT_SECONDS.observe(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def admit(self, keys: Iterable[AdmissionKey], max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        unique = tuple(dict.fromkeys(keys))
+        wait = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        await self._acquire(unique, wait)
+        held_from = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - held_from)
+            self._release(unique)
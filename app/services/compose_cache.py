@@ -0,0 +1,112 @@
+"""Compose caches consulted by `SentenceComposer.compose_async`.
+
+Layers are stacked in a `TieredComposeCache`: the semantic cache (SEMANTIC_CACHE), then an
+exact-key local L1, then the shared Redis L2 (COMPOSE_CACHE_REDIS_URL,
+app.services.redis_cache). A hit in a lower layer is copied into the layers above it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+from app.core.metrics import REGISTRY
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+
+CACHE_LOOKUPS = REGISTRY.counter("compose_cache_lookups_total", "Compose cache lookups", ["layer", "result"])
+
+# Only the end of the context is part of the key; older sentences rarely change the wording.
+KEY_CONTEXT_CHARS = 200
+
+
+class ComposeCache(Protocol):
+    """Sentences composed earlier, keyed by request and model. Implementations never raise."""
+
+    async def get(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]: ...
+
+    async def put(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def exact_key(request: ComposeSentenceRequest, model: str) -> str:
+    """Stable digest of everything that decides the composed sentence."""
+    material = json.dumps(
+        [
+            model,
+            [gloss.strip().upper() for gloss in request.glosses],
+            request.spelled_words if request.spelled_words is not None else request.letters,
+            (request.context or "")[-KEY_CONTEXT_CHARS:],
+        ],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LocalComposeCache:
+    """Exact-key LRU in front of the shared tier.
+
+    Entries expire after `ttl_seconds`, which bounds how long a worker can serve a sentence
+    that was since replaced in the shared tier.
+    """
+
+    def __init__(self, capacity: int = 2048, ttl_seconds: float = 30.0) -> None:
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, ComposeSentenceResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]:
+        key = exact_key(request, model)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                CACHE_LOOKUPS.inc(layer="local", result="hit")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        CACHE_LOOKUPS.inc(layer="local", result="miss")
+        return None
+
+    async def put(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None:
+        key = exact_key(request, model)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredComposeCache:
+    """Layers tried in order; see the module docstring."""
+
+    def __init__(self, layers: Sequence[ComposeCache]) -> None:
+        self.layers: List[ComposeCache] = list(layers)
+
+    async def get(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]:
+        for depth, layer in enumerate(self.layers):
+            response = await layer.get(request, model)
+            if response is not None:
+                for upper in self.layers[:depth]:
+                    await upper.put(request, model, response)
+                return response
+        return None
+
+    async def put(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None:
+        for layer in self.layers:
+            await layer.put(request, model, response)
+
+    async def close(self) -> None:
+        for layer in self.layers:
+            await layer.close()
@@ -1,13 +1,126 @@
 from __future__ import annotations
 
+import hashlib
 import os
-from typing import List
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import logging
 
-from openai import AsyncOpenAI, OpenAI
-
+from app.core.config import get_settings
+from app.core.resources import get_resources
 from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+from app.services.deadline import ComposeDeadlineExceeded, Deadline
+from app.services.resilience import get_upstream_guard
+from app.services.routing import (
+    ROUTE_DECISIONS,
+    ROUTE_ESCALATED,
+    ROUTE_FAST,
+    ROUTE_STRONG,
+    TIER_LATENCY,
+    ModelRouter,
+    heuristic_confidence,
+    logprob_confidence,
+)
+from app.services.scheduler import DEFAULT_PRIORITY, SchedulerTimeout
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+
+# OpenAI clients own an HTTP connection pool, so they are cached per API key for the
+# lifetime of the worker instead of being rebuilt for every compose request.
+_clients: "OrderedDict[str, Tuple[OpenAI, AsyncOpenAI]]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def get_openai_clients(api_key: str) -> Tuple[OpenAI, AsyncOpenAI]:
+    # The openai package is the single largest import in the service, so it is only loaded
+    # when the first client is built (or by the background pre-warm), not at app import.
+    from openai import AsyncOpenAI, OpenAI
+
+    with _clients_lock:
+        clients = _clients.get(api_key)
+        if clients is not None:
+            _clients.move_to_end(api_key)
+            return clients
+        # SDK-level retries are disabled: UpstreamGuard owns the retry/deadline policy.
+        clients = (OpenAI(api_key=api_key, max_retries=0), AsyncOpenAI(api_key=api_key, max_retries=0))
+        _clients[api_key] = clients
+        # Per-request keys are client supplied, so keep the cache bounded. Evicted clients are
+        # left to the garbage collector because an in-flight request may still hold them.
+        while len(_clients) > max(1, get_settings().openai_client_cache_size):
+            _clients.popitem(last=False)
+        return clients
+
+
+async def close_openai_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for sync_client, async_client in clients:
+        sync_client.close()
+        await async_client.close()
+
+
+def spelled_words(request: ComposeSentenceRequest) -> List[str]:
+    """Words the request fingerspelled; resolved locally unless the caller already did."""
+    if request.spelled_words is not None:
+        return request.spelled_words
+    return get_resources().fingerspelling.resolve(request.letters)
+
+
+def is_retryable_openai_error(exc: BaseException) -> bool:
+    """Transient OpenAI failures (timeouts, connection resets, 429, 5xx) that are worth retrying.
+
+    A 429 for an exhausted quota is the key's billing state, not upstream health: retrying does
+    not help and it must not open the breaker for other callers.
+    """
+    import openai
+
+    if isinstance(exc, openai.RateLimitError) and getattr(exc, "code", None) == "insufficient_quota":
+        return False
+    return isinstance(
+        exc,
+        (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError),
+    )
+
+
+def upstream_name(model: str, api_key: str) -> str:
+    """Guard name for `model`: shared for the server's key, separate per client-supplied key.
+
+    Rate limits and quotas are per key, so one client's 429s must not trip the breaker that
+    every other caller of the model goes through.
+    """
+    if api_key == os.environ.get("OPENAI_API_KEY"):
+        return f"openai:{model}"
+    return f"openai:{model}:key-{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+
+
+class GlossFallbackComposer:
+    """Rule-based composer used while OpenAI is degraded. Crude, but keeps subtitles flowing."""
+
+    MODEL_NAME = "fallback:gloss-rules"
+    CONFIDENCE = 0.2
+    PRONOUNS = {"IX-1": "I", "ME": "I", "IX-2": "you", "YOU": "you", "IX-3": "they", "IX": "that"}
+
+    def compose(self, request: ComposeSentenceRequest) -> ComposeSentenceResponse:
+        words = []
+        for gloss in request.glosses:
+            token = gloss.strip()
+            if not token:
+                continue
+            words.append(self.PRONOUNS.get(token.upper()) or token.replace("-", " ").lower())
+        words.extend(spelled_words(request))
+
+        text = " ".join(words).strip()
+        if text:
+            text = text[0].upper() + text[1:]
+            if text[-1] not in ".?!":
+                text += "."
+        return ComposeSentenceResponse(text=text, confidence=self.CONFIDENCE, model=self.MODEL_NAME)
 
 
 class SentenceComposer:
@@ -18,11 +131,24 @@ class SentenceComposer:
         api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not configured.")
+        self.api_key = api_key
         self.model = model or os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
-        self.client = OpenAI(api_key=api_key)
-        self.async_client = AsyncOpenAI(api_key=api_key)
+        _, self.async_client = get_openai_clients(api_key)
+        self.guard = get_upstream_guard(upstream_name(self.model, api_key), is_retryable_openai_error)
+        settings = get_settings()
+        self.fallback = GlossFallbackComposer() if settings.compose_fallback == "local" else None
+        # A model picked by the caller (request body or X-OpenAI-Model) is used as is, never routed.
+        self.router = ModelRouter.from_settings() if model is None else None
+        # Not every model supports logprobs; only the configured ones are asked for them.
+        self.logprobs = self.model in settings.compose_logprob_models
 
-    def _build_prompt(self, glosses: List[str], context: str | None, letters: List[str] | None) -> str:
+    def _build_prompt(
+        self,
+        glosses: List[str],
+        context: str | None,
+        words: List[str] | None,
+        draft: Optional[Tuple[List[str], str]] = None,
+    ) -> str:
         base = (
             "You are assisting an ASL translation service. "
             "Given a list of glosses (English upper-case words representing ASL signs), "
@@ -30,39 +156,145 @@ class SentenceComposer:
             "Preserve the meaning, be concise, and return only the sentence."
         )
         parts = [base, f"Glosses: {', '.join(glosses)}."]
-        if letters:
-            parts.append(f"Detected spelled letters: {', '.join(letters)}.")
+        if words:
+            # Resolved locally (app.services.fingerspelling) rather than sent as single letters.
+            parts.append(f"Fingerspelled: {' '.join(words)}.")
         if context:
             parts.append(f"Conversation context: {context}")
+        if draft:
+            # A speculative compose of a gloss prefix (app.services.speculation) to build on.
+            parts.append(
+                f"Draft for the first {len(draft[0])} glosses: {draft[1]}\n"
+                "Extend the draft to cover all glosses, keeping its wording where it still fits."
+            )
         return "\n".join(parts)
 
-    def compose(self, request: ComposeSentenceRequest) -> ComposeSentenceResponse:
-        composer = SentenceComposer(api_key=request.openai_api_key, model=request.openai_model)
-        return composer._compose_sync(request)
-
-    def _compose_sync(self, request: ComposeSentenceRequest) -> ComposeSentenceResponse:
-        prompt = self._build_prompt(request.glosses, request.context, request.letters)
-        self.logger.info("Composing sentence | glosses=%s | letters=%s | context=%s", request.glosses, request.letters, request.context)
-
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            temperature=0.3,
-            messages=[
-                {"role": "system", "content": "You convert ASL gloss sequences into fluent English sentences."},
-                {"role": "user", "content": prompt},
-            ],
-        )
+    def _messages(self, prompt: str) -> List[dict]:
+        return [
+            {"role": "system", "content": "You convert ASL gloss sequences into fluent English sentences."},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _for_request(self, request: ComposeSentenceRequest) -> "SentenceComposer":
+        # Only build a new composer when the request overrides credentials or model; otherwise
+        # keep this instance (and the key it was created with, e.g. from X-OpenAI-Key).
+        if not request.openai_api_key and not request.openai_model:
+            return self
+        return SentenceComposer(api_key=request.openai_api_key or self.api_key, model=request.openai_model or self.model)
+
+    def _degraded(self, request: ComposeSentenceRequest, exc: Exception) -> ComposeSentenceResponse:
+        if self.fallback is None or not self.guard.is_degraded_error(exc):
+            raise exc
+        self.logger.warning("Compose falling back | model=%s | error=%s", self.model, exc)
+        return self.fallback.compose(request)
 
-        text = completion.choices[0].message.content.strip()
-        self.logger.info("Compose result | model=%s | text=%s", self.model, text)
-        return ComposeSentenceResponse(text=text, confidence=None, model=self.model)
+    async def compose_async(
+        self,
+        request: ComposeSentenceRequest,
+        deadline: Optional[Deadline] = None,
+        priority: Optional[str] = None,
+        flow: Optional[str] = None,
+        draft: Optional[Tuple[List[str], str]] = None,
+    ) -> ComposeSentenceResponse:
+        """Compose via OpenAI. `priority`/`flow` place the call in the scheduler (class, fairness key).
 
-    async def compose_async(self, request: ComposeSentenceRequest) -> ComposeSentenceResponse:
-        composer = SentenceComposer(api_key=request.openai_api_key, model=request.openai_model)
-        return await composer._compose_async_internal(request)
+        `draft` is (gloss prefix, sentence composed for it) when continuing a speculative compose.
+        With COMPOSE_STRONG_MODEL set the call is routed between tiers (app.services.routing).
+        """
+        composer = self._for_request(request)
+        cache = get_resources().compose_cache
+        if cache is not None:
+            cached = await cache.get(request, composer.model)
+            if cached is not None:
+                return cached
+        priority = priority or request.priority or DEFAULT_PRIORITY
+        flow = flow or "anonymous"
+        # A request naming its own model has chosen it; only the configured model is routed.
+        router = self.router if not request.openai_model else None
+        if router is not None and router.strong_model != composer.model:
+            result = await composer._compose_routed(router, request, deadline, priority, flow, draft)
+        else:
+            result = await composer._compose_scheduled(request, deadline, priority, flow, draft)
+        if cache is not None and result.model != GlossFallbackComposer.MODEL_NAME:
+            await cache.put(request, composer.model, result)
+        return result
 
-    async def _compose_async_internal(self, request: ComposeSentenceRequest) -> ComposeSentenceResponse:
-        prompt = self._build_prompt(request.glosses, request.context, request.letters)
+    async def _compose_scheduled(
+        self,
+        request: ComposeSentenceRequest,
+        deadline: Optional[Deadline],
+        priority: str,
+        flow: str,
+        draft: Optional[Tuple[List[str], str]] = None,
+        tier: Optional[str] = None,
+    ) -> ComposeSentenceResponse:
+        started = time.perf_counter()
+        try:
+            async with get_resources().scheduler.slot(
+                priority,
+                flow,
+                self.model,
+                timeout=deadline.remaining() if deadline is not None else None,
+            ):
+                result = await self._compose_async_internal(request, deadline, draft)
+        except SchedulerTimeout as exc:
+            raise ComposeDeadlineExceeded(deadline) from exc
+        if tier is not None:
+            TIER_LATENCY.observe(time.perf_counter() - started, tier=tier)
+        return result
+
+    async def _compose_routed(
+        self,
+        router: ModelRouter,
+        request: ComposeSentenceRequest,
+        deadline: Optional[Deadline],
+        priority: str,
+        flow: str,
+        draft: Optional[Tuple[List[str], str]] = None,
+    ) -> ComposeSentenceResponse:
+        strong = SentenceComposer(api_key=self.api_key, model=router.strong_model)
+        reason = router.direct_reason(request)
+        if reason is not None:
+            result = await strong._compose_scheduled(request, deadline, priority, flow, draft, tier=ROUTE_STRONG)
+            ROUTE_DECISIONS.inc(decision=f"strong_{reason}")
+            return result.model_copy(update={"route": ROUTE_STRONG})
+
+        result = await self._compose_scheduled(request, deadline, priority, flow, draft, tier=ROUTE_FAST)
+        if not router.should_escalate(result):
+            decision = "fast"
+        elif deadline is not None and deadline.remaining() < router.min_escalation_seconds:
+            decision = "kept_deadline"
+        else:
+            try:
+                escalated = await strong._compose_scheduled(
+                    request, deadline, priority, flow, draft, tier=ROUTE_STRONG
+                )
+            except Exception as exc:
+                self.logger.warning("Compose escalation failed | model=%s | error=%s", router.strong_model, exc)
+                escalated = None
+            if escalated is not None and escalated.model != GlossFallbackComposer.MODEL_NAME:
+                ROUTE_DECISIONS.inc(decision="escalated")
+                self.logger.info(
+                    "Compose escalated | from=%s | to=%s | confidence=%s | escalated_confidence=%s",
+                    self.model,
+                    router.strong_model,
+                    result.confidence,
+                    escalated.confidence,
+                )
+                return escalated.model_copy(update={"route": ROUTE_ESCALATED})
+            decision = "escalation_failed"
+        ROUTE_DECISIONS.inc(decision=decision)
+        return result.model_copy(update={"route": ROUTE_FAST})
+
+    async def _compose_async_internal(
+        self,
+        request: ComposeSentenceRequest,
+        deadline: Optional[Deadline] = None,
+        draft: Optional[Tuple[List[str], str]] = None,
+    ) -> ComposeSentenceResponse:
+        if deadline is not None:
+            deadline.check()
+        prompt = self._build_prompt(request.glosses, request.context, spelled_words(request), draft)
         self.logger.info(
             "Composing sentence async | glosses=%s | letters=%s | context=%s",
             request.glosses,
@@ -70,15 +302,26 @@ class SentenceComposer:
             request.context,
         )
 
-        completion = await self.async_client.chat.completions.create(
-            model=self.model,
-            temperature=0.3,
-            messages=[
-                {"role": "system", "content": "You convert ASL gloss sequences into fluent English sentences."},
-                {"role": "user", "content": prompt},
-            ],
-        )
+        try:
+            completion = await self.guard.call(
+                lambda timeout: self.async_client.chat.completions.create(
+                    model=self.model,
+                    temperature=0.3,
+                    messages=self._messages(prompt),
+                    timeout=timeout,
+                    **({"logprobs": True} if self.logprobs else {}),
+                ),
+                deadline=deadline.loop_time() if deadline is not None else None,
+            )
+        except Exception as exc:
+            if deadline is not None and deadline.expired():
+                raise ComposeDeadlineExceeded(deadline) from exc
+            return self._degraded(request, exc)
 
-        text = completion.choices[0].message.content.strip()
-        self.logger.info("Compose result async | model=%s | text=%s", self.model, text)
-        return ComposeSentenceResponse(text=text, confidence=None, model=self.model)
+        choice = completion.choices[0]
+        text = choice.message.content.strip()
+        confidence = logprob_confidence(choice) if self.logprobs else None
+        if confidence is None:
+            confidence = heuristic_confidence(choice)
+        self.logger.info("Compose result async | model=%s | confidence=%s | text=%s", self.model, confidence, text)
+        return ComposeSentenceResponse(text=text, confidence=confidence, model=self.model)
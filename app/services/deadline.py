@@ -0,0 +1,85 @@
+"""Client-supplied compose deadlines and cancellation on client disconnect."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.services.resilience import UpstreamTimeoutError
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Compose-Deadline-Ms"
+
+
+class ComposeDeadlineExceeded(UpstreamTimeoutError):
+    """The client's deadline passed; the result would be useless, so nothing is persisted."""
+
+    def __init__(self, deadline: "Deadline") -> None:
+        super().__init__(f"Compose deadline of {deadline.budget_ms} ms exceeded")
+        self.deadline = deadline
+
+    def to_detail(self) -> Dict[str, Any]:
+        return {
+            "code": "deadline_exceeded",
+            "message": str(self),
+            "deadline_ms": self.deadline.budget_ms,
+            "elapsed_ms": round(self.deadline.elapsed() * 1000),
+        }
+
+
+class ClientDisconnectedError(Exception):
+    """The client went away before the compose finished."""
+
+
+class Deadline:
+    """A relative time budget anchored to the monotonic clock when the request arrived."""
+
+    def __init__(self, budget_ms: int) -> None:
+        self.budget_ms = budget_ms
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_ms / 1000
+
+    @classmethod
+    def resolve(cls, *budgets_ms: Optional[int]) -> Optional["Deadline"]:
+        """Build a deadline from the tightest of the supplied budgets (header, body field)."""
+        values = [value for value in budgets_ms if value is not None]
+        return cls(max(0, min(values))) if values else None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise ComposeDeadlineExceeded(self)
+
+    def loop_time(self) -> float:
+        """The deadline on the running event loop's clock (uvloop does not share time.monotonic)."""
+        return asyncio.get_running_loop().time() + self.remaining()
+
+
+async def cancel_on_disconnect(
+    operation: Awaitable[T],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 0.05,
+) -> T:
+    """Await `operation`, cancelling it (and raising ClientDisconnectedError) if the client leaves."""
+    task = asyncio.ensure_future(operation)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await is_disconnected():
+                task.cancel()
+                raise ClientDisconnectedError("Client disconnected before compose finished")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.models.expression_rule import ExpressionRuleRead
+
+
+class ExpressionRuleCache:
+    """In-process copy of the expression_rules table, refreshed on a TTL or on invalidation.
+
+    Composes look up the rule for a session's emotion and intent here instead of querying the
+    table. The rule routers invalidate this worker's copy on every write; other workers pick the
+    change up within RULE_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._rules: Dict[Tuple[str, str], List[ExpressionRuleRead]] = {}
+        self._loaded_at: Optional[float] = None
+        # Wall-clock time of this worker's last rule write; the reload after it skips lagging replicas.
+        self._written_at: Optional[float] = None
+
+    def _load(self) -> None:
+        from app.db import expression_rule_repository
+
+        service = expression_rule_repository(read_replica=True, last_write=self._written_at)
+        try:
+            rules = service.list()
+        finally:
+            service.close_connection()
+
+        grouped: Dict[Tuple[str, str], List[ExpressionRuleRead]] = {}
+        for rule in rules:
+            grouped.setdefault((rule.emotion, rule.intent), []).append(rule)
+        for matches in grouped.values():
+            matches.sort(key=lambda rule: rule.confidence_threshold, reverse=True)
+
+        with self._lock:
+            self._rules = grouped
+            self._loaded_at = time.monotonic()
+        self.logger.info("Expression rule cache loaded | rules=%d", len(rules))
+
+    def _is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds
+
+    def _match(self, emotion: str, intent: str, confidence: float) -> Optional[ExpressionRuleRead]:
+        for rule in self._rules.get((emotion, intent), []):
+            if confidence >= rule.confidence_threshold:
+                return rule
+        return None
+
+    def warm(self) -> None:
+        try:
+            self._load()
+        except Exception as exc:  # DB may be unavailable at boot; lookups retry lazily.
+            self.logger.warning("Expression rule cache warm-up failed | %s", exc)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+            self._written_at = time.time()
+
+    def lookup(self, emotion: str, intent: str, confidence: float = 1.0) -> Optional[ExpressionRuleRead]:
+        """Return the strictest rule for (emotion, intent) whose threshold the confidence meets."""
+        if self._is_stale():
+            self._load()
+        return self._match(emotion, intent, confidence)
+
+    async def lookup_async(self, emotion: str, intent: str, confidence: float = 1.0) -> Optional[ExpressionRuleRead]:
+        """`lookup` for the compose path: a stale table is reloaded in a worker thread.
+
+        If the reload fails the previous rules keep serving, so a database hiccup never fails a compose.
+        """
+        if self._is_stale():
+            try:
+                await asyncio.to_thread(self._load)
+            except Exception as exc:
+                self.logger.warning("Expression rule cache refresh failed | %s", exc)
+        return self._match(emotion, intent, confidence)
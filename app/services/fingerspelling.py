@@ -0,0 +1,214 @@
+"""Local resolution of fingerspelled letter streams into words.
+
+Recognizers report fingerspelling as single letters (``["J", "O", "H", "N"]``). Instead of
+handing the raw letters to the LLM, `FingerspellingResolver` segments each run of letters into
+lexicon words, tolerating recognizer errors up to a length-dependent edit distance. Only a
+complete segmentation is used; otherwise the run is kept as one raw word ("NOAH" is not turned
+into "NO" + "AH"). The lexicon is a trie of the built-in lexicalized fingerspellings, the words
+in FINGERSPELL_LEXICON_PATH (names, domain vocabulary) and, per request, the user's
+preferred words.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Lexicalized fingerspellings (#OK, #JOB, ...) that signers spell rather than sign.
+DEFAULT_VOCABULARY = (
+    "OK", "NO", "YES", "SO", "DO", "ALL", "WHAT", "JOB", "BACK", "BUSY", "EARLY", "BANK", "CAR",
+    "BUS", "TOY", "STYLE", "FIX", "SALE", "CLUB", "DOG", "HA", "TV", "EASY", "ASAP", "FAX",
+)
+
+# Fixed cost per word, so a segmentation into fewer words wins over an equally close one.
+WORD_COST = 1
+MAX_RUN_LETTERS = 64
+CACHE_SIZE = 2048
+
+
+def lexicon_key(word: str) -> str:
+    """Letters of a word as the recognizer spells them: upper-case, letters only."""
+    return "".join(char for char in word.upper() if char.isalpha())
+
+
+def allowed_distance(length: int, cap: int) -> int:
+    # Short words are too easy to "correct" into something else, so they must match exactly.
+    if length <= 4:
+        return 0
+    return min(cap, 1 if length <= 8 else 2)
+
+
+class LexiconTrie:
+    """Letter trie of words with a bounded Levenshtein search."""
+
+    _END = None  # key of the (rank, word) entry on nodes that end a word
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: Dict = {}
+        self._size = 0
+        self.max_length = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str) -> None:
+        """Add a word; the first spelling added for a key is the one returned."""
+        key = lexicon_key(word)
+        if not key:
+            return
+        node = self._root
+        for letter in key:
+            node = node.setdefault(letter, {})
+        if self._END not in node:
+            node[self._END] = (self._size, word.strip())
+            self._size += 1
+            self.max_length = max(self.max_length, len(key))
+
+    @staticmethod
+    def _reachable(row: List[int], limits: List[int]) -> bool:
+        # Deeper rows never go below the running minimum of this one, column by column, so a
+        # subtree is only worth walking while some prefix can still get within its limit.
+        lowest = row[0]
+        for distance, limit in zip(row, limits):
+            lowest = min(lowest, distance)
+            if lowest <= limit:
+                return True
+        return False
+
+    def prefix_matches(self, key: str, cap: int) -> Dict[int, Tuple[int, int, str]]:
+        """Closest word for every prefix of `key`: {prefix length: (distance, rank, word)}.
+
+        One bounded Levenshtein walk of the trie scores all prefixes at once; each prefix only
+        accepts words within `allowed_distance(prefix length, cap)`.
+        """
+        limits = [allowed_distance(length, cap) for length in range(len(key) + 1)]
+        best: Dict[int, Tuple[int, int, str]] = {}
+        stack = [(self._root, list(range(len(key) + 1)))]
+        while stack:
+            node, previous = stack.pop()
+            for letter, child in node.items():
+                if letter is self._END:
+                    continue
+                row = [previous[0] + 1]
+                for column in range(1, len(key) + 1):
+                    row.append(
+                        min(
+                            row[column - 1] + 1,
+                            previous[column] + 1,
+                            previous[column - 1] + (key[column - 1] != letter),
+                        )
+                    )
+                entry = child.get(self._END)
+                if entry is not None:
+                    for length in range(1, len(key) + 1):
+                        if row[length] <= limits[length]:
+                            candidate = (row[length], *entry)
+                            if length not in best or candidate < best[length]:
+                                best[length] = candidate
+                if self._reachable(row, limits):
+                    stack.append((child, row))
+        return best
+
+
+class FingerspellingResolver:
+    """Turns recognizer letter streams into words; see the module docstring."""
+
+    def __init__(self, lexicon: Optional[LexiconTrie] = None, max_distance: int = 2) -> None:
+        self.lexicon = lexicon if lexicon is not None else LexiconTrie(DEFAULT_VOCABULARY)
+        self.max_distance = max(0, max_distance)
+        # The same letters come back in speculative, final and retried composes.
+        self._cache: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Optional[str], max_distance: int = 2) -> "FingerspellingResolver":
+        """Lexicon of the file's words (one per line, '#' comments) before the built-in ones."""
+        lexicon = LexiconTrie()
+        if path:
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    for line in handle:
+                        word = line.split("#", 1)[0].strip()
+                        if word:
+                            lexicon.add(word)
+            except OSError as exc:  # a missing lexicon only makes resolution less useful
+                logging.getLogger(__name__).warning("Fingerspelling lexicon unreadable | path=%s | %s", path, exc)
+        for word in DEFAULT_VOCABULARY:
+            lexicon.add(word)
+        return cls(lexicon, max_distance=max_distance)
+
+    def resolve(self, letters: Optional[Sequence[str]], vocabulary: Iterable[str] = ()) -> List[str]:
+        """Words spelled by `letters`. Entries longer than one letter are kept as already-resolved words.
+
+        `vocabulary` (e.g. the user's preferred words) is matched before the shared lexicon.
+        """
+        if not letters:
+            return []
+        vocabulary = tuple(vocabulary)
+        key = (tuple(letters), vocabulary)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return list(cached)
+
+        words = self._resolve(letters, vocabulary)
+        with self._lock:
+            self._cache[key] = words
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return list(words)
+
+    def _resolve(self, letters: Sequence[str], vocabulary: Tuple[str, ...]) -> List[str]:
+        tries = [LexiconTrie(vocabulary), self.lexicon] if vocabulary else [self.lexicon]
+        words: List[str] = []
+        run: List[str] = []
+        for entry in letters:
+            token = lexicon_key(entry)
+            if len(token) == 1:
+                run.append(token)
+                continue
+            if run:
+                words.extend(self._segment("".join(run), tries))
+                run = []
+            if token:
+                words.append(entry.strip())
+        if run:
+            words.extend(self._segment("".join(run), tries))
+        return words
+
+    def _segment(self, run: str, tries: List[LexiconTrie]) -> List[str]:
+        if len(run) > MAX_RUN_LETTERS:
+            return [run]
+        longest = max(trie.max_length for trie in tries) + self.max_distance
+        # cost[j]: cheapest segmentation of run[:j] into lexicon words; back[j]: (start, word).
+        cost: List[Optional[int]] = [0] + [None] * len(run)
+        back: List[Optional[Tuple[int, str]]] = [None] * (len(run) + 1)
+        for start in range(len(run)):
+            if cost[start] is None:
+                continue
+            matches: Dict[int, Tuple[int, int, str]] = {}
+            for trie in tries:
+                for length, found in trie.prefix_matches(run[start : start + longest], self.max_distance).items():
+                    # Earlier tries (the caller's vocabulary) win ties.
+                    if length not in matches or found[0] < matches[length][0]:
+                        matches[length] = found
+            for length, (distance, _, word) in matches.items():
+                total = cost[start] + WORD_COST + distance
+                if cost[start + length] is None or total < cost[start + length]:
+                    cost[start + length] = total
+                    back[start + length] = (start, word)
+        if cost[-1] is None:
+            return [run]
+
+        words = []
+        end = len(run)
+        while end > 0:
+            start, word = back[end]
+            words.append(word)
+            end = start
+        return words[::-1]
@@ -0,0 +1,327 @@
+"""Input stage between the recognizer's gloss stream and session composes.
+
+The recognizer posts small, noisy chunks: the same gloss repeated over consecutive frames,
+low-confidence alternates flickering in for a frame, and fingerspelled letters re-sent across
+chunks. Composing every chunk would cost one LLM call per chunk. `GlossStreamStage` cleans
+each chunk into a per-session utterance buffer and composes only at an utterance boundary:
+
+* a sentence-final gloss (GLOSS_BOUNDARY_GLOSSES, e.g. ``?``), or a chunk marked ``final``;
+* a pause: no chunk for GLOSS_PAUSE_MS (composed in the background);
+* a runaway utterance longer than GLOSS_MAX_UTTERANCE glosses.
+
+When a compose fails, its glosses go back in front of the buffer, so the next chunk (or a retried
+``final`` one) composes them again. Shutdown composes whatever is still buffered.
+
+Every chunk that did not end up triggering a compose is one LLM call saved
+(`gloss_stream_llm_calls_saved_total`).
+
+Buffers and pause timers live in one worker process, so every chunk of a session must reach
+the same worker; the endpoint refuses chunks without SESSION_AFFINITY.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+
+from app.core.metrics import REGISTRY
+from app.models.translation_session import (
+    GlossStreamChunk,
+    GlossStreamStatus,
+    TranslationSessionComposeRequest,
+    TranslationSessionRead,
+)
+
+CHUNKS = REGISTRY.counter("gloss_stream_chunks_total", "Gloss chunks received from recognizers")
+DROPPED = REGISTRY.counter("gloss_stream_dropped_total", "Glosses and letters dropped as noise", ["reason"])
+COMPOSES = REGISTRY.counter("gloss_stream_composes_total", "Composes triggered by the gloss stream", ["trigger"])
+CALLS_SAVED = REGISTRY.counter(
+    "gloss_stream_llm_calls_saved_total", "Chunks folded into another chunk's compose instead of their own"
+)
+FAILURES = REGISTRY.counter("gloss_stream_compose_failures_total", "Background (pause, shutdown) composes that failed")
+
+ComposeFn = Callable[[TranslationSessionComposeRequest], Awaitable[TranslationSessionRead]]
+SpeculateFn = Callable[[TranslationSessionComposeRequest], Awaitable[bool]]
+
+
+class _Utterance:
+    __slots__ = (
+        "glosses",
+        "times",
+        "letters",
+        "letter_time",
+        "pending_chunks",
+        "chunks",
+        "composes",
+        "saved",
+        "timer",
+        "compose",
+        "compose_lock",
+    )
+
+    def __init__(self) -> None:
+        self.glosses: List[str] = []
+        self.times: List[float] = []
+        self.letters: List[str] = []
+        self.letter_time = 0.0
+        self.pending_chunks = 0  # chunks folded into the buffer since the last compose
+        self.chunks = 0
+        self.composes = 0
+        self.saved = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.compose: Optional[ComposeFn] = None
+        self.compose_lock = asyncio.Lock()  # one compose at a time per session, in order
+
+    def take(self) -> TranslationSessionComposeRequest:
+        request = TranslationSessionComposeRequest(glosses=self.glosses, letters=self.letters or None)
+        self.glosses, self.times, self.letters = [], [], []
+        return request
+
+    def restore(self, request: TranslationSessionComposeRequest) -> None:
+        """Put a failed compose's glosses back in front of anything buffered since it was taken."""
+        self.glosses = list(request.glosses) + self.glosses
+        # Old enough that a new chunk is never taken for a repeat or flicker of them.
+        self.times = [0.0] * len(request.glosses) + self.times
+        self.letters = list(request.letters or []) + self.letters
+
+    def status(
+        self,
+        session_id: str,
+        trigger: Optional[str] = None,
+        session: Optional[TranslationSessionRead] = None,
+    ) -> GlossStreamStatus:
+        return GlossStreamStatus(
+            session_id=session_id,
+            trigger=trigger,
+            session=session,
+            buffered_glosses=list(self.glosses),
+            buffered_letters=list(self.letters),
+            chunks=self.chunks,
+            composes=self.composes,
+            llm_calls_saved=self.saved,
+        )
+
+
+class GlossStreamStage:
+    """Per-worker debouncing stage for recognizer gloss streams; see the module docstring."""
+
+    def __init__(
+        self,
+        pause_seconds: float = 0.8,
+        dedupe_window_seconds: float = 0.5,
+        flicker_window_seconds: float = 0.3,
+        min_confidence: float = 0.35,
+        boundary_glosses: Iterable[str] = (".", "?", "!"),
+        max_utterance_glosses: int = 40,
+        max_sessions: int = 4096,
+    ) -> None:
+        self.pause_seconds = pause_seconds
+        self.dedupe_window_seconds = dedupe_window_seconds
+        self.flicker_window_seconds = flicker_window_seconds
+        self.min_confidence = min_confidence
+        self.boundary_glosses: Set[str] = {gloss.strip().upper() for gloss in boundary_glosses if gloss.strip()}
+        self.max_utterance_glosses = max(1, max_utterance_glosses)
+        self.max_sessions = max(1, max_sessions)
+        self.logger = logging.getLogger(__name__)
+        self._sessions: "OrderedDict[str, _Utterance]" = OrderedDict()
+        self._background: Set[asyncio.Task] = set()
+
+    def _state(self, session_id: str) -> _Utterance:
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _Utterance()
+            while len(self._sessions) > self.max_sessions:
+                # Evict the least recently used idle session; busy ones keep their buffer, and ones
+                # composing may get theirs back.
+                idle = next(
+                    (
+                        key
+                        for key, value in self._sessions.items()
+                        if not value.glosses and not value.letters and not value.compose_lock.locked()
+                    ),
+                    None,
+                )
+                if idle is None or idle == session_id:
+                    break
+                del self._sessions[idle]
+        self._sessions.move_to_end(session_id)
+        return state
+
+    def _add_gloss(self, state: _Utterance, gloss: str, confidence: float, now: float) -> None:
+        if confidence < self.min_confidence:
+            DROPPED.inc(reason="low_confidence")
+            return
+        key = gloss.upper()
+        if state.glosses and key == state.glosses[-1].upper() and now - state.times[-1] <= self.dedupe_window_seconds:
+            # The same sign seen on consecutive frames.
+            DROPPED.inc(reason="duplicate")
+            state.times[-1] = now
+            return
+        if (
+            len(state.glosses) >= 2
+            and key == state.glosses[-2].upper()
+            and now - state.times[-2] <= self.flicker_window_seconds
+        ):
+            # A -> B -> A within the flicker window: B was a momentary misrecognition.
+            DROPPED.inc(reason="flicker", amount=2)
+            state.glosses.pop()
+            state.times.pop()
+            state.times[-1] = now
+            return
+        state.glosses.append(gloss)
+        state.times.append(now)
+
+    def _add_letters(self, state: _Utterance, letters: List[str], now: float) -> None:
+        letters = [letter.strip() for letter in letters if letter.strip()]
+        if (
+            letters
+            and state.letters
+            and letters[0].upper() == state.letters[-1].upper()
+            and now - state.letter_time <= self.dedupe_window_seconds
+        ):
+            # The previous chunk's last letter re-sent; double letters inside a chunk are kept.
+            DROPPED.inc(reason="duplicate")
+            letters = letters[1:]
+        if letters:
+            state.letters.extend(letters)
+            state.letter_time = now
+
+    async def push(
+        self,
+        session_id: str,
+        chunk: GlossStreamChunk,
+        compose: ComposeFn,
+        speculate: Optional[SpeculateFn] = None,
+    ) -> GlossStreamStatus:
+        """Fold a chunk into the session's utterance; compose it when the chunk ends the utterance."""
+        now = asyncio.get_running_loop().time()
+        state = self._state(session_id)
+        state.chunks += 1
+        state.pending_chunks += 1
+        state.compose = compose
+        CHUNKS.inc()
+
+        confidences = chunk.confidences or []
+        for index, raw in enumerate(chunk.glosses):
+            gloss = raw.strip()
+            if gloss:
+                self._add_gloss(state, gloss, confidences[index] if index < len(confidences) else 1.0, now)
+        self._add_letters(state, chunk.letters or [], now)
+        # The buffer only holds kept glosses: from this utterance, or put back by a failed compose,
+        # which this one retries. A boundary dropped as low-confidence or flicker does not end it.
+        boundary = any(gloss.upper() in self.boundary_glosses for gloss in state.glosses)
+
+        trigger = None
+        if chunk.final:
+            trigger = "final"
+        elif boundary:
+            trigger = "boundary"
+        elif len(state.glosses) >= self.max_utterance_glosses:
+            trigger = "length"
+        if trigger is not None and (state.glosses or state.letters):
+            composed = await self._compose(state, self._take(session_id, state, trigger))
+            return state.status(session_id, trigger, composed)
+
+        self._arm_timer(session_id, state)
+        if speculate is not None and (state.glosses or state.letters):
+            prefix = TranslationSessionComposeRequest(
+                glosses=list(state.glosses), letters=list(state.letters) or None, partial=True
+            )
+            try:
+                await speculate(prefix)
+            except Exception as exc:  # speculation is an optimisation; never fail the chunk for it
+                self.logger.debug("Gloss stream speculation failed | session=%s | %s", session_id, exc)
+        return state.status(session_id)
+
+    def _arm_timer(self, session_id: str, state: _Utterance) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+        state.timer = asyncio.get_running_loop().call_later(self.pause_seconds, self._on_pause, session_id)
+
+    def _on_pause(self, session_id: str) -> None:
+        state = self._sessions.get(session_id)
+        if state is None:
+            return
+        state.timer = None
+        if not state.glosses and not state.letters:
+            return
+        # Taken now, not when the task runs, so a chunk arriving meanwhile starts a new utterance.
+        self._compose_in_background(session_id, state, self._take(session_id, state, "pause"), "pause")
+
+    def _compose_in_background(
+        self, session_id: str, state: _Utterance, request: TranslationSessionComposeRequest, trigger: str
+    ) -> None:
+        task = asyncio.create_task(
+            self._background_compose(session_id, state, request, trigger), name=f"gloss-{trigger}-{session_id}"
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _background_compose(
+        self, session_id: str, state: _Utterance, request: TranslationSessionComposeRequest, trigger: str
+    ) -> None:
+        try:
+            await self._compose(state, request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            FAILURES.inc()
+            # The glosses are back in the buffer; the session's next chunk composes them again.
+            self.logger.warning(
+                "Gloss stream compose failed | session=%s | trigger=%s | glosses kept=%d | %s",
+                session_id,
+                trigger,
+                len(request.glosses),
+                exc,
+            )
+
+    def _take(self, session_id: str, state: _Utterance, trigger: str) -> TranslationSessionComposeRequest:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        request = state.take()
+        folded, state.pending_chunks = state.pending_chunks, 0
+        state.saved += folded - 1
+        CALLS_SAVED.inc(folded - 1)
+        COMPOSES.inc(trigger=trigger)
+        state.composes += 1
+        self.logger.info(
+            "Gloss stream compose | session=%s | trigger=%s | chunks=%d | glosses=%d",
+            session_id,
+            trigger,
+            folded,
+            len(request.glosses),
+        )
+        return request
+
+    @staticmethod
+    async def _compose(state: _Utterance, request: TranslationSessionComposeRequest) -> TranslationSessionRead:
+        compose = state.compose
+        async with state.compose_lock:
+            try:
+                return await compose(request)
+            except Exception:
+                # Cleared when taken; without this a retry could never recover the utterance.
+                state.restore(request)
+                raise
+
+    async def stop(self, timeout: float) -> None:
+        """Compose every buffered utterance, waiting up to `timeout` seconds for them and running pause composes."""
+        for session_id, state in self._sessions.items():
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            if (state.glosses or state.letters) and state.compose is not None:
+                self._compose_in_background(session_id, state, self._take(session_id, state, "shutdown"), "shutdown")
+        if self._background:
+            _, pending = await asyncio.wait(set(self._background), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Left over: utterances whose compose failed or timed out.
+        buffered = sum(len(state.glosses) for state in self._sessions.values())
+        self._sessions.clear()
+        if buffered:
+            self.logger.warning("Gloss stream stopped with glosses that could not be composed | glosses=%d", buffered)
@@ -0,0 +1,285 @@
+"""Idempotency-Key support: a retried request replays the stored response instead of running again.
+
+The first request with a key reserves it in the idempotency_keys table for a short lease, runs,
+and stores its status and JSON body for IDEMPOTENCY_TTL_SECONDS. A retry with the same key and
+the same request gets that response back. It carries an `Idempotent-Replayed: true` header, and
+the work (LLM call, appended glosses, inserted row) is not repeated. Other outcomes:
+
+* a retry while the first attempt is still running gets 409 with Retry-After;
+* the same key with a different request gets 422;
+* a failed attempt stores nothing, so its retry runs again;
+* an attempt whose session update was queued for write-behind stores its response once the write
+  lands (a retry meanwhile gets 409), or frees the key if the write fails.
+
+Stored responses are also kept in an in-process LRU, so retries that reach the same worker do
+not touch the database. Keys are scoped per operation (and per session for composes).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Iterator, NamedTuple, Optional, Set, Tuple
+
+from app.core.metrics import REGISTRY
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Expired rows are purged by the worker that completes a request at most this often.
+PURGE_INTERVAL_SECONDS = 600.0
+
+REQUESTS = REGISTRY.counter(
+    "idempotency_requests_total", "Requests carrying an Idempotency-Key, by outcome", ["result"]
+)
+
+
+class IdempotencyConflict(Exception):
+    """An earlier request with the same key is still running."""
+
+    def __init__(self, key: str, retry_after: float) -> None:
+        super().__init__(f"A request with Idempotency-Key '{key}' is still in progress")
+        self.retry_after = retry_after
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different request."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Idempotency-Key '{key}' was already used for a different request")
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: str  # JSON
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Digest of the request parts a key must be reused with (method, path, body, ...)."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class IdempotentCall:
+    """One request's view of its key: the response to replay, or where to store its own."""
+
+    def __init__(
+        self,
+        store: Optional["IdempotencyStore"],
+        scope: str,
+        key: Optional[str],
+        fingerprint: str,
+        replay: Optional[StoredResponse] = None,
+    ) -> None:
+        self.store = store
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+        self.replay = replay
+        self.completed = False
+
+    def complete(self, status_code: int, body: Any) -> None:
+        """Store the JSON-compatible `body` as the response every retry receives."""
+        self.completed = True
+        if self.store is not None and self.key is not None:
+            self.store.complete(self.scope, self.key, self.fingerprint, status_code, json.dumps(body))
+
+    async def complete_async(self, status_code: int, body: Any) -> None:
+        """`complete` for async handlers: the database write runs in a worker thread."""
+        self.completed = True
+        if self.store is not None and self.key is not None:
+            await asyncio.to_thread(
+                self.store.complete, self.scope, self.key, self.fingerprint, status_code, json.dumps(body)
+            )
+
+    def complete_after(self, written: asyncio.Future, status_code: int, body: Any) -> None:
+        """Store the response once `written` (a queued session write) succeeds; free the key if it fails.
+
+        Until then the key stays reserved, so a retry gets 409 instead of applying the update twice.
+        """
+        self.completed = True
+        if self.store is None or self.key is None:
+            return
+
+        def finished(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                work = functools.partial(
+                    self.store.complete, self.scope, self.key, self.fingerprint, status_code, json.dumps(body)
+                )
+            else:
+                work = functools.partial(self.store.release, self.scope, self.key)
+            asyncio.get_running_loop().run_in_executor(None, work)
+
+        written.add_done_callback(finished)
+
+
+class IdempotencyStore:
+    """Database-backed stored responses with an in-process LRU in front; see the module docstring."""
+
+    def __init__(self, ttl_seconds: float = 86400.0, lease_seconds: float = 60.0, cache_size: int = 4096) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.cache_size = max(1, cache_size)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, StoredResponse]]" = OrderedDict()
+        self._running: Set[Tuple[str, str]] = set()
+        self._last_purge = time.monotonic()
+
+    def _service(self):
+        from app.db import idempotency_repository
+
+        return idempotency_repository()
+
+    def _cached(self, entry: Tuple[str, str]) -> Optional[StoredResponse]:
+        with self._lock:
+            cached = self._cache.get(entry)
+            if cached is None:
+                return None
+            if cached[0] <= time.monotonic():
+                del self._cache[entry]
+                return None
+            self._cache.move_to_end(entry)
+            return cached[1]
+
+    def _remember(self, entry: Tuple[str, str], stored: StoredResponse, expires: float) -> None:
+        with self._lock:
+            self._cache[entry] = (expires, stored)
+            self._cache.move_to_end(entry)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _replay(self, key: str, fingerprint: str, stored: StoredResponse) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            REQUESTS.inc(result="mismatch")
+            raise IdempotencyKeyReused(key)
+        REQUESTS.inc(result="replayed")
+        return stored
+
+    def begin(self, scope: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """The stored response for `key`, or None after reserving it for this request.
+
+        Raises IdempotencyConflict while another attempt holds the key and IdempotencyKeyReused
+        when it was used for a different request. If the database is unavailable the request runs
+        without the shared reservation (only this worker's cache protects it).
+        """
+        entry = (scope, key)
+        cached = self._cached(entry)
+        if cached is not None:
+            return self._replay(key, fingerprint, cached)
+        with self._lock:
+            if entry in self._running:
+                REQUESTS.inc(result="conflict")
+                raise IdempotencyConflict(key, 1.0)
+            self._running.add(entry)
+
+        try:
+            service = self._service()
+            try:
+                row = service.claim(
+                    scope, key, fingerprint, datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+                )
+            finally:
+                service.close_connection()
+        except Exception as exc:
+            self.logger.warning("Idempotency store unavailable | scope=%s | %s", scope, exc)
+            row = None
+        if row is None:
+            REQUESTS.inc(result="executed")
+            return None
+
+        self._forget_running(entry)
+        if row["status_code"] is None:
+            if row["fingerprint"] != fingerprint:
+                REQUESTS.inc(result="mismatch")
+                raise IdempotencyKeyReused(key)
+            REQUESTS.inc(result="conflict")
+            remaining = (row["expires_at"] - datetime.utcnow()).total_seconds()
+            raise IdempotencyConflict(key, max(1.0, math.ceil(remaining)))
+        stored = StoredResponse(row["fingerprint"], int(row["status_code"]), row["response_body"])
+        remaining = (row["expires_at"] - datetime.utcnow()).total_seconds()
+        self._remember(entry, stored, time.monotonic() + max(0.0, remaining))
+        return self._replay(key, fingerprint, stored)
+
+    def _forget_running(self, entry: Tuple[str, str]) -> None:
+        with self._lock:
+            self._running.discard(entry)
+
+    def complete(self, scope: str, key: str, fingerprint: str, status_code: int, body: str) -> None:
+        entry = (scope, key)
+        self._remember(entry, StoredResponse(fingerprint, status_code, body), time.monotonic() + self.ttl_seconds)
+        self._forget_running(entry)
+        try:
+            service = self._service()
+            try:
+                service.complete(scope, key, status_code, body, datetime.utcnow() + timedelta(seconds=self.ttl_seconds))
+                if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                    self._last_purge = time.monotonic()
+                    purged = service.purge_expired()
+                    if purged:
+                        self.logger.info("Idempotency keys purged | rows=%d", purged)
+            finally:
+                service.close_connection()
+        except Exception as exc:
+            # The request itself succeeded; only retries reaching other workers lose the replay.
+            self.logger.warning("Failed to store idempotent response | scope=%s | %s", scope, exc)
+
+    def release(self, scope: str, key: str) -> None:
+        self._forget_running((scope, key))
+        try:
+            service = self._service()
+            try:
+                service.release(scope, key)
+            finally:
+                service.close_connection()
+        except Exception as exc:
+            # The reservation lapses on its own once the lease expires.
+            self.logger.warning("Failed to release idempotency key | scope=%s | %s", scope, exc)
+
+    @contextmanager
+    def call(self, scope: str, key: Optional[str], fingerprint: str) -> Iterator[IdempotentCall]:
+        """Wrap one request. Without a key this is a no-op; otherwise see `begin`.
+
+        Leaving the block without `IdempotentCall.complete` (an error, or an early return) frees
+        the key for the next retry.
+        """
+        if key is None:
+            yield IdempotentCall(None, scope, None, fingerprint)
+            return
+        replay = self.begin(scope, key, fingerprint)
+        call = IdempotentCall(self, scope, key, fingerprint, replay)
+        if replay is not None:
+            yield call
+            return
+        try:
+            yield call
+        finally:
+            if not call.completed:
+                self.release(scope, key)
+
+    @asynccontextmanager
+    async def call_async(self, scope: str, key: Optional[str], fingerprint: str) -> AsyncIterator[IdempotentCall]:
+        """`call` for async handlers: claiming and releasing the key run in a worker thread."""
+        if key is None:
+            yield IdempotentCall(None, scope, None, fingerprint)
+            return
+        replay = await asyncio.to_thread(self.begin, scope, key, fingerprint)
+        call = IdempotentCall(self, scope, key, fingerprint, replay)
+        if replay is not None:
+            yield call
+            return
+        try:
+            yield call
+        finally:
+            if not call.completed:
+                await asyncio.to_thread(self.release, scope, key)
@@ -0,0 +1,374 @@
+"""Write-behind persistence for translation session updates.
+
+Session composes hand their update to `SessionWriteQueue` and answer as soon as the text is
+ready. Updates are written to the database in the background:
+
+* per-session ordering: a session always maps to the same shard, and a shard writes FIFO;
+* retries with jittered backoff while the database is failing;
+* a pending overlay so reads (and the next compose) see updates that are not yet written;
+* an optional append-only journal so updates queued by a crashed process are replayed.
+
+The overlay and the ordering only cover one worker process. A compose rewrites the session's
+glosses and context from what it read, so the queue is only used with SESSION_AFFINITY (one
+worker, or every request for a session routed to the same worker).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from uuid import UUID, uuid4
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to checking the pid in the journal name
+    fcntl = None
+
+from app.core.metrics import REGISTRY
+from app.models.translation_session import TranslationSessionRead, TranslationSessionUpdate
+
+QUEUE_DEPTH = REGISTRY.gauge("session_write_queue_depth", "Session updates waiting to be written")
+WRITE_SECONDS = REGISTRY.histogram("session_write_seconds", "Time from enqueue to a persisted session update")
+RETRIES = REGISTRY.counter("session_write_retries_total", "Session update attempts retried after a DB error")
+FAILED = REGISTRY.counter("session_write_failed_total", "Session updates dropped after exhausting retries")
+REPLAYED = REGISTRY.counter("session_write_replayed_total", "Session updates recovered from a journal")
+
+JOURNAL_PREFIX = "session-writes-"
+# Sessions whose last write time is remembered; older ones are long past any replica lag.
+MAX_WRITTEN_SESSIONS = 10000
+
+
+class WriteJournal:
+    """Append-only JSONL log of queued (`w`) and finished (`a`) session updates for one process.
+
+    Each process writes its own file, named with a random id so a restarted process (often pid 1
+    again in a container) never reuses a dead one's journal, and holds an exclusive lock on it
+    while running. On start-up a process claims every other journal whose lock is free and
+    replays the updates it never finished.
+
+    Lines are flushed to the OS before the write is queued, which survives a process crash. They
+    survive a host crash only with `fsync`, at the cost of a disk sync per queued update.
+    """
+
+    def __init__(self, directory: str, compact_after: int = 10000, fsync: bool = False) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.id = uuid4().hex
+        self.path = self.directory / f"{JOURNAL_PREFIX}{os.getpid()}-{self.id}.jsonl"
+        self.compact_after = compact_after
+        self.fsync = fsync
+        self.logger = logging.getLogger(__name__)
+        self._lines = 0
+        self._file: TextIO = self.path.open("a", encoding="utf-8")
+        if fcntl is not None:
+            # Released by the OS when the process dies, however it dies.
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._lines += 1
+
+    def append(self, seq: int, session_id: str, fields: Dict[str, Any]) -> None:
+        self._write({"op": "w", "seq": seq, "session_id": session_id, "fields": fields})
+
+    def ack(self, seq: int, idle: bool) -> None:
+        self._write({"op": "a", "seq": seq})
+        if idle and self._lines >= self.compact_after:
+            # Nothing is outstanding, so the whole log can be dropped. Truncated in place so the
+            # lock on the file is never released.
+            self._file.seek(0)
+            self._file.truncate()
+            self._lines = 0
+
+    def close(self, idle: bool) -> None:
+        # With updates still outstanding the file stays behind for the next process to replay.
+        if idle:
+            self.path.unlink(missing_ok=True)
+        self._file.close()
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _owner_alive(self, path: Path, handle: TextIO) -> bool:
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            return False
+        try:
+            pid = int(path.stem[len(JOURNAL_PREFIX):].split("-", 1)[0])
+        except ValueError:
+            return True
+        return pid != os.getpid() and self._pid_alive(pid)
+
+    def recover(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Claim journals of processes that are gone and return their unfinished updates in order."""
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        for path in sorted(self.directory.glob(f"{JOURNAL_PREFIX}*.jsonl")):
+            if path == self.path:
+                continue
+            try:
+                handle = path.open(encoding="utf-8")
+            except OSError:
+                continue  # claimed by another process since the listing
+            with handle:
+                if self._owner_alive(path, handle):
+                    continue
+                claimed = path.with_suffix(f".claimed-{self.id}")
+                try:
+                    path.rename(claimed)  # atomic: only one live process wins the claim
+                except OSError:
+                    continue
+                writes = self._unfinished(handle)
+            pending.extend(writes[seq] for seq in sorted(writes))
+            claimed.unlink()
+            self.logger.info("Journal recovered | file=%s | pending=%d", path.name, len(writes))
+        return pending
+
+    @staticmethod
+    def _unfinished(handle: TextIO) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        writes: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn last line from the crash
+            if record.get("op") == "w":
+                writes[record["seq"]] = (record["session_id"], record["fields"])
+            elif record.get("op") == "a":
+                writes.pop(record["seq"], None)
+        return writes
+
+
+class _Write:
+    __slots__ = ("seq", "session_id", "fields", "enqueued", "done")
+
+    def __init__(self, seq: int, session_id: str, fields: Dict[str, Any], enqueued: float) -> None:
+        self.seq = seq
+        self.session_id = session_id
+        self.fields = fields
+        self.enqueued = enqueued
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class SessionWriteQueue:
+    """Per-worker write-behind queue for session updates; see the module docstring."""
+
+    def __init__(
+        self,
+        shards: int = 4,
+        shard_queue_size: int = 256,
+        max_attempts: int = 8,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        journal_dir: Optional[str] = None,
+        journal_fsync: bool = False,
+    ) -> None:
+        self.shards = max(1, shards)
+        self.shard_queue_size = max(1, shard_queue_size)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.journal_dir = journal_dir
+        self.journal_fsync = journal_fsync
+        self.logger = logging.getLogger(__name__)
+        self.journal: Optional[WriteJournal] = None
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._pending: Dict[str, List[_Write]] = {}
+        # Wall-clock time each session's last update was written, for read-your-writes (see written_at).
+        self._written: "OrderedDict[str, float]" = OrderedDict()
+        self._seq = 0
+
+    def _service(self):
+        from app.db import translation_session_repository
+
+        return translation_session_repository()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(writes) for writes in self._pending.values())
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.shard_queue_size) for _ in range(self.shards)]
+        self._tasks = [asyncio.create_task(self._run(queue), name=f"session-writer-{index}") for index, queue in enumerate(self._queues)]
+        if self.journal_dir:
+            self.journal = WriteJournal(self.journal_dir, fsync=self.journal_fsync)
+            recovered = self.journal.recover()
+            for session_id, fields in recovered:
+                self._enqueue_nowait(session_id, fields)
+            if recovered:
+                REPLAYED.inc(len(recovered))
+
+    def _shard(self, session_id: str) -> asyncio.Queue:
+        return self._queues[zlib.crc32(session_id.encode()) % self.shards]
+
+    def _track(self, session_id: str, fields: Dict[str, Any]) -> _Write:
+        self._seq += 1
+        write = _Write(self._seq, session_id, fields, asyncio.get_running_loop().time())
+        if self.journal is not None:
+            self.journal.append(write.seq, session_id, fields)
+        self._pending.setdefault(session_id, []).append(write)
+        QUEUE_DEPTH.set(self.pending_count)
+        return write
+
+    def _enqueue_nowait(self, session_id: str, fields: Dict[str, Any]) -> None:
+        # Replay path at start-up: shard queues are empty, so only overflow needs handling.
+        write = self._track(session_id, fields)
+        queue = self._shard(session_id)
+        if queue.full():
+            asyncio.get_running_loop().create_task(queue.put(write))
+        else:
+            queue.put_nowait(write)
+
+    async def submit(self, session_id: UUID, update: TranslationSessionUpdate) -> asyncio.Future:
+        """Queue an update; waits only while the shard is full. The future resolves once written."""
+        self.start()
+        write = self._track(str(session_id), update.model_dump(exclude_unset=True, mode="json"))
+        try:
+            await self._shard(write.session_id).put(write)
+        except BaseException:
+            # Cancelled while the shard was full (e.g. the client disconnected): the update was never
+            # queued, so it must not show in overlay(), hold up wait_for_session() or be replayed.
+            self._untrack(write)
+            write.done.cancel()
+            raise
+        return write.done
+
+    def overlay(self, session: Optional[TranslationSessionRead]) -> Optional[TranslationSessionRead]:
+        """The session as it will be once its queued updates are written."""
+        if session is None:
+            return None
+        writes = self._pending.get(str(session.id))
+        if not writes:
+            return session
+        fields: Dict[str, Any] = {}
+        for write in writes:
+            fields.update(write.fields)
+        return session.model_copy(update=TranslationSessionUpdate(**fields).model_dump(exclude_unset=True))
+
+    def written_at(self, session_id: UUID) -> Optional[float]:
+        """When the session's last queued update reached the database, if this worker wrote it.
+
+        The client's own stamp (app.api.consistency) predates that write, so reads combine both.
+        """
+        return self._written.get(str(session_id))
+
+    async def wait_for_session(self, session_id: UUID) -> None:
+        """Wait until everything queued for the session so far has been written (or dropped)."""
+        writes = list(self._pending.get(str(session_id), ()))
+        if writes:
+            await asyncio.gather(*(asyncio.shield(write.done) for write in writes), return_exceptions=True)
+
+    async def stop(self, timeout: float) -> None:
+        """Flush queued updates for up to `timeout` seconds; unfinished ones stay in the journal."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Session write flush timeout | pending=%d", self.pending_count)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.journal is not None:
+            self.journal.close(idle=not self._pending)
+            self.journal = None
+
+    def _untrack(self, write: _Write) -> None:
+        writes = self._pending.get(write.session_id, [])
+        if write in writes:
+            writes.remove(write)
+        if not writes:
+            self._pending.pop(write.session_id, None)
+        if self.journal is not None:
+            self.journal.ack(write.seq, idle=not self._pending)
+        QUEUE_DEPTH.set(self.pending_count)
+
+    def _finish(self, write: _Write, error: Optional[BaseException] = None) -> None:
+        self._untrack(write)
+        if error is None:
+            self._written[write.session_id] = time.time()
+            self._written.move_to_end(write.session_id)
+            if len(self._written) > MAX_WRITTEN_SESSIONS:
+                self._written.popitem(last=False)
+        if not write.done.done():
+            if error is None:
+                write.done.set_result(None)
+            else:
+                write.done.set_exception(error)
+                write.done.exception()  # mark retrieved: most submitters never await the result
+
+    def _persist(self, write: _Write) -> bool:
+        service = self._service()
+        try:
+            return service.update(UUID(write.session_id), TranslationSessionUpdate(**write.fields)) is not None
+        finally:
+            service.close_connection()
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            write: _Write = await queue.get()
+            try:
+                await self._write_with_retry(write)
+                WRITE_SECONDS.observe(loop.time() - write.enqueued)
+            finally:
+                queue.task_done()
+
+    async def _write_with_retry(self, write: _Write) -> None:
+        for attempt in range(self.max_attempts):
+            try:
+                found = await asyncio.to_thread(self._persist, write)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if attempt + 1 >= self.max_attempts:
+                    FAILED.inc()
+                    self.logger.error(
+                        "Session write dropped | session=%s | attempts=%d | fields=%s | %s",
+                        write.session_id,
+                        attempt + 1,
+                        sorted(write.fields),
+                        exc,
+                    )
+                    self._finish(write, exc)
+                    return
+                RETRIES.inc()
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                self.logger.warning(
+                    "Session write retry | session=%s | attempt=%d | backoff=%.2fs | %s",
+                    write.session_id,
+                    attempt + 1,
+                    backoff,
+                    exc,
+                )
+                await asyncio.sleep(backoff)
+                continue
+            if not found:
+                # Deleted while the update was queued; nothing left to write.
+                self.logger.info("Session write skipped, session gone | session=%s", write.session_id)
+            self._finish(write)
+            return
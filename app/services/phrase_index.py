@@ -0,0 +1,222 @@
+"""Phrase index mined from accepted sessions, answering frequent utterances without the LLM.
+
+``python -m app.scripts.mine_phrases`` scans translation_sessions and keeps every gloss
+sequence seen at least ``--min-count`` times together with its most common sentence. The
+result is written to one binary file that workers memory-map at startup (PHRASE_INDEX_PATH):
+
+    header   b"ASLPHIX1" | u16 version length | version (utf-8) | u32 entry count
+    slots    entry count x (u64 key hash, u32 record offset), sorted by hash
+    records  u16 key length | u16 text length | u32 sessions | f32 confidence | key | text
+
+Lookups binary-search the slots in place, so the index costs page cache rather than heap and
+is shared by every worker on the box. Composes record the hit in the session's
+`tool_metadata` (see PHRASE_HIT_KEY / PHRASE_VERSION_KEY).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.metrics import REGISTRY
+
+LOOKUPS = REGISTRY.counter("phrase_index_lookups_total", "Phrase index lookups by result", ["result"])
+
+MAGIC = b"ASLPHIX1"
+_SLOT = struct.Struct("<QI")
+_RECORD = struct.Struct("<HHIf")
+_KEY_SEPARATOR = "\x1f"
+
+# Model name reported for compose results served from the index.
+PHRASE_INDEX_MODEL = "phrase-index"
+# tool_metadata keys written by composes answered from the index.
+PHRASE_HIT_KEY = "phrase_index_hit"
+PHRASE_VERSION_KEY = "phrase_index_version"
+# Fillers the recognizer inserts between signs. A "near" hit is the query with these removed;
+# no other gloss is ever dropped, since negation (NOT, NEVER), time (TOMORROW) and pronoun (IX-1)
+# glosses change the sentence however long the utterance is.
+FILLER_GLOSSES = frozenset({"PALM-UP", "UM", "UH", "HMM", "HOLD", "GESTURE"})
+# Glosses that never change the sentence an utterance maps to.
+_IGNORED_GLOSSES = frozenset({"", "."})
+
+
+def phrase_key(glosses: Iterable[str]) -> Tuple[str, ...]:
+    """Index key of an utterance: upper-cased glosses, repeats and bare periods removed."""
+    key: List[str] = []
+    for gloss in glosses:
+        token = gloss.strip().upper()
+        if token in _IGNORED_GLOSSES or (key and key[-1] == token):
+            continue
+        key.append(token)
+    return tuple(key)
+
+
+def _encode_key(key: Sequence[str]) -> bytes:
+    return _KEY_SEPARATOR.join(key).encode("utf-8")
+
+
+def _hash(encoded: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+class PhraseHit(NamedTuple):
+    text: str
+    confidence: float
+    sessions: int
+    path: str  # "exact" or "near"
+
+
+class PhraseMiner:
+    """Counts (utterance, sentence) pairs and writes the frequent ones as an index file."""
+
+    def __init__(self, min_count: int = 3, max_glosses: int = 8, min_share: float = 0.5) -> None:
+        self.min_count = max(1, min_count)
+        self.max_glosses = max(1, max_glosses)
+        self.min_share = min_share
+        self._texts: Dict[Tuple[str, ...], Counter] = defaultdict(Counter)
+        self._confidence: Dict[Tuple[Tuple[str, ...], str], float] = defaultdict(float)
+        self.scanned = 0
+
+    def add(self, glosses: Sequence[str], text: str, confidence: Optional[float]) -> None:
+        self.scanned += 1
+        key = phrase_key(glosses)
+        text = (text or "").strip()
+        if not key or not text or len(key) > self.max_glosses:
+            return
+        self._texts[key][text] += 1
+        self._confidence[(key, text)] += confidence if confidence is not None else 1.0
+
+    def phrases(self) -> List[Tuple[Tuple[str, ...], str, int, float]]:
+        """(key, best sentence, sessions with that sentence, mean confidence) per frequent key."""
+        found = []
+        for key, texts in self._texts.items():
+            total = sum(texts.values())
+            if total < self.min_count:
+                continue
+            # Most common sentence; equally common ones are ranked by their mean confidence.
+            text, count = max(texts.items(), key=lambda item: (item[1], self._confidence[(key, item[0])] / item[1]))
+            if count / total < self.min_share:
+                continue  # users accept several different sentences: leave it to the model
+            found.append((key, text, count, self._confidence[(key, text)] / count))
+        return found
+
+    def write(self, path: str, version: Optional[str] = None) -> Tuple[str, int]:
+        """Write the index atomically; returns (version, entries)."""
+        version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        slots: List[Tuple[int, int]] = []
+        records = bytearray()
+        for key, text, count, confidence in sorted(self.phrases()):
+            encoded_key = _encode_key(key)
+            encoded_text = text.encode("utf-8")[:0xFFFF]
+            if len(encoded_key) > 0xFFFF:
+                continue
+            slots.append((_hash(encoded_key), len(records)))
+            records += _RECORD.pack(len(encoded_key), len(encoded_text), count, confidence)
+            records += encoded_key + encoded_text
+        slots.sort()
+
+        encoded_version = version.encode("utf-8")
+        header = MAGIC + struct.pack("<H", len(encoded_version)) + encoded_version + struct.pack("<I", len(slots))
+        temporary = f"{path}.tmp-{os.getpid()}"
+        with open(temporary, "wb") as handle:
+            handle.write(header)
+            for slot in slots:
+                handle.write(_SLOT.pack(*slot))
+            handle.write(records)
+            handle.flush()
+            os.fsync(handle.fileno())
+        # Workers that still have the previous file mapped keep reading it until they reload.
+        os.replace(temporary, path)
+        return version, len(slots)
+
+
+class PhraseIndex:
+    """Read side: a memory-mapped index file; see the module docstring."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._map[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a phrase index")
+            position = len(MAGIC)
+            (version_length,) = struct.unpack_from("<H", self._map, position)
+            position += 2
+            self.version = bytes(self._map[position : position + version_length]).decode("utf-8")
+            position += version_length
+            (self.size,) = struct.unpack_from("<I", self._map, position)
+            self._slots = position + 4
+            self._records = self._slots + self.size * _SLOT.size
+        except Exception:
+            self._map.close()
+            raise
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional["PhraseIndex"]:
+        """The index at `path`, or None when unset or unreadable (composes then skip it)."""
+        if not path:
+            return None
+        logger = logging.getLogger(__name__)
+        try:
+            index = cls(path)
+        except (OSError, ValueError, struct.error) as exc:
+            logger.warning("Phrase index unavailable | path=%s | %s", path, exc)
+            return None
+        logger.info("Phrase index loaded | path=%s | version=%s | phrases=%d", path, index.version, index.size)
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _get(self, key: Tuple[str, ...]) -> Optional[Tuple[str, int, float]]:
+        encoded = _encode_key(key)
+        wanted = _hash(encoded)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if _SLOT.unpack_from(self._map, self._slots + middle * _SLOT.size)[0] < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        # Several keys may share a hash; compare the stored key of each.
+        while low < self.size:
+            found, offset = _SLOT.unpack_from(self._map, self._slots + low * _SLOT.size)
+            if found != wanted:
+                return None
+            position = self._records + offset
+            key_length, text_length, count, confidence = _RECORD.unpack_from(self._map, position)
+            position += _RECORD.size
+            if self._map[position : position + key_length] == encoded:
+                position += key_length
+                text = bytes(self._map[position : position + text_length]).decode("utf-8", errors="replace")
+                return text, count, round(confidence, 4)
+            low += 1
+        return None
+
+    def lookup(self, glosses: Sequence[str]) -> Optional[PhraseHit]:
+        """Sentence for an utterance: the same glosses ("exact") or the same without fillers ("near")."""
+        key = phrase_key(glosses)
+        if not key:
+            return None
+        found = self._get(key)
+        if found is not None:
+            LOOKUPS.inc(result="exact")
+            return PhraseHit(found[0], found[2], found[1], "exact")
+        without_fillers = phrase_key(gloss for gloss in key if gloss not in FILLER_GLOSSES)
+        if without_fillers and without_fillers != key:
+            found = self._get(without_fillers)
+            if found is not None:
+                LOOKUPS.inc(result="near")
+                return PhraseHit(found[0], found[2], found[1], "near")
+        LOOKUPS.inc(result="miss")
+        return None
+
+    def close(self) -> None:
+        self._map.close()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class PreferredWordsIndex:
+    """Compiled gloss → preferred word substitutions.
+
+    Applied twice around the LLM call: glosses are swapped before the prompt is built, and
+    the default English rendering of a signed gloss is swapped in the composed text. That
+    personalises the output without extra prompt text or a second LLM round.
+    """
+
+    def __init__(self, preferred_words: Dict[str, str]) -> None:
+        self.mapping = {gloss.strip().upper(): word.strip() for gloss, word in preferred_words.items() if gloss and word}
+        self._by_surface = {self._surface(gloss): gloss for gloss in self.mapping}
+        surfaces = sorted(self._by_surface, key=len, reverse=True)
+        self._pattern = (
+            re.compile(r"\b(" + "|".join(re.escape(surface) for surface in surfaces) + r")\b", re.IGNORECASE)
+            if surfaces
+            else None
+        )
+
+    @staticmethod
+    def _surface(gloss: str) -> str:
+        return gloss.replace("-", " ").lower()
+
+    def __bool__(self) -> bool:
+        return bool(self.mapping)
+
+    def vocabulary(self) -> List[str]:
+        """Preferred words split into single words, e.g. for matching fingerspelled names."""
+        return [word for phrase in self.mapping.values() for word in phrase.split()]
+
+    def apply_to_glosses(self, glosses: Iterable[str]) -> List[str]:
+        return [self.mapping.get(gloss.upper(), gloss) for gloss in glosses]
+
+    def apply_to_text(self, text: str, glosses: Iterable[str]) -> str:
+        """Substitute only glosses that were actually signed, so context words are left alone."""
+        active = {gloss.upper() for gloss in glosses} & self.mapping.keys()
+        if not active or self._pattern is None:
+            return text
+
+        def replace(match: re.Match) -> str:
+            found = match.group(0)
+            gloss = self._by_surface[found.lower()]
+            if gloss not in active:
+                return found
+            word = self.mapping[gloss]
+            return word[:1].upper() + word[1:] if found[:1].isupper() else word
+
+        return self._pattern.sub(replace, text)
+
+
+class UserPreferenceStore:
+    """Per-user preferred words merged across sessions, cached in process with invalidation.
+
+    Writes go to the user_preferred_words table and invalidate the cached entry; other workers
+    pick the change up once their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_users: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, PreferredWordsIndex]]" = OrderedDict()
+
+    def _service(self):
+        from app.db import user_preference_repository
+
+        return user_preference_repository()
+
+    def index(self, user_id: str) -> PreferredWordsIndex:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        service = self._service()
+        try:
+            index = PreferredWordsIndex(service.get(user_id))
+        finally:
+            service.close_connection()
+
+        with self._lock:
+            self._entries[user_id] = (now, index)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return index
+
+    def get(self, user_id: str) -> Dict[str, str]:
+        return dict(self.index(user_id).mapping)
+
+    def merged_index(self, user_id: Optional[str], session_words: Dict[str, str]) -> PreferredWordsIndex:
+        """User-wide preferences overlaid with the session's own overrides."""
+        if not user_id:
+            return PreferredWordsIndex(session_words)
+        try:
+            user_index = self.index(user_id)
+        except Exception as exc:  # personalisation must never fail a compose
+            self.logger.warning("Preferred words unavailable | user=%s | %s", user_id, exc)
+            return PreferredWordsIndex(session_words)
+        if not session_words:
+            return user_index
+        return PreferredWordsIndex({**user_index.mapping, **session_words})
+
+    def merge(self, user_id: str, preferred_words: Dict[str, str]) -> None:
+        if not preferred_words:
+            return
+        normalized = {gloss.strip().upper(): word.strip() for gloss, word in preferred_words.items() if gloss and word}
+        service = self._service()
+        try:
+            service.upsert(user_id, normalized)
+        finally:
+            service.close_connection()
+        self.invalidate(user_id)
+
+    def delete(self, user_id: str, gloss: str) -> bool:
+        service = self._service()
+        try:
+            deleted = service.delete(user_id, gloss.strip().upper())
+        finally:
+            service.close_connection()
+        self.invalidate(user_id)
+        return deleted
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
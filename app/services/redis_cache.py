@@ -0,0 +1,254 @@
+"""Shared compose cache tier on any Redis-protocol server (Redis, Valkey, KeyDB, ...).
+
+Every instance reads and writes the same keys, so a phrase composed by one instance is a
+cache hit for cold ones. Each entry is a compact binary value: a version byte, a float32
+confidence (NaN for none) and the UTF-8 sentence. The model is part of the key. Entries expire
+after COMPOSE_CACHE_REDIS_TTL_SECONDS.
+
+Lookups and writes are batched. Everything queued within COMPOSE_CACHE_BATCH_MS is sent as one
+pipelined round trip: a single MGET plus one SET per write. The client is a small RESP2
+implementation over asyncio streams, so no extra dependency is needed. The tier is strictly
+best effort. A timeout or error counts as a miss, and the tier is skipped for `retry_after`
+seconds so an unreachable server does not add latency to every compose.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import struct
+from typing import Any, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from app.core.metrics import REGISTRY
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+from .compose_cache import CACHE_LOOKUPS, exact_key
+
+BATCH_SIZE = REGISTRY.histogram(
+    "compose_cache_redis_batch_size",
+    "Commands per pipelined round trip to the shared compose cache",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+ENTRY_VERSION = 1
+_ENTRY_HEADER = struct.Struct("<Bf")
+
+RedisArgument = Union[str, bytes, int]
+
+
+class RedisError(Exception):
+    """An error reply from the server."""
+
+
+def encode_entry(response: ComposeSentenceResponse) -> bytes:
+    confidence = response.confidence if response.confidence is not None else math.nan
+    return _ENTRY_HEADER.pack(ENTRY_VERSION, confidence) + response.text.encode("utf-8")
+
+
+def decode_entry(raw: Optional[bytes], model: str) -> Optional[ComposeSentenceResponse]:
+    """Inverse of encode_entry; None for missing values and entries of another format version."""
+    if not raw or len(raw) < _ENTRY_HEADER.size or raw[0] != ENTRY_VERSION:
+        return None
+    _, confidence = _ENTRY_HEADER.unpack_from(raw)
+    return ComposeSentenceResponse(
+        text=raw[_ENTRY_HEADER.size :].decode("utf-8", errors="replace"),
+        confidence=None if math.isnan(confidence) else round(confidence, 4),
+        model=model,
+    )
+
+
+class RedisClient:
+    """Single pipelined RESP2 connection, opened on first use and reopened after errors."""
+
+    def __init__(self, url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(command: Sequence[RedisArgument]) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for argument in command:
+            if isinstance(argument, int):
+                argument = str(argument)
+            if isinstance(argument, str):
+                argument = argument.encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(argument), argument))
+        return b"".join(parts)
+
+    async def _read(self) -> Any:
+        line = await self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the Redis server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            return RedisError(body.decode("utf-8"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            return None if length < 0 else (await self._reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [await self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply: {line[:32]!r}")
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        handshake: List[List[RedisArgument]] = []
+        if self.password is not None:
+            handshake.append(["AUTH", self.username, self.password] if self.username else ["AUTH", self.password])
+        if self.db:
+            handshake.append(["SELECT", self.db])
+        if handshake:
+            for reply in await self._send(handshake):
+                if isinstance(reply, RedisError):
+                    raise reply
+
+    async def _send(self, commands: Sequence[Sequence[RedisArgument]]) -> List[Any]:
+        self._writer.write(b"".join(self._encode(command) for command in commands))
+        await self._writer.drain()
+        return [await self._read() for _ in commands]
+
+    async def execute(self, commands: Sequence[Sequence[RedisArgument]]) -> List[Any]:
+        """Send commands in one round trip; error replies come back as RedisError values."""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                return await self._send(commands)
+            except BaseException:
+                # Includes cancellation by a timeout: replies may still be in flight, so the
+                # stream can no longer be trusted.
+                self._reset()
+                raise
+
+    def _reset(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def close(self) -> None:
+        async with self._lock:
+            writer = self._writer
+            self._reset()
+            if writer is not None:
+                try:
+                    await writer.wait_closed()
+                except (ConnectionError, OSError):
+                    pass
+
+
+class RedisComposeCache:
+    """Shared L2 compose cache; see the module docstring."""
+
+    def __init__(
+        self,
+        client: RedisClient,
+        prefix: str = "aslagent:compose:",
+        ttl_seconds: float = 86400.0,
+        timeout_seconds: float = 0.05,
+        batch_seconds: float = 0.002,
+        max_batch: int = 64,
+        retry_after: float = 5.0,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl_ms = max(1, int(ttl_seconds * 1000))
+        self.timeout_seconds = timeout_seconds
+        self.batch_seconds = batch_seconds
+        self.max_batch = max(1, max_batch)
+        self.retry_after = retry_after
+        self.logger = logging.getLogger(__name__)
+        self._gets: List[Tuple[str, asyncio.Future]] = []
+        self._sets: List[Tuple[str, bytes]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._down_until = 0.0
+
+    def _available(self) -> bool:
+        return asyncio.get_running_loop().time() >= self._down_until
+
+    def _schedule(self) -> None:
+        if len(self._gets) + len(self._sets) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.batch_seconds, self._flush_now)
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        gets, self._gets = self._gets, []
+        sets, self._sets = self._sets, []
+        if not gets and not sets:
+            return
+        task = asyncio.create_task(self._flush(gets, sets))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, gets: List[Tuple[str, asyncio.Future]], sets: List[Tuple[str, bytes]]) -> None:
+        keys = list(dict.fromkeys(key for key, _ in gets))
+        commands: List[List[RedisArgument]] = []
+        if keys:
+            commands.append(["MGET", *keys])
+        for key, value in sets:
+            commands.append(["SET", key, value, "PX", self.ttl_ms])
+        BATCH_SIZE.observe(len(commands))
+        values: dict = {}
+        failed = False
+        try:
+            replies = await asyncio.wait_for(self.client.execute(commands), timeout=self.timeout_seconds)
+            if keys:
+                if isinstance(replies[0], RedisError):
+                    raise replies[0]
+                values = dict(zip(keys, replies[0]))
+        except Exception as exc:
+            failed = True
+            self._down_until = asyncio.get_running_loop().time() + self.retry_after
+            self.logger.warning(
+                "Shared compose cache unavailable | retry_in=%.1fs | %s: %s",
+                self.retry_after,
+                type(exc).__name__,
+                exc,
+            )
+        for key, future in gets:
+            if not future.done():
+                future.set_result((failed, values.get(key)))
+
+    async def get(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]:
+        if not self._available():
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._gets.append((self.prefix + exact_key(request, model), future))
+        self._schedule()
+        failed, raw = await future
+        if failed:
+            CACHE_LOOKUPS.inc(layer="redis", result="error")
+            return None
+        response = decode_entry(raw, model)
+        CACHE_LOOKUPS.inc(layer="redis", result="hit" if response is not None else "miss")
+        return response
+
+    async def put(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None:
+        # Fire and forget: the write rides along with the next batch.
+        if not self._available():
+            return
+        self._sets.append((self.prefix + exact_key(request, model), encode_entry(response)))
+        self._schedule()
+
+    async def close(self) -> None:
+        self._flush_now()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.client.close()
@@ -0,0 +1,307 @@
+"""Timeouts, hedged requests, retries and circuit breaking for upstream (LLM) calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Upstream '{name}' is degraded; circuit open for another {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class UpstreamTimeoutError(TimeoutError):
+    """Raised when an upstream call does not finish within its deadline."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to derive the hedging delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(quantile * len(ordered)))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker. While open, one probe call is let through per reset interval."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout:
+                # Re-arm the timer so a probe that never reports back only blocks one interval.
+                self.state = self.HALF_OPEN
+                self._opened_at = now
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    """Runs an upstream operation under a deadline with hedging, bounded retries and a breaker.
+
+    Operations receive the per-attempt timeout in seconds so they can pass it on to the client.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_retryable: Callable[[BaseException], bool],
+        attempt_timeout: float = 8.0,
+        total_timeout: float = 20.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        hedge_enabled: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.3,
+        breaker: Optional[CircuitBreaker] = None,
+        tracker: Optional[LatencyTracker] = None,
+    ) -> None:
+        self.name = name
+        self.is_retryable = is_retryable
+        self.attempt_timeout = attempt_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.tracker = tracker or LatencyTracker()
+        self.logger = logging.getLogger(__name__)
+
+    def is_degraded_error(self, exc: BaseException) -> bool:
+        """True for errors that mean upstream is unhealthy (vs. a bad request or bad credentials)."""
+        return isinstance(exc, (CircuitOpenError, UpstreamTimeoutError, asyncio.TimeoutError)) or self.is_retryable(exc)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many workers from synchronising.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _hedge_delay(self, budget: float) -> Optional[float]:
+        if not self.hedge_enabled:
+            return None
+        p = self.tracker.percentile(self.hedge_quantile)
+        if p is None:
+            return None
+        delay = max(self.hedge_min_delay, p)
+        return delay if delay < budget else None
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+    def _record_outcome(self, exc: BaseException) -> bool:
+        """Update the breaker for a failed attempt and return whether it may be retried."""
+        if self.is_degraded_error(exc):
+            self.breaker.record_failure()
+            return True
+        # Upstream answered (e.g. 400/401), so it is healthy even though this call failed.
+        self.breaker.record_success()
+        return False
+
+    async def call(
+        self,
+        operation: Callable[[float], Awaitable[T]],
+        deadline: Optional[float] = None,
+    ) -> T:
+        """Run `operation`; `deadline` is an absolute `loop.time()` that caps all attempts."""
+        self._check_breaker()
+        loop = asyncio.get_running_loop()
+        overall = loop.time() + self.total_timeout
+        if deadline is not None:
+            overall = min(overall, deadline)
+
+        attempt = 0
+        while True:
+            remaining = overall - loop.time()
+            if remaining <= 0:
+                raise UpstreamTimeoutError(f"Upstream '{self.name}' exceeded its deadline")
+            try:
+                result = await self._attempt(operation, min(self.attempt_timeout, remaining))
+            except Exception as exc:
+                if deadline is not None and isinstance(exc, UpstreamTimeoutError) and loop.time() >= deadline:
+                    # The caller's deadline cut the call short; that says nothing about upstream health.
+                    raise
+                retryable = self._record_outcome(exc)
+                backoff = self._backoff(attempt)
+                if not retryable or attempt >= self.max_retries or loop.time() + backoff >= overall:
+                    raise
+                attempt += 1
+                self.logger.warning(
+                    "Upstream retry | name=%s | attempt=%d | backoff=%.2fs | error=%s",
+                    self.name,
+                    attempt,
+                    backoff,
+                    exc,
+                )
+                await asyncio.sleep(backoff)
+                self._check_breaker()
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _attempt(self, operation: Callable[[float], Awaitable[T]], budget: float) -> T:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+
+        async def timed(timeout: float) -> T:
+            started = loop.time()
+            result = await operation(timeout)
+            self.tracker.record(loop.time() - started)
+            return result
+
+        delay = self._hedge_delay(budget)
+        hedge_at = loop.time() + delay if delay is not None else None
+        pending = {asyncio.ensure_future(timed(budget))}
+        last_exc: Optional[BaseException] = None
+        try:
+            while pending:
+                now = loop.time()
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, wake - now), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result()
+                    last_exc = exc
+                if not pending:
+                    break
+                now = loop.time()
+                if now >= deadline:
+                    raise UpstreamTimeoutError(f"Upstream '{self.name}' timed out after {budget:.2f}s")
+                if hedge_at is not None and now >= hedge_at:
+                    # The primary is slower than the usual tail: race a duplicate, first one wins.
+                    hedge_at = None
+                    self.logger.info("Upstream hedge | name=%s | after=%.2fs", self.name, delay)
+                    pending.add(asyncio.ensure_future(timed(deadline - now)))
+        finally:
+            for task in pending:
+                task.cancel()
+        if last_exc is not None:
+            raise last_exc
+        raise UpstreamTimeoutError(f"Upstream '{self.name}' timed out after {budget:.2f}s")
+
+    def call_sync(self, operation: Callable[[float], T]) -> T:
+        """Blocking variant for threadpool callers: deadline, retries and breaker, no hedging."""
+        self._check_breaker()
+        overall = time.monotonic() + self.total_timeout
+        attempt = 0
+        while True:
+            remaining = overall - time.monotonic()
+            if remaining <= 0:
+                raise UpstreamTimeoutError(f"Upstream '{self.name}' exceeded its deadline")
+            started = time.monotonic()
+            try:
+                result = operation(min(self.attempt_timeout, remaining))
+            except Exception as exc:
+                retryable = self._record_outcome(exc)
+                backoff = self._backoff(attempt)
+                if not retryable or attempt >= self.max_retries or time.monotonic() + backoff >= overall:
+                    raise
+                attempt += 1
+                time.sleep(backoff)
+                self._check_breaker()
+                continue
+            self.tracker.record(time.monotonic() - started)
+            self.breaker.record_success()
+            return result
+
+
+# Guards are also created per client-supplied API key, so the least recently used are dropped.
+MAX_GUARDS = 256
+
+_guards: "OrderedDict[str, UpstreamGuard]" = OrderedDict()
+_guards_lock = threading.Lock()
+
+
+def get_upstream_guard(name: str, is_retryable: Callable[[BaseException], bool]) -> UpstreamGuard:
+    """Process-wide guard per upstream (e.g. per model) so breaker state and latency are shared."""
+    with _guards_lock:
+        guard = _guards.get(name)
+        if guard is not None:
+            _guards.move_to_end(name)
+        else:
+            settings = get_settings()
+            guard = UpstreamGuard(
+                name,
+                is_retryable=is_retryable,
+                attempt_timeout=settings.compose_timeout_seconds,
+                total_timeout=settings.compose_total_timeout_seconds,
+                max_retries=settings.compose_max_retries,
+                backoff_base=settings.compose_retry_backoff_seconds,
+                backoff_max=settings.compose_retry_backoff_max_seconds,
+                hedge_enabled=settings.compose_hedge_enabled,
+                hedge_quantile=settings.compose_hedge_quantile,
+                hedge_min_delay=settings.compose_hedge_min_delay_seconds,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.compose_breaker_failure_threshold,
+                    reset_timeout=settings.compose_breaker_reset_seconds,
+                ),
+            )
+            _guards[name] = guard
+            while len(_guards) > MAX_GUARDS:
+                _guards.popitem(last=False)
+        return guard
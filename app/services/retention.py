@@ -0,0 +1,146 @@
+"""Retention: move old translation sessions out of MySQL into gzip NDJSON archive files.
+
+Files are partitioned by the day the session was created::
+
+    <ARCHIVE_DIR>/dt=2025-01-31/sessions-<archived at>-<pid>.ndjson.gz
+
+Each chunk is written and fsynced before its rows are deleted, so a crash can leave a
+duplicate file behind but never loses a session. The translation_session_archive_index table
+points every archived id at its file for the by-id read path.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from app.models.translation_session import TranslationSessionRead
+
+if TYPE_CHECKING:
+    from app.db.repository import SessionArchiveRepository
+
+
+class SessionArchive:
+    """Reads and writes the day-partitioned archive files under one directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+
+    def write_partition(self, day: str, records: Iterable[TranslationSessionRead]) -> str:
+        """Write one file for `day` and return its path relative to the archive directory."""
+        partition = self.directory / f"dt={day}"
+        partition.mkdir(parents=True, exist_ok=True)
+        name = f"sessions-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}.ndjson.gz"
+        final = partition / name
+        temporary = partition / f".{name}.tmp"
+        with temporary.open("wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as handle:
+                for record in records:
+                    handle.write(record.model_dump_json().encode("utf-8") + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+        # Rename after fsync so readers never see a partial file.
+        temporary.rename(final)
+        return str(final.relative_to(self.directory))
+
+    def read(self, relative_path: str, session_id: UUID) -> Optional[TranslationSessionRead]:
+        path = (self.directory / relative_path).resolve()
+        if self.directory.resolve() not in path.parents:
+            raise ValueError("Archive path outside the archive directory")
+        target = f'"id":"{session_id}"'
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                # Cheap substring test first; only the matching line is parsed.
+                if target in line:
+                    record = TranslationSessionRead(**json.loads(line))
+                    if record.id == session_id:
+                        return record
+        return None
+
+
+class SessionArchiver:
+    """Retention job: archives sessions not updated for `retention_days`, one chunk per transaction."""
+
+    def __init__(
+        self,
+        archive: SessionArchive,
+        retention_days: int = 90,
+        chunk_size: int = 500,
+        pause_seconds: float = 0.05,
+        service_factory: Optional[Callable[[], SessionArchiveRepository]] = None,
+    ) -> None:
+        self.archive = archive
+        self.retention_days = retention_days
+        self.chunk_size = max(1, chunk_size)
+        self.pause_seconds = pause_seconds
+        self.service_factory = service_factory or self._default_service
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _default_service() -> SessionArchiveRepository:
+        from app.db import session_archive_repository
+
+        return session_archive_repository()
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        return (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+
+    def run(self, max_chunks: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+        cutoff = self.cutoff()
+        stats = {"chunks": 0, "archived": 0, "skipped": 0, "files": 0}
+        service = self.service_factory()
+        try:
+            if dry_run:
+                stats["archived"] = service.count_expired(cutoff)
+                return stats
+            while max_chunks is None or stats["chunks"] < max_chunks:
+                records = service.fetch_expired(cutoff, self.chunk_size)
+                if not records:
+                    break
+                stats["chunks"] += 1
+
+                by_day: Dict[str, List[TranslationSessionRead]] = defaultdict(list)
+                for record in records:
+                    by_day[record.created_at.strftime("%Y-%m-%d")].append(record)
+                paths: Dict[str, str] = {}
+                for day, day_records in by_day.items():
+                    path = self.archive.write_partition(day, day_records)
+                    stats["files"] += 1
+                    paths.update({str(record.id): path for record in day_records})
+
+                deleted = service.mark_archived(records, paths, cutoff)
+                stats["archived"] += deleted
+                stats["skipped"] += len(records) - deleted
+                self.logger.info(
+                    "Archived chunk | sessions=%d | skipped=%d | days=%s",
+                    deleted,
+                    len(records) - deleted,
+                    ",".join(sorted(by_day)),
+                )
+                if len(records) < self.chunk_size:
+                    break
+                if self.pause_seconds > 0:
+                    # Give the primary (and replication) room between chunks.
+                    time.sleep(self.pause_seconds)
+        finally:
+            service.close_connection()
+        return stats
+
+    def fetch(self, session_id: UUID) -> Optional[TranslationSessionRead]:
+        """Load an archived session by id, or None if it was never archived."""
+        service = self.service_factory()
+        try:
+            path = service.archive_path(session_id)
+        finally:
+            service.close_connection()
+        if path is None:
+            return None
+        return self.archive.read(path, session_id)
@@ -0,0 +1,97 @@
+"""Confidence-gated routing between a fast compose model and a stronger one.
+
+With COMPOSE_STRONG_MODEL set, every compose first goes to the composer's own model (the fast
+tier, OPENAI_MODEL). The result is escalated to the strong model when its confidence is below
+COMPOSE_ESCALATE_BELOW. Confidence comes from token logprobs (see `logprob_confidence`), which are
+only requested from COMPOSE_LOGPROB_MODELS; other completions get `heuristic_confidence`.
+Requests that are long or use classifier glosses skip the fast tier and go straight to the
+strong model. A request that names its own model (`openai_model` or X-OpenAI-Model) is never routed.
+
+Escalation is skipped when less than COMPOSE_ESCALATE_MIN_REMAINING_MS of the deadline is
+left. If the strong model fails, the fast sentence is kept. Each decision is counted in
+compose_route_decisions_total, and each tier's latency in compose_tier_latency_seconds.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import REGISTRY
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+
+ROUTE_DECISIONS = REGISTRY.counter(
+    "compose_route_decisions_total", "Tiered compose routing decisions", ["decision"]
+)
+TIER_LATENCY = REGISTRY.histogram(
+    "compose_tier_latency_seconds", "Compose latency per routing tier", ["tier"]
+)
+
+# Route values reported in ComposeSentenceResponse.route.
+ROUTE_FAST = "fast"
+ROUTE_ESCALATED = "escalated"
+ROUTE_STRONG = "strong"
+# Session tool_metadata key holding the route of the latest compose.
+ROUTE_METADATA_KEY = "compose_route"
+
+# Classifier predicates (CL:3 "vehicle moves", DCL:... shapes) describe spatial scenes that the
+# fast tier tends to flatten.
+CLASSIFIER_PREFIXES = ("CL:", "CL-", "DCL:", "SCL:", "BCL:", "LCL:", "ICL:", "BPCL:", "PCL:")
+# Heuristic confidence of a completion that was cut off (max tokens) or filtered.
+TRUNCATED_CONFIDENCE = 0.3
+
+
+def logprob_confidence(choice: Any) -> Optional[float]:
+    """Geometric-mean token probability of a chat completion choice; None without logprobs."""
+    logprobs = getattr(choice, "logprobs", None)
+    tokens = getattr(logprobs, "content", None) if logprobs is not None else None
+    values = [token.logprob for token in tokens or () if token.logprob is not None]
+    if not values:
+        return None
+    return round(math.exp(sum(values) / len(values)), 4)
+
+
+def heuristic_confidence(choice: Any) -> float:
+    """Confidence of a choice without logprobs: full if the model finished the sentence, low otherwise."""
+    return 1.0 if getattr(choice, "finish_reason", "stop") == "stop" else TRUNCATED_CONFIDENCE
+
+
+class ModelRouter:
+    """Decides which tier composes a request; see the module docstring."""
+
+    def __init__(
+        self,
+        strong_model: str,
+        escalate_below: float = 0.75,
+        max_fast_glosses: int = 12,
+        min_escalation_seconds: float = 0.5,
+    ) -> None:
+        self.strong_model = strong_model
+        self.escalate_below = escalate_below
+        self.max_fast_glosses = max(1, max_fast_glosses)
+        self.min_escalation_seconds = min_escalation_seconds
+
+    @classmethod
+    def from_settings(cls) -> Optional["ModelRouter"]:
+        settings = get_settings()
+        if not settings.compose_strong_model:
+            return None
+        return cls(
+            settings.compose_strong_model,
+            escalate_below=settings.compose_escalate_below,
+            max_fast_glosses=settings.compose_fast_max_glosses,
+            min_escalation_seconds=settings.compose_escalate_min_remaining_ms / 1000,
+        )
+
+    def direct_reason(self, request: ComposeSentenceRequest) -> Optional[str]:
+        """Why the request skips the fast tier ("long" or "complex"), or None."""
+        if len(request.glosses) + len(request.spelled_words or request.letters or []) > self.max_fast_glosses:
+            return "long"
+        if any(gloss.strip().upper().startswith(CLASSIFIER_PREFIXES) for gloss in request.glosses):
+            return "complex"
+        return None
+
+    def should_escalate(self, result: ComposeSentenceResponse) -> bool:
+        # Cached results from before confidences were recorded have none; trust the fast tier.
+        return result.confidence is not None and result.confidence < self.escalate_below
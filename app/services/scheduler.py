@@ -0,0 +1,216 @@
+"""Priority scheduling of upstream compose calls.
+
+Live session subtitles, interactive calls and batch jobs share the OpenAI budget of a worker.
+The scheduler hands out a bounded number of upstream slots:
+
+* strict priority between classes (``live`` > ``interactive`` > ``batch``), so batch work can
+  never delay live captions;
+* start-time fair queuing between flows (sessions/users) inside a class, so one busy session
+  cannot monopolise its class;
+* a token-bucket rate budget per upstream model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+PRIORITIES = ("live", "interactive", "batch")
+DEFAULT_PRIORITY = "interactive"
+
+QUEUE_DEPTH = REGISTRY.gauge("compose_scheduler_queue_depth", "Compose calls waiting for an upstream slot", ["priority"])
+IN_FLIGHT = REGISTRY.gauge("compose_scheduler_in_flight", "Compose calls holding an upstream slot")
+WAIT_SECONDS = REGISTRY.histogram(
+    "compose_scheduler_wait_seconds", "Time spent waiting for an upstream slot", ["priority"]
+)
+RATE_LIMITED = REGISTRY.counter(
+    "compose_scheduler_rate_limited_total", "Dispatches deferred by a model rate budget", ["model"]
+)
+
+
+class SchedulerTimeout(TimeoutError):
+    """The call did not get an upstream slot before its deadline."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+def parse_model_rates(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse ``"gpt-4o-mini=20:40,gpt-4o=5"`` into {model: (requests_per_second, burst)}."""
+    rates: Dict[str, Tuple[float, float]] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, value = entry.partition("=")
+        rate, _, burst = value.partition(":")
+        rates[model.strip()] = (float(rate), float(burst or rate))
+    return rates
+
+
+class _Ticket:
+    __slots__ = ("priority", "flow", "model", "start", "future")
+
+    def __init__(self, priority: str, flow: str, model: str, start: float, future: asyncio.Future) -> None:
+        self.priority = priority
+        self.flow = flow
+        self.model = model
+        self.start = start
+        self.future = future
+
+
+class ComposeScheduler:
+    """Per-worker dispatcher for upstream compose calls; see the module docstring."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        model_rates: Optional[Dict[str, Tuple[float, float]]] = None,
+        default_rate: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.model_rates = model_rates or {}
+        self.default_rate = default_rate
+        self.logger = logging.getLogger(__name__)
+        self._in_flight = 0
+        self._seq = itertools.count()
+        self._queues: Dict[str, List[Tuple[float, int, _Ticket]]] = {priority: [] for priority in PRIORITIES}
+        self._queued: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._virtual_time: Dict[str, float] = {priority: 0.0 for priority in PRIORITIES}
+        self._flow_finish: Dict[Tuple[str, str], float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def queue_depth(self, priority: Optional[str] = None) -> int:
+        if priority is not None:
+            return self._queued[priority]
+        return sum(self._queued.values())
+
+    def _bucket(self, model: str) -> Optional[TokenBucket]:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            rate = self.model_rates.get(model, self.default_rate)
+            if not rate or rate[0] <= 0:
+                return None
+            bucket = self._buckets[model] = TokenBucket(*rate)
+        return bucket
+
+    def _enqueue(self, priority: str, flow: str, model: str, weight: float) -> _Ticket:
+        # Start-time fair queuing: a flow's next request starts where its previous one finished,
+        # or at the class's virtual time if the flow was idle.
+        vtime = self._virtual_time[priority]
+        start = max(vtime, self._flow_finish.get((priority, flow), 0.0))
+        self._flow_finish[(priority, flow)] = start + 1.0 / max(weight, 1e-6)
+        if len(self._flow_finish) > 4096:
+            self._flow_finish = {
+                key: finish for key, finish in self._flow_finish.items() if finish > self._virtual_time[key[0]]
+            }
+
+        ticket = _Ticket(priority, flow, model, start, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queues[priority], (start, next(self._seq), ticket))
+        self._queued[priority] += 1
+        QUEUE_DEPTH.set(self._queued[priority], priority=priority)
+        return ticket
+
+    def _forget(self, ticket: _Ticket) -> None:
+        self._queued[ticket.priority] -= 1
+        QUEUE_DEPTH.set(self._queued[ticket.priority], priority=ticket.priority)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        next_wake: Optional[float] = None
+
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            deferred = []
+            while queue and self._in_flight < self.max_in_flight:
+                entry = heapq.heappop(queue)
+                ticket = entry[2]
+                if ticket.future.done():  # timed out or cancelled while queued
+                    continue
+                bucket = self._bucket(ticket.model)
+                if bucket is not None and not bucket.try_take(now):
+                    # This model is over budget; let other models (even lower classes) through.
+                    RATE_LIMITED.inc(model=ticket.model)
+                    wait = bucket.wait_time(now)
+                    next_wake = wait if next_wake is None else min(next_wake, wait)
+                    deferred.append(entry)
+                    continue
+                self._virtual_time[priority] = ticket.start
+                self._in_flight += 1
+                self._forget(ticket)
+                ticket.future.set_result(None)
+            for entry in deferred:
+                heapq.heappush(queue, entry)
+
+        IN_FLIGHT.set(self._in_flight)
+        if next_wake is not None and self._in_flight < self.max_in_flight:
+            self._timer = asyncio.get_running_loop().call_later(next_wake, self._dispatch)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str,
+        flow: str,
+        model: str,
+        weight: float = 1.0,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block."""
+        if priority not in PRIORITIES:
+            priority = DEFAULT_PRIORITY
+        started = time.monotonic()
+        ticket = self._enqueue(priority, flow, model, weight)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            if not ticket.future.done():
+                ticket.future.cancel()
+                self._forget(ticket)
+                raise SchedulerTimeout(f"No upstream slot for {priority} compose within {timeout:.2f}s")
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self._release()
+            else:
+                ticket.future.cancel()
+                self._forget(ticket)
+            raise
+        WAIT_SECONDS.observe(time.monotonic() - started, priority=priority)
+
+        try:
+            yield
+        finally:
+            self._release()
@@ -0,0 +1,85 @@
+"""Helpers for full-text session search: query terms, page cursors and highlighted snippets."""
+
+from __future__ import annotations
+
+import base64
+import html
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.models.translation_session import TranslationSessionRead
+
+# Fields searched by the FULLTEXT / FTS5 index, in the order snippets are returned.
+SEARCH_FIELDS = ("adjusted_text", "input_text", "context")
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_CHARS = 160
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query: str) -> List[str]:
+    """Lower-cased words of a query, without duplicates, in order."""
+    return list(dict.fromkeys(term.lower() for term in _TERM.findall(query)))
+
+
+def encode_cursor(relevance: float, session_id: str) -> str:
+    raw = json.dumps([relevance, session_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Inverse of encode_cursor; raises ValueError for anything else."""
+    try:
+        relevance, session_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(relevance), str(session_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+def _pattern(terms: List[str], phrase: bool) -> Optional[re.Pattern]:
+    if not terms:
+        return None
+    if phrase:
+        return re.compile(r"\b" + r"\W+".join(re.escape(term) for term in terms) + r"\b", re.IGNORECASE)
+    return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE)
+
+
+def highlight(text: str, pattern: re.Pattern, width: int = SNIPPET_CHARS) -> Optional[str]:
+    """A window of `text` around its first match with every match wrapped in <mark>, HTML-escaped."""
+    first = pattern.search(text)
+    if first is None:
+        return None
+    start = max(0, first.start() - width // 3)
+    end = min(len(text), start + width)
+    # Do not cut words in half at either edge.
+    if start > 0:
+        space = text.find(" ", start, first.start())
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(" ", first.end(), end)
+        end = space if space != -1 else end
+
+    window = text[start:end]
+    parts = []
+    position = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[position:match.start()]))
+        parts.append(HIGHLIGHT_OPEN + html.escape(match.group(0)) + HIGHLIGHT_CLOSE)
+        position = match.end()
+    parts.append(html.escape(window[position:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def snippets(session: TranslationSessionRead, query: str, phrase: bool = False) -> Dict[str, str]:
+    """Highlighted snippet per searched field that contains the query."""
+    pattern = _pattern(search_terms(query), phrase)
+    if pattern is None:
+        return {}
+    found = {}
+    for field in SEARCH_FIELDS:
+        snippet = highlight(getattr(session, field) or "", pattern)
+        if snippet is not None:
+            found[field] = snippet
+    return found
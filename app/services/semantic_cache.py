@@ -0,0 +1,172 @@
+"""Semantic compose cache: reuses sentences composed for similar gloss sequences.
+
+Each request is embedded locally by feature hashing, without a model:
+
+* every gloss (and fingerspelled word) with weight 1, so reordered glosses stay close;
+* every gloss bigram with weight 0.5, so order still counts for something;
+* the words of the last CONTEXT_CHARS of context, scaled to CONTEXT_WEIGHT of the gloss part,
+  so a small context change still hits and an unrelated conversation does not.
+
+Vectors are L2-normalised rows of one preallocated float32 matrix, and a lookup is a single
+matrix-vector product. Only rows for the same model and with exactly the same set of glosses
+and fingerspelled words are candidates. A single gloss can carry the meaning (NOT, YESTERDAY
+for TOMORROW), however long the sequence. Among those rows, the best one is a hit at or above
+`threshold`, so only gloss order and context are fuzzy. With the defaults, "IX-1 WANT COFFEE"
+and "COFFEE IX-1 WANT" score about 0.93, while "IX-1 LIKE IX-2" and "IX-2 LIKE IX-1" score
+about 0.86 and miss.
+
+``python -m benchmarks.semantic_cache`` checks that near-miss sequences never hit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+from .compose_cache import CACHE_LOOKUPS
+
+BIGRAM_WEIGHT = 0.5
+CONTEXT_WEIGHT = 0.35
+CONTEXT_CHARS = 200
+# A new entry this close to an existing one (same model) replaces it instead of taking a row.
+DUPLICATE_SIMILARITY = 0.999
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class SemanticComposeCache:
+    """Capacity-bounded LRU of (embedding, sentence) rows; see the module docstring.
+
+    All state changes happen under one lock and never await, so concurrent tasks (and threads)
+    see consistent rows.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        dimensions: int = 512,
+        threshold: float = 0.92,
+        ttl_seconds: float = 3600.0,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.dimensions = max(16, dimensions)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._vectors = np.zeros((self.capacity, self.dimensions), dtype=np.float32)
+        self._models = np.full(self.capacity, -1, dtype=np.int32)  # -1: free row
+        self._bags = np.zeros(self.capacity, dtype=np.uint64)  # digest of each row's gloss set
+        self._stored = np.zeros(self.capacity, dtype=np.float64)
+        self._used = np.zeros(self.capacity, dtype=np.float64)
+        self._responses: List[Optional[ComposeSentenceResponse]] = [None] * self.capacity
+        self._model_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._models >= 0))
+
+    def _feature(self, vector: np.ndarray, token: str, weight: float) -> None:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        # The sign bit keeps colliding features from always adding up.
+        vector[value % self.dimensions] += weight if value >> 63 else -weight
+
+    @staticmethod
+    def _tokens(request: ComposeSentenceRequest) -> List[str]:
+        tokens = [gloss.strip().upper() for gloss in request.glosses if gloss.strip()]
+        return tokens + [f"#{word.upper()}" for word in (request.spelled_words or request.letters or [])]
+
+    @staticmethod
+    def bag(request: ComposeSentenceRequest) -> int:
+        """Order-insensitive digest of the request's glosses and fingerspelled words."""
+        joined = "\x1f".join(sorted(set(SemanticComposeCache._tokens(request))))
+        return int.from_bytes(hashlib.blake2b(joined.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def embed(self, request: ComposeSentenceRequest) -> np.ndarray:
+        tokens = self._tokens(request)
+        glosses = np.zeros(self.dimensions, dtype=np.float32)
+        for token in tokens:
+            self._feature(glosses, token, 1.0)
+        for first, second in zip(tokens, tokens[1:]):
+            self._feature(glosses, f"{first} {second}", BIGRAM_WEIGHT)
+
+        vector = glosses
+        words = _WORD.findall((request.context or "")[-CONTEXT_CHARS:].lower())
+        if words:
+            context = np.zeros(self.dimensions, dtype=np.float32)
+            for word in words:
+                self._feature(context, f"~{word}", 1.0)
+            context_norm = float(np.linalg.norm(context))
+            if context_norm > 0:
+                vector = glosses + context * (CONTEXT_WEIGHT * float(np.linalg.norm(glosses)) / context_norm)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _best(self, vector: np.ndarray, bag: int, model_id: int, now: float) -> Tuple[int, float]:
+        live = (self._models == model_id) & (self._bags == np.uint64(bag))
+        if self.ttl_seconds > 0:
+            live &= self._stored > now - self.ttl_seconds
+        if not live.any():
+            return -1, 0.0
+        scores = np.where(live, self._vectors @ vector, -1.0)
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+
+    def _free_row(self, now: float) -> int:
+        free = np.flatnonzero(self._models < 0)
+        if free.size:
+            return int(free[0])
+        if self.ttl_seconds > 0:
+            expired = np.flatnonzero(self._stored <= now - self.ttl_seconds)
+            if expired.size:
+                return int(expired[0])
+        return int(np.argmin(self._used))  # least recently used
+
+    def lookup(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]:
+        vector = self.embed(request)
+        bag = self.bag(request)
+        now = time.monotonic()
+        with self._lock:
+            model_id = self._model_ids.get(model)
+            row, score = self._best(vector, bag, model_id, now) if model_id is not None else (-1, 0.0)
+            if row < 0 or score < self.threshold:
+                CACHE_LOOKUPS.inc(layer="semantic", result="miss")
+                return None
+            self._used[row] = now
+            response = self._responses[row]
+        CACHE_LOOKUPS.inc(layer="semantic", result="hit")
+        return response
+
+    def store(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None:
+        vector = self.embed(request)
+        if not vector.any():
+            return
+        bag = self.bag(request)
+        now = time.monotonic()
+        with self._lock:
+            model_id = self._model_ids.setdefault(model, len(self._model_ids))
+            row, score = self._best(vector, bag, model_id, now)
+            if row < 0 or score < DUPLICATE_SIMILARITY:
+                row = self._free_row(now)
+            self._vectors[row] = vector
+            self._bags[row] = bag
+            self._models[row] = model_id
+            self._stored[row] = now
+            self._used[row] = now
+            self._responses[row] = response
+
+    async def get(self, request: ComposeSentenceRequest, model: str) -> Optional[ComposeSentenceResponse]:
+        return self.lookup(request, model)
+
+    async def put(self, request: ComposeSentenceRequest, model: str, response: ComposeSentenceResponse) -> None:
+        self.store(request, model, response)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._models.fill(-1)
+            self._responses = [None] * self.capacity
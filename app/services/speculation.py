@@ -0,0 +1,208 @@
+"""Speculative composition of gloss prefixes while the signer is still signing.
+
+Clients may send partial composes (`partial: true`) carrying the glosses recognized so far. Each
+one starts a background compose of that prefix, and the results are kept in a small per-session
+cache. The final compose then, in order of preference:
+
+* reuses a finished speculation for exactly the same glosses (no upstream call);
+* joins a speculation for exactly the same glosses that is still running;
+* continues from the longest finished prefix: the model gets the draft sentence to extend;
+* falls back to a cold compose.
+
+Speculations are bounded: one runs per session, a newer prefix cancels it, and at most
+`max_in_flight` run per worker. Extra ones are skipped rather than queued. They use the
+scheduler's interactive class, so they never delay live captions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+from .composer import GlossFallbackComposer
+from .deadline import Deadline
+
+if TYPE_CHECKING:
+    from .composer import SentenceComposer
+
+SPECULATIONS = REGISTRY.counter("speculative_compose_total", "Speculative prefix composes by outcome", ["outcome"])
+LOOKUPS = REGISTRY.counter(
+    "speculative_compose_lookups_total", "Final composes by how they used a speculation", ["result"]
+)
+
+# (glosses, letters, context, model) of a compose request.
+SpeculationKey = Tuple[Tuple[str, ...], Tuple[str, ...], str, str]
+
+
+def speculation_key(request: ComposeSentenceRequest, model: str) -> SpeculationKey:
+    return tuple(request.glosses), tuple(request.letters or ()), request.context or "", model
+
+
+class _Speculation:
+    __slots__ = ("key", "task", "created")
+
+    def __init__(self, key: SpeculationKey, task: asyncio.Task, created: float) -> None:
+        self.key = key
+        self.task = task
+        self.created = created
+
+    def result(self) -> Optional[ComposeSentenceResponse]:
+        if not self.task.done() or self.task.cancelled():
+            return None
+        return self.task.result()
+
+
+class SpeculativeComposer:
+    """Per-worker prefix cache and bounded pool of speculative composes; see the module docstring."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        prefixes_per_session: int = 4,
+        max_sessions: int = 1024,
+        ttl_seconds: float = 30.0,
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.prefixes_per_session = max(1, prefixes_per_session)
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        self._sessions: "OrderedDict[str, List[_Speculation]]" = OrderedDict()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _entries(self, session_id: str, now: float) -> List[_Speculation]:
+        entries = self._sessions.get(session_id)
+        if entries is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        live = [entry for entry in entries if entry.created + self.ttl_seconds > now or not entry.task.done()]
+        self._sessions[session_id] = live
+        return live
+
+    def speculate(self, session_id: str, request: ComposeSentenceRequest, composer: SentenceComposer) -> bool:
+        """Start composing a prefix in the background. False when the worker is at capacity."""
+        now = asyncio.get_running_loop().time()
+        key = speculation_key(request, composer.model)
+        entries = self._entries(session_id, now)
+        if any(entry.key == key for entry in entries):
+            return True
+        for entry in entries:
+            # The newer prefix supersedes whatever is still running for this session.
+            if not entry.task.done():
+                entry.task.cancel()
+        entries = [entry for entry in entries if entry.task.done()]
+        if self._in_flight >= self.max_in_flight:
+            SPECULATIONS.inc(outcome="skipped")
+            self._sessions[session_id] = entries
+            return False
+
+        task = asyncio.create_task(self._run(session_id, request, composer), name=f"speculate-{session_id}")
+        # Counted here, not when the task first runs, so a burst of partials cannot overshoot;
+        # the callback also fires for tasks cancelled before they started.
+        self._in_flight += 1
+        task.add_done_callback(self._task_done)
+        entries.append(_Speculation(key, task, now))
+        self._sessions[session_id] = entries[-self.prefixes_per_session:]
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self._cancel(evicted)
+        return True
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._in_flight -= 1
+
+    async def _run(
+        self, session_id: str, request: ComposeSentenceRequest, composer: SentenceComposer
+    ) -> Optional[ComposeSentenceResponse]:
+        try:
+            result = await composer.compose_async(request, priority="interactive", flow=f"session:{session_id}")
+        except asyncio.CancelledError:
+            SPECULATIONS.inc(outcome="cancelled")
+            raise
+        except Exception as exc:
+            SPECULATIONS.inc(outcome="failed")
+            self.logger.debug("Speculative compose failed | session=%s | %s", session_id, exc)
+            return None
+        if result.model == GlossFallbackComposer.MODEL_NAME:
+            # Degraded answer: the final compose should try the model again.
+            SPECULATIONS.inc(outcome="failed")
+            return None
+        SPECULATIONS.inc(outcome="completed")
+        return result
+
+    async def lookup(
+        self,
+        session_id: str,
+        request: ComposeSentenceRequest,
+        model: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[Optional[ComposeSentenceResponse], Optional[Tuple[List[str], str]]]:
+        """For a final compose: (result to reuse, or None) and (draft glosses, draft text) to continue."""
+        key = speculation_key(request, model)
+        entries = self._entries(session_id, asyncio.get_running_loop().time())
+        for entry in entries:
+            if entry.key != key:
+                continue
+            if not entry.task.done():
+                try:
+                    # Shielded: a final compose that gives up must not cancel the shared task.
+                    await asyncio.wait_for(
+                        asyncio.shield(entry.task), timeout=deadline.remaining() if deadline is not None else None
+                    )
+                except asyncio.TimeoutError:
+                    pass  # out of time; the cold path reports the deadline
+                except asyncio.CancelledError:
+                    if not entry.task.cancelled():
+                        raise  # the final compose itself was cancelled
+                result = entry.result()
+                if result is not None:
+                    LOOKUPS.inc(result="joined")
+                    return result, None
+            elif entry.result() is not None:
+                LOOKUPS.inc(result="exact")
+                return entry.result(), None
+
+        glosses, letters, context, _ = key
+        best: Optional[_Speculation] = None
+        for entry in entries:
+            prefix, prefix_letters, prefix_context, prefix_model = entry.key
+            if (
+                entry.result() is not None
+                and (prefix_context, prefix_model) == (context, model)
+                and len(prefix) < len(glosses)
+                and glosses[: len(prefix)] == prefix
+                and letters[: len(prefix_letters)] == prefix_letters
+                and (best is None or len(prefix) > len(best.key[0]))
+            ):
+                best = entry
+        if best is not None:
+            LOOKUPS.inc(result="continued")
+            return None, (list(best.key[0]), best.result().text)
+        LOOKUPS.inc(result="miss")
+        return None, None
+
+    @staticmethod
+    def _cancel(entries: List[_Speculation]) -> None:
+        for entry in entries:
+            if not entry.task.done():
+                entry.task.cancel()
+
+    def discard(self, session_id: str) -> None:
+        """Drop a session's speculations (its context changes once the final compose lands)."""
+        self._cancel(self._sessions.pop(session_id, []))
+
+    async def stop(self) -> None:
+        tasks = [entry.task for entries in self._sessions.values() for entry in entries]
+        for entries in self._sessions.values():
+            self._cancel(entries)
+        self._sessions.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
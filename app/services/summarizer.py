@@ -0,0 +1,260 @@
+"""Incremental, off-request-path summarization of translation sessions.
+
+A session's transcript is its `context`, which grows by one composed sentence per compose. The
+stored `summary_checkpoint` is the length of `context` already folded into the summary, so each
+run only sends the previous summary plus the new tail to the LLM instead of the whole transcript.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from app.core.metrics import REGISTRY
+from app.core.resources import get_resources
+from app.models.translation_session import TranslationSessionRead
+from .resilience import get_upstream_guard
+
+RUNS = REGISTRY.counter("session_summary_runs_total", "Session summarization runs", ["outcome"])
+QUEUE_DEPTH = REGISTRY.gauge("session_summary_queue_depth", "Sessions waiting to be summarized")
+RUN_SECONDS = REGISTRY.histogram("session_summary_run_seconds", "Duration of one summarization run")
+
+
+class SummaryQueueFull(Exception):
+    """Raised when the summarization queue cannot take another session."""
+
+    def __init__(self, retry_after: float = 5.0) -> None:
+        super().__init__("Summarization queue is full")
+        self.retry_after = retry_after
+
+
+class SessionSummarizer:
+    """Folds new transcript text into an existing summary with one LLM call."""
+
+    def __init__(self, model: Optional[str] = None, max_chunk_chars: int = 6000) -> None:
+        self.model = model or os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+        self.max_chunk_chars = max(1, max_chunk_chars)
+        self.logger = logging.getLogger(__name__)
+
+    def pending_text(self, session: TranslationSessionRead) -> tuple[str, int, int]:
+        """Return (new text, checkpoint it starts at, checkpoint after it) for the next run."""
+        context = session.context or ""
+        start = session.summary_checkpoint
+        if start > len(context):
+            # The context was rewritten through PUT; start over from the beginning.
+            start = 0
+        end = len(context)
+        if end - start > self.max_chunk_chars:
+            # Long backlog (e.g. the first run on an old session): take one chunk, cut on a space.
+            end = start + self.max_chunk_chars
+            cut = context.rfind(" ", start, end)
+            if cut > start:
+                end = cut
+        return context[start:end].strip(), start, end
+
+    def _messages(self, session: TranslationSessionRead, new_text: str, fresh: bool) -> List[dict]:
+        parts = [
+            "Update the running summary of an ASL conversation with the new transcript text.",
+            'Reply with a JSON object: {"summary": string, "topics": [string], "action_items": [string]}.',
+            "Keep the summary under 120 words, merge duplicate topics and drop action items that were resolved.",
+        ]
+        if not fresh:
+            parts.append(f"Current summary: {session.summary_text or ''}")
+            parts.append(f"Current topics: {json.dumps(session.summary_topics)}")
+            parts.append(f"Current action items: {json.dumps(session.summary_action_items)}")
+        parts.append(f"New transcript text: {new_text}")
+        return [
+            {"role": "system", "content": "You maintain concise meeting summaries."},
+            {"role": "user", "content": "\n".join(parts)},
+        ]
+
+    async def summarize(self, session: TranslationSessionRead, new_text: str, fresh: bool) -> Dict[str, object]:
+        from .composer import get_openai_clients, is_retryable_openai_error
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is not configured.")
+        _, async_client = get_openai_clients(api_key)
+        guard = get_upstream_guard(f"openai:{self.model}", is_retryable_openai_error)
+        messages = self._messages(session, new_text, fresh)
+
+        completion = await guard.call(
+            lambda timeout: async_client.chat.completions.create(
+                model=self.model,
+                temperature=0.2,
+                messages=messages,
+                response_format={"type": "json_object"},
+                timeout=timeout,
+            )
+        )
+        data = json.loads(completion.choices[0].message.content or "{}")
+        return {
+            "summary": str(data.get("summary") or "").strip(),
+            "topics": [str(topic) for topic in data.get("topics") or []],
+            "action_items": [str(item) for item in data.get("action_items") or []],
+        }
+
+
+class SummaryWorker:
+    """Bounded pool of background tasks that summarize sessions one run at a time.
+
+    Sessions are de-duplicated while queued, and a session is never summarized by two tasks at
+    once: a request that arrives mid-run queues exactly one follow-up run.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[SessionSummarizer] = None,
+        workers: int = 2,
+        queue_size: int = 64,
+        min_new_chars: int = 400,
+    ) -> None:
+        self.summarizer = summarizer or SessionSummarizer()
+        self.workers = max(1, workers)
+        self.min_new_chars = max(0, min_new_chars)
+        self.logger = logging.getLogger(__name__)
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_size = max(1, queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._running: Set[str] = set()
+        self._rerun: Dict[str, asyncio.Future] = {}
+
+    def _service(self):
+        from app.db import translation_session_repository
+
+        return translation_session_repository()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._tasks = [asyncio.create_task(self._run(), name=f"summary-worker-{index}") for index in range(self.workers)]
+
+    async def stop(self, timeout: float) -> None:
+        """Let queued runs finish for up to `timeout` seconds, then cancel the rest."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Summary worker stop timeout | queued=%d", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for future in [*self._queued.values(), *self._rerun.values()]:
+            if not future.done():
+                future.cancel()
+        self._queued.clear()
+        self._rerun.clear()
+
+    def needs_summary(self, session: TranslationSessionRead) -> bool:
+        """Enough new transcript since the checkpoint to be worth an LLM call."""
+        return len(session.context or "") - session.summary_checkpoint >= max(1, self.min_new_chars)
+
+    def schedule(self, session_id: UUID) -> asyncio.Future:
+        """Queue a run for the session; the future resolves with the session after the run."""
+        self.start()
+        key = str(session_id)
+        if key in self._queued:
+            return self._queued[key]
+        if key in self._running:
+            return self._rerun.setdefault(key, asyncio.get_running_loop().create_future())
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            raise SummaryQueueFull() from None
+        self._queued[key] = future
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return future
+
+    def maybe_schedule(self, session: TranslationSessionRead) -> None:
+        """Best-effort trigger used after a compose; never raises."""
+        if not self.needs_summary(session):
+            return
+        try:
+            self.schedule(session.id)
+        except SummaryQueueFull:
+            # The checkpoint is persisted, so the next compose for this session triggers again.
+            RUNS.inc(outcome="dropped")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key = await self._queue.get()
+            QUEUE_DEPTH.set(self._queue.qsize())
+            future = self._queued.pop(key)
+            self._running.add(key)
+            started = loop.time()
+            try:
+                result = await self.summarize_session(UUID(key))
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as exc:
+                RUNS.inc(outcome="error")
+                self.logger.warning("Session summary failed | session=%s | %s", key, exc)
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                RUN_SECONDS.observe(loop.time() - started)
+                self._running.discard(key)
+                self._queue.task_done()
+            rerun = self._rerun.pop(key, None)
+            if rerun is not None:
+                if self._queue.full():
+                    # Not queued this time; the waiter gets the state this run left behind.
+                    rerun.set_result(future.result() if future.done() and future.exception() is None else None)
+                else:
+                    self._queued[key] = rerun
+                    self._queue.put_nowait(key)
+                    QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def summarize_session(self, session_id: UUID) -> Optional[TranslationSessionRead]:
+        """One incremental run: summarize the text after the checkpoint and advance it."""
+        service = self._service()
+        try:
+            session = await asyncio.to_thread(service.get, session_id)
+            if session is None:
+                raise ValueError("TranslationSession not found")
+            new_text, start, end = self.summarizer.pending_text(session)
+            if not new_text:
+                RUNS.inc(outcome="noop")
+                return session
+
+            # Summaries are background work: lowest scheduling class so live captions go first.
+            async with get_resources().scheduler.slot("batch", f"summary:{session_id}", self.summarizer.model):
+                summary = await self.summarizer.summarize(session, new_text, fresh=start == 0)
+
+            saved = await asyncio.to_thread(
+                service.save_summary,
+                session_id,
+                summary["summary"],
+                summary["topics"],
+                summary["action_items"],
+                end,
+                session.summary_checkpoint,
+            )
+            if not saved:
+                # A concurrent run (another worker process) advanced the checkpoint first.
+                RUNS.inc(outcome="conflict")
+                return await asyncio.to_thread(service.get, session_id)
+            RUNS.inc(outcome="ok")
+            self.logger.info("Session summarized | session=%s | checkpoint=%d->%d", session_id, start, end)
+            updated = await asyncio.to_thread(service.get, session_id)
+        finally:
+            service.close_connection()
+
+        if updated is not None and end < len(updated.context or ""):
+            # The backlog was larger than one chunk: keep going in a follow-up run.
+            self._rerun.setdefault(str(session_id), asyncio.get_running_loop().create_future())
+        return updated
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 
-from app.db.translation_session_service import TranslationSessionMySQLService
-from app.models.compose import ComposeSentenceRequest
+from app.core.resources import get_resources
+from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
 from app.models.translation_session import (
     TranslationSessionComposeRequest,
     TranslationSessionRead,
     TranslationSessionUpdate,
 )
+from .admission import AdmissionController, AdmissionRejected
 from .composer import SentenceComposer
+from .deadline import ComposeDeadlineExceeded, Deadline
+from .expression_rules import ExpressionRuleCache
+from .persistence import SessionWriteQueue
+from .phrase_index import PHRASE_HIT_KEY, PHRASE_INDEX_MODEL, PHRASE_VERSION_KEY, PhraseIndex
+from .preferences import PreferredWordsIndex, UserPreferenceStore
+from .routing import ROUTE_METADATA_KEY
+from .speculation import SpeculativeComposer
+from .summarizer import SummaryWorker
+
+if TYPE_CHECKING:
+    from app.db.repository import TranslationSessionRepository
 
 
 class TranslationSessionManager:
@@ -19,22 +33,106 @@ class TranslationSessionManager:
 
     def __init__(
         self,
-        service: TranslationSessionMySQLService,
+        service: TranslationSessionRepository,
         composer: Optional[SentenceComposer] = None,
         api_key: str | None = None,
         model: str | None = None,
+        admission: Optional[AdmissionController] = None,
+        preferences: Optional[UserPreferenceStore] = None,
+        rules: Optional[ExpressionRuleCache] = None,
+        summaries: Optional[SummaryWorker] = None,
+        writes: Optional[SessionWriteQueue] = None,
+        speculation: Optional[SpeculativeComposer] = None,
+        phrase_index: Optional[PhraseIndex] = None,
     ) -> None:
         self.service = service
         self.composer = composer or SentenceComposer(api_key=api_key, model=model)
+        self.admission = admission
+        self.preferences = preferences
+        self.rules = rules
+        self.summaries = summaries
+        self.writes = writes
+        self.speculation = speculation
+        self.phrase_index = phrase_index
+        # Resolves once the last compose's write-behind update is written (None when written in place).
+        self.queued_write: Optional[asyncio.Future] = None
         self.logger = logging.getLogger(__name__)
 
-    async def compose(self, session_id: UUID, payload: TranslationSessionComposeRequest) -> TranslationSessionRead:
+    async def _compose_admitted(
+        self,
+        session: TranslationSessionRead,
+        compose_request: ComposeSentenceRequest,
+        deadline: Optional[Deadline],
+        draft: Optional[Tuple[List[str], str]] = None,
+    ) -> ComposeSentenceResponse:
+        # Session composes are live subtitles: highest scheduling class, fair-queued per session.
+        async def compose() -> ComposeSentenceResponse:
+            return await self.composer.compose_async(
+                compose_request, deadline=deadline, priority="live", flow=f"session:{session.id}", draft=draft
+            )
+
+        if self.admission is None:
+            return await compose()
+
+        keys = [("session", str(session.id))]
+        if session.user_id:
+            keys.append(("user", session.user_id))
+        max_wait = deadline.remaining() if deadline is not None else None
+        try:
+            async with self.admission.admit(keys, max_wait=max_wait):
+                return await compose()
+        except AdmissionRejected:
+            if deadline is not None and deadline.expired():
+                raise ComposeDeadlineExceeded(deadline)
+            raise
+
+    def _load_session(self, session_id: UUID) -> TranslationSessionRead:
         session = self.service.get(session_id)
+        if self.writes is not None:
+            # Composes build on the previous ones, including updates not yet written.
+            session = self.writes.overlay(session)
         if not session:
             raise ValueError("TranslationSession not found")
+        return session
+
+    def _compose_request(
+        self, session: TranslationSessionRead, payload: TranslationSessionComposeRequest
+    ) -> Tuple[ComposeSentenceRequest, PreferredWordsIndex]:
+        if self.preferences is not None:
+            preferred = self.preferences.merged_index(session.user_id, session.preferred_words)
+        else:
+            preferred = PreferredWordsIndex(session.preferred_words)
+        compose_request = ComposeSentenceRequest(
+            glosses=preferred.apply_to_glosses(payload.glosses),
+            letters=payload.letters,
+            # Fingerspelled names are most often the user's own preferred words.
+            spelled_words=get_resources().fingerspelling.resolve(payload.letters, preferred.vocabulary()),
+            context=session.context or "",
+        )
+        return compose_request, preferred
+
+    async def speculate(self, session_id: UUID, payload: TranslationSessionComposeRequest) -> bool:
+        """Compose a gloss prefix in the background; False when speculation is off or saturated."""
+        if self.speculation is None:
+            return False
+        session = self._load_session(session_id)
+        compose_request, _ = self._compose_request(session, payload)
+        return self.speculation.speculate(str(session_id), compose_request, self.composer)
+
+    @staticmethod
+    def _applied(session: TranslationSessionRead, update: TranslationSessionUpdate) -> TranslationSessionRead:
+        return session.model_copy(update={**update.model_dump(exclude_unset=True), "updated_at": datetime.utcnow()})
 
+    async def _compose_update(
+        self,
+        session: TranslationSessionRead,
+        payload: TranslationSessionComposeRequest,
+        deadline: Optional[Deadline] = None,
+    ) -> TranslationSessionUpdate:
+        """Compose `payload` into `session` and return the update to persist."""
+        session_id = session.id
         context = session.context or ""
-        compose_request = ComposeSentenceRequest(glosses=payload.glosses, letters=payload.letters, context=context)
+        compose_request, preferred = self._compose_request(session, payload)
 
         self.logger.info(
             "Compose start | session=%s | glosses=%s | letters=%s | context_len=%d",
@@ -44,13 +142,58 @@ class TranslationSessionManager:
             len(context),
         )
 
-        compose_result = await self.composer.compose_async(compose_request)
+        compose_result = None
+        draft = None
+        # The index answers for whole utterances of plain glosses; letters always go to the model.
+        phrase_hit = (
+            self.phrase_index.lookup(payload.glosses)
+            if self.phrase_index is not None and not payload.letters
+            else None
+        )
+        if phrase_hit is not None:
+            compose_result = ComposeSentenceResponse(
+                text=phrase_hit.text, confidence=phrase_hit.confidence, model=PHRASE_INDEX_MODEL
+            )
+        if self.speculation is not None:
+            if compose_result is None:
+                compose_result, draft = await self.speculation.lookup(
+                    str(session_id), compose_request, self.composer.model, deadline
+                )
+            # Every remaining speculation was made against the context this compose replaces.
+            self.speculation.discard(str(session_id))
+        if compose_result is None:
+            compose_result = await self._compose_admitted(session, compose_request, deadline, draft)
+        if deadline is not None and deadline.expired():
+            # A late subtitle is useless to the viewer; don't persist it into the session either.
+            self.logger.info("Compose past deadline, skipping persistence | session=%s", session_id)
+            raise ComposeDeadlineExceeded(deadline)
+        if preferred:
+            compose_result = compose_result.model_copy(
+                update={"text": preferred.apply_to_text(compose_result.text, payload.glosses)}
+            )
 
         updated_glosses = list(session.glosses) + payload.glosses
         existing_letters = session.letters or []
         new_letters = existing_letters + (payload.letters or [])
         updated_context = f"{context} {compose_result.text}".strip() if context else compose_result.text
         confidence = compose_result.confidence if compose_result.confidence is not None else 1.0
+        # tool_metadata describes the latest compose: drop a previous utterance's hit and route.
+        tool_metadata = {
+            key: value
+            for key, value in session.tool_metadata.items()
+            if key not in (PHRASE_HIT_KEY, PHRASE_VERSION_KEY, ROUTE_METADATA_KEY)
+        }
+        if phrase_hit is not None:
+            tool_metadata[PHRASE_HIT_KEY] = phrase_hit.path
+            tool_metadata[PHRASE_VERSION_KEY] = self.phrase_index.version
+        if compose_result.route is not None:
+            tool_metadata[ROUTE_METADATA_KEY] = compose_result.route
+        tts_metadata = session.tts_metadata
+        if self.rules is not None:
+            # The expression rule for the session's emotion and intent sets the voice of the new sentence.
+            rule = await self.rules.lookup_async(session.detected_emotion, session.detected_intent, confidence)
+            if rule is not None and tts_metadata.get("tone") != rule.tts_tone:
+                tts_metadata = {**tts_metadata, "tone": rule.tts_tone}
 
         update_payload = TranslationSessionUpdate(
             glosses=updated_glosses,
@@ -60,10 +203,112 @@ class TranslationSessionManager:
             adjusted_text=compose_result.text,
             compose_confidence=confidence,
         )
+        if tool_metadata != session.tool_metadata:
+            update_payload.tool_metadata = tool_metadata
+        if tts_metadata != session.tts_metadata:
+            update_payload.tts_metadata = tts_metadata
+        return update_payload
 
-        updated_session = self.service.update(session_id, update_payload)
-        if not updated_session:
-            raise ValueError("TranslationSession not found after compose")
+    async def compose(
+        self,
+        session_id: UUID,
+        payload: TranslationSessionComposeRequest,
+        deadline: Optional[Deadline] = None,
+    ) -> TranslationSessionRead:
+        session = self._load_session(session_id)
+        update_payload = await self._compose_update(session, payload, deadline)
 
-        self.logger.info("Compose complete | session=%s | text=%s", session_id, compose_result.text)
+        if self.writes is not None:
+            # Write-behind: the subtitle goes out now, MySQL catches up in order per session.
+            self.queued_write = await self.writes.submit(session_id, update_payload)
+            updated_session = self._applied(session, update_payload)
+        else:
+            updated_session = self.service.update(session_id, update_payload)
+            if not updated_session:
+                raise ValueError("TranslationSession not found after compose")
+
+        if self.summaries is not None:
+            self.summaries.maybe_schedule(updated_session)
+
+        self.logger.info("Compose complete | session=%s | text=%s", session_id, update_payload.adjusted_text)
         return updated_session
+
+    async def compose_many(
+        self,
+        items: Sequence[Tuple[UUID, TranslationSessionComposeRequest]],
+        deadline: Optional[Deadline] = None,
+        concurrency: int = 16,
+    ) -> List[Union[TranslationSessionRead, Exception]]:
+        """Compose several sessions at once; one result (session or exception) per item, in order.
+
+        Sessions are loaded with one query and written with one transaction (or handed to the
+        write-behind queue). Items for the same session run in order, each building on the
+        previous one; up to `concurrency` sessions compose at the same time.
+        """
+        results: List[Union[TranslationSessionRead, Exception, None]] = [None] * len(items)
+        by_session: Dict[UUID, List[int]] = {}
+        for index, (session_id, _) in enumerate(items):
+            by_session.setdefault(session_id, []).append(index)
+        sessions = self.service.get_many(list(by_session))
+        updates: Dict[UUID, TranslationSessionUpdate] = {}
+        composed: Dict[UUID, TranslationSessionRead] = {}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def compose_session(session_id: UUID, indexes: List[int]) -> None:
+            session = sessions.get(str(session_id))
+            if self.writes is not None:
+                session = self.writes.overlay(session)
+            if session is None:
+                for index in indexes:
+                    results[index] = ValueError("TranslationSession not found")
+                return
+            async with semaphore:
+                for index in indexes:
+                    try:
+                        update = await self._compose_update(session, items[index][1], deadline)
+                    except Exception as exc:
+                        # Later items of this session build on its last successful compose.
+                        results[index] = exc
+                        continue
+                    session = self._applied(session, update)
+                    results[index] = session
+                    previous = updates.get(session_id)
+                    if previous is not None:
+                        update = previous.model_copy(update=update.model_dump(exclude_unset=True))
+                    updates[session_id] = update
+                    composed[session_id] = session
+
+        await asyncio.gather(*(compose_session(session_id, indexes) for session_id, indexes in by_session.items()))
+
+        failures: Dict[UUID, Exception] = {}
+        if self.writes is not None:
+            for session_id, update in updates.items():
+                try:
+                    await self.writes.submit(session_id, update)
+                except Exception as exc:
+                    failures[session_id] = exc
+        elif updates:
+            try:
+                written = set(self.service.update_many(list(updates.items())))
+            except Exception as exc:
+                written = set()
+                failures = dict.fromkeys(updates, exc)
+            missing = ValueError("TranslationSession not found after compose")
+            for session_id in updates:
+                if str(session_id) not in written:
+                    failures.setdefault(session_id, missing)
+        for session_id in updates:
+            if session_id in failures:
+                for index in by_session[session_id]:
+                    if not isinstance(results[index], Exception):
+                        results[index] = failures[session_id]
+            elif self.summaries is not None:
+                self.summaries.maybe_schedule(composed[session_id])
+
+        self.logger.info(
+            "Batch compose complete | items=%d | sessions=%d | failed=%d",
+            len(items),
+            len(by_session),
+            sum(isinstance(result, Exception) for result in results),
+        )
+        return results
@@ -0,0 +1,111 @@
+"""Cold-start benchmark: import time of app.main and latency of the first requests.
+
+Every sample runs in a fresh interpreter so nothing is shared between runs. Budgets are
+optional; when given, the script exits non-zero if the median exceeds them, which lets CI
+track regressions.
+
+    python -m benchmarks.cold_start --runs 5 --import-budget-ms 700 --first-request-budget-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executed in a child interpreter. Prints one JSON line with the timings in milliseconds.
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+heavy = sorted(name for name in ("openai", "mysql.connector", "uvicorn") if name in sys.modules)
+
+from fastapi.testclient import TestClient
+
+result = {"import_ms": (imported - started) * 1000, "heavy_modules": heavy}
+t0 = time.perf_counter()
+with TestClient(app.main.app) as client:
+    result["lifespan_ms"] = (time.perf_counter() - t0) * 1000
+    for label, path in (("root", "/"), ("openapi", "/openapi.json")):
+        t0 = time.perf_counter()
+        response = client.get(path)
+        result[f"first_{label}_ms"] = (time.perf_counter() - t0) * 1000
+        result[f"first_{label}_status"] = response.status_code
+    t0 = time.perf_counter()
+    client.get("/")
+    result["warm_root_ms"] = (time.perf_counter() - t0) * 1000
+result["total_ms"] = (time.perf_counter() - started) * 1000
+print(json.dumps(result))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure ASL Agent cold-start latency.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--import-budget-ms", type=float, default=None, help="Fail if median import time exceeds this")
+    parser.add_argument(
+        "--first-request-budget-ms", type=float, default=None, help="Fail if median first request latency exceeds this"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the aggregated result as JSON")
+    return parser.parse_args()
+
+
+def sample() -> dict:
+    env = dict(os.environ)
+    # Measure the service itself: no background pre-warm competing with the first request.
+    env.setdefault("PREWARM_MODE", "off")
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    args = parse_args()
+    samples = [sample() for _ in range(max(1, args.runs))]
+
+    metrics = [key for key in samples[0] if key.endswith("_ms")]
+    summary = {
+        key: {
+            "median": statistics.median(s[key] for s in samples),
+            "min": min(s[key] for s in samples),
+            "max": max(s[key] for s in samples),
+        }
+        for key in metrics
+    }
+    summary["heavy_modules_at_import"] = samples[0]["heavy_modules"]
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"runs={len(samples)}")
+        for key in metrics:
+            stats = summary[key]
+            print(f"{key:<18} median={stats['median']:8.1f}  min={stats['min']:8.1f}  max={stats['max']:8.1f}")
+        print(f"heavy modules imported eagerly: {', '.join(summary['heavy_modules_at_import']) or 'none'}")
+
+    failed = False
+    if args.import_budget_ms is not None and summary["import_ms"]["median"] > args.import_budget_ms:
+        print(f"FAIL import_ms median exceeds budget of {args.import_budget_ms} ms")
+        failed = True
+    if args.first_request_budget_ms is not None and summary["first_root_ms"]["median"] > args.first_request_budget_ms:
+        print(f"FAIL first_root_ms median exceeds budget of {args.first_request_budget_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
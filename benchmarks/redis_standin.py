@@ -0,0 +1,143 @@
+"""In-memory stand-in for a Redis server, for trying the shared compose cache locally.
+
+Speaks enough RESP2 for app.services.redis_cache (PING, AUTH, SELECT, GET, MGET, SET with
+EX/PX, DEL, DBSIZE, FLUSHDB). It is not a Redis replacement. `--latency-ms` delays every
+round trip to show what batching saves:
+
+    python -m benchmarks.redis_standin --port 6399 --latency-ms 1
+    COMPOSE_CACHE_REDIS_URL=redis://127.0.0.1:6399/0 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RedisStandIn:
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.round_trips = 0
+        self.commands = 0
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0]
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _run(self, command: List[bytes]) -> bytes:
+        self.commands += 1
+        name = command[0].upper()
+        arguments = command[1:]
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name in (b"AUTH", b"SELECT", b"FLUSHDB"):
+            if name == b"FLUSHDB":
+                self.data.clear()
+            return b"+OK\r\n"
+        if name == b"GET":
+            return self._bulk(self._get(arguments[0]))
+        if name == b"MGET":
+            return b"*%d\r\n" % len(arguments) + b"".join(self._bulk(self._get(key)) for key in arguments)
+        if name == b"SET":
+            expires = None
+            options = [option.upper() for option in arguments[2:]]
+            for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                if unit in options:
+                    expires = time.monotonic() + int(arguments[2 + options.index(unit) + 1]) * scale
+            self.data[arguments[0]] = (arguments[1], expires)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in arguments)
+        if name == b"DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    @staticmethod
+    def _parse(buffer: bytearray) -> Optional[List[bytes]]:
+        """Pop one complete command off `buffer`, or None if it is not all there yet."""
+        end = buffer.find(b"\r\n")
+        if end < 0:
+            return None
+        if not buffer.startswith(b"*"):
+            command = bytes(buffer[:end]).split()  # inline command, e.g. from telnet
+            del buffer[: end + 2]
+            return command
+        position = end + 2
+        command = []
+        for _ in range(int(buffer[1:end])):
+            line_end = buffer.find(b"\r\n", position)
+            if line_end < 0:
+                return None
+            length = int(buffer[position + 1 : line_end])
+            start = line_end + 2
+            if len(buffer) < start + length + 2:
+                return None
+            command.append(bytes(buffer[start : start + length]))
+            position = start + length + 2
+        del buffer[:position]
+        return command
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                # Every command that arrived together is one pipelined round trip.
+                replies = []
+                while True:
+                    command = self._parse(buffer)
+                    if command is None:
+                        break
+                    replies.append(self._run(command))
+                if not replies:
+                    continue
+                self.round_trips += 1
+                if self.latency_seconds:
+                    await asyncio.sleep(self.latency_seconds)
+                writer.write(b"".join(replies))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Listen in the running loop; port 0 picks a free one (see server.sockets)."""
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run an in-memory Redis stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every round trip")
+    return parser.parse_args()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = await RedisStandIn(args.latency_ms / 1000).start(args.host, args.port)
+    print(f"Redis stand-in listening on {args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,132 @@
+"""Semantic compose cache check: hits for paraphrases, never for a changed meaning.
+
+Fills a cache with utterances of several lengths (up to 19 glosses). It then looks up two kinds
+of variant of each:
+
+* paraphrases, which should hit: the glosses reordered, or the context drifted;
+* near misses, which must not: NOT inserted, a time or content gloss substituted, a gloss added
+  or dropped, a different fingerspelled name.
+
+Prints the hit rate of each variant kind and the lookup time. Exits non-zero if any near miss
+hits, so CI can run it. Needs no server:
+
+    python -m benchmarks.semantic_cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+UTTERANCES = [
+    (["IX-1", "WANT", "COFFEE"], None),
+    (["TOMORROW", "IX-1", "GO", "STORE", "BUY", "MILK"], None),
+    (["IX-1", "NAME"], ["J", "O", "H", "N"]),
+    (
+        [
+            "TOMORROW", "MORNING", "IX-1", "GO", "STORE", "BUY", "MILK", "BREAD", "EGG",
+            "THEN", "DRIVE", "HOME", "COOK", "BREAKFAST", "FAMILY", "EAT", "TOGETHER", "FINISH", "HAPPY",
+        ],
+        None,
+    ),
+]
+CONTEXT = "We were planning the weekend and talking about errands."
+SUBSTITUTES = {"TOMORROW": "YESTERDAY", "WANT": "DON'T-WANT", "COFFEE": "TEA", "MILK": "JUICE", "NAME": "AGE"}
+
+Variant = Tuple[List[str], object, str]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check semantic cache hits and near misses.")
+    parser.add_argument("--entries", type=int, default=2000, help="Unrelated entries to fill the cache with")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    return parser.parse_args()
+
+
+def paraphrases(glosses: List[str], letters) -> List[Variant]:
+    rotated = glosses[1:] + glosses[:1]
+    return [
+        (rotated, letters, CONTEXT),
+        (glosses, letters, CONTEXT + " Also the car needs gas."),
+    ]
+
+
+def near_misses(glosses: List[str], letters) -> List[Variant]:
+    variants: List[Variant] = [
+        (["NOT"] + glosses, letters, CONTEXT),
+        (glosses + ["AGAIN"], letters, CONTEXT),
+        (glosses[:-1], letters, CONTEXT),
+    ]
+    for index, gloss in enumerate(glosses):
+        if gloss in SUBSTITUTES:
+            variants.append((glosses[:index] + [SUBSTITUTES[gloss]] + glosses[index + 1:], letters, CONTEXT))
+    if letters:
+        variants.append((glosses, ["J", "O", "A", "N"], CONTEXT))
+    return variants
+
+
+def timed(samples: List[float], operation: Callable[[], object]) -> object:
+    started = time.perf_counter()
+    result = operation()
+    samples.append((time.perf_counter() - started) * 1e6)
+    return result
+
+
+def run(entries: int) -> Dict[str, object]:
+    from app.models.compose import ComposeSentenceRequest, ComposeSentenceResponse
+    from app.services.semantic_cache import SemanticComposeCache
+
+    def request(glosses: List[str], letters, context: str) -> ComposeSentenceRequest:
+        return ComposeSentenceRequest(glosses=glosses, letters=letters, context=context)
+
+    cache = SemanticComposeCache(capacity=entries + len(UTTERANCES))
+    for index in range(entries):
+        filler = request([f"SIGN-{index}", f"SIGN-{index % 97}", "FINISH"], None, CONTEXT)
+        cache.store(filler, "model", ComposeSentenceResponse(text=f"filler {index}", model="model"))
+    for glosses, letters in UTTERANCES:
+        response = ComposeSentenceResponse(text=" ".join(glosses), model="model")
+        cache.store(request(glosses, letters, CONTEXT), "model", response)
+
+    lookup_us: List[float] = []
+    counts = {"paraphrase": [0, 0], "near_miss": [0, 0]}
+    false_hits: List[str] = []
+    for glosses, letters in UTTERANCES:
+        kinds = (("paraphrase", paraphrases(glosses, letters)), ("near_miss", near_misses(glosses, letters)))
+        for kind, variants in kinds:
+            for variant in variants:
+                hit = timed(lookup_us, lambda: cache.lookup(request(*variant), "model"))
+                counts[kind][1] += 1
+                if hit is not None:
+                    counts[kind][0] += 1
+                    if kind == "near_miss":
+                        false_hits.append(f"{' '.join(variant[0])} -> {hit.text!r}")
+    return {
+        "paraphrase_hit_rate": counts["paraphrase"][0] / counts["paraphrase"][1],
+        "near_miss_hit_rate": counts["near_miss"][0] / counts["near_miss"][1],
+        "lookup_us_median": statistics.median(lookup_us),
+        "false_hits": false_hits,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    summary = run(max(0, args.entries))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"entries={args.entries}")
+        print(f"paraphrase hit rate  {summary['paraphrase_hit_rate']:6.2f}")
+        print(f"near-miss hit rate   {summary['near_miss_hit_rate']:6.2f}")
+        print(f"lookup median        {summary['lookup_us_median']:6.1f} us")
+    for false_hit in summary["false_hits"]:
+        print(f"FAIL near miss hit: {false_hit}")
+    return 1 if summary["false_hits"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Session store benchmark: per-operation latency of the translation session repository.
+
+Runs against the backend selected by DB_BACKEND. With the default `--backend sqlite` it uses a
+throwaway database file, so it needs no server and is what CI runs:
+
+    python -m benchmarks.session_store --sessions 500
+    DB_HOST=... python -m benchmarks.session_store --backend mysql --sessions 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+PAYLOAD = {
+    "glosses": ["HELLO", "MY", "NAME", "J-O-H-N"],
+    "letters": ["J", "O", "H", "N"],
+    "compose_confidence": 0.92,
+    "input_text": "HELLO MY NAME J-O-H-N",
+    "detected_emotion": "happy",
+    "detected_intent": "greeting",
+    "adjusted_text": "Hello, my name is John!",
+    "tts_metadata": {"tone": "bright", "pitch": "mid", "audio_base64": "UklGR" * 400},
+    "context": "Hello, my name is John!",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure translation session store latency.")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--sessions", type=int, default=500, help="Sessions to create, read and update")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    return parser.parse_args()
+
+
+def timed(samples: List[float], operation: Callable[[], object]) -> object:
+    started = time.perf_counter()
+    result = operation()
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(sessions: int) -> Dict[str, Dict[str, float]]:
+    from app.db import close_backend, prepare_backend, translation_session_repository
+    from app.models.translation_session import TranslationSessionCreate, TranslationSessionUpdate
+
+    if not prepare_backend():
+        raise RuntimeError("Database backend is not reachable.")
+    timings: Dict[str, List[float]] = {"create": [], "get": [], "get_artifacts": [], "update": [], "list": []}
+    service = translation_session_repository()
+    created = []
+    try:
+        for _ in range(sessions):
+            created.append(timed(timings["create"], lambda: service.create(TranslationSessionCreate(**PAYLOAD))).id)
+        for session_id in created:
+            timed(timings["get"], lambda: service.get(session_id))
+            timed(timings["get_artifacts"], lambda: service.get_artifacts(session_id))
+            timed(
+                timings["update"],
+                lambda: service.update(session_id, TranslationSessionUpdate(adjusted_text="Hello, I'm John.")),
+            )
+        for _ in range(max(1, sessions // 50)):
+            timed(timings["list"], lambda: service.list(detected_emotion="happy"))
+        for session_id in created:
+            service.delete(session_id)
+    finally:
+        service.close_connection()
+        close_backend()
+
+    return {
+        name: {
+            "median": statistics.median(samples),
+            "p95": percentile(samples, 0.95),
+            "ops_per_s": len(samples) / (sum(samples) / 1000),
+        }
+        for name, samples in timings.items()
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    os.environ["DB_BACKEND"] = args.backend
+    with tempfile.TemporaryDirectory() as directory:
+        if args.backend == "sqlite":
+            os.environ["SQLITE_PATH"] = os.path.join(directory, "bench.db")
+        summary = run(max(1, args.sessions))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"backend={args.backend} sessions={args.sessions}")
+        for name, stats in summary.items():
+            print(f"{name:<14} median={stats['median']:7.3f} ms  p95={stats['p95']:7.3f} ms  {stats['ops_per_s']:9.0f} ops/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
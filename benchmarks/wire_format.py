@@ -0,0 +1,126 @@
+"""Wire format benchmark: payload size and encode/decode time of JSON vs MessagePack.
+
+Measures the payloads of the recognizer hot path the way the API produces and a client consumes
+them: the compose request body, the full session response, the `view=minimal` response and a
+20-item batch compose response. Encoding is timed the way app.api.wire does it; decoding is a
+client parsing the bytes back into plain objects. Needs no server or database:
+
+    python -m benchmarks.wire_format --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+from uuid import uuid4
+
+import msgpack
+
+SESSION = {
+    "glosses": ["IX-1", "WANT", "GO", "STORE", "TOMORROW", "MORNING"],
+    "letters": [],
+    "compose_confidence": 0.91,
+    "compose_alternatives": ["I want to go to the store tomorrow morning.", "Tomorrow morning I'll go to the store."],
+    "input_text": "IX-1 WANT GO STORE TOMORROW MORNING",
+    "detected_emotion": "neutral",
+    "detected_intent": "statement",
+    "adjusted_text": "I want to go to the store tomorrow morning.",
+    "tts_metadata": {"voice": "en-female-1", "tone": "neutral", "pitch": "medium", "rate": 1.0},
+    "context": "Planning errands for the week. I want to go to the store tomorrow morning.",
+    "preferred_words": {"store": "shop"},
+    "tool_metadata": {"compose_route": "fast", "model": "gpt-4o-mini"},
+}
+COMPOSE_REQUEST = {"glosses": ["IX-1", "WANT", "GO", "STORE", "TOMORROW", "MORNING"], "letters": None}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare JSON and MessagePack on the compose hot path.")
+    parser.add_argument("--iterations", type=int, default=20000, help="Encode/decode runs per payload and format")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    return parser.parse_args()
+
+
+def per_call_us(iterations: int, operation: Callable[[], object]) -> float:
+    """Median per-call time in microseconds over five rounds."""
+    rounds = []
+    batch = max(1, iterations // 5)
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(batch):
+            operation()
+        rounds.append((time.perf_counter() - started) * 1e6 / batch)
+    return statistics.median(rounds)
+
+
+def payloads() -> Dict[str, Any]:
+    from app.models.translation_session import (
+        TranslationSessionBatchComposeResponse,
+        TranslationSessionBatchComposeResult,
+        TranslationSessionComposeRequest,
+        TranslationSessionMinimal,
+        TranslationSessionRead,
+    )
+
+    now = datetime.utcnow()
+    session = TranslationSessionRead(id=uuid4(), created_at=now, updated_at=now, **SESSION)
+    batch = TranslationSessionBatchComposeResponse(
+        results=[
+            TranslationSessionBatchComposeResult(session_id=uuid4(), status=200, session=session) for _ in range(20)
+        ]
+    )
+    return {
+        "compose_request": TranslationSessionComposeRequest(**COMPOSE_REQUEST),
+        "session_full": session,
+        "session_minimal": TranslationSessionMinimal.from_session(session),
+        "batch_20": batch,
+    }
+
+
+def run(iterations: int) -> Dict[str, Dict[str, float]]:
+    summary: Dict[str, Dict[str, float]] = {}
+    for name, model in payloads().items():
+        encoded_json = model.model_dump_json().encode()
+        encoded_msgpack = msgpack.packb(model.model_dump(mode="json"))
+        # Large payloads get fewer runs so every row finishes in comparable wall time.
+        runs = max(50, iterations * 512 // max(512, len(encoded_json)))
+        summary[name] = {
+            "json_bytes": len(encoded_json),
+            "msgpack_bytes": len(encoded_msgpack),
+            "size_ratio": len(encoded_msgpack) / len(encoded_json),
+            "json_encode_us": per_call_us(runs, model.model_dump_json),
+            "msgpack_encode_us": per_call_us(runs, lambda: msgpack.packb(model.model_dump(mode="json"))),
+            "json_decode_us": per_call_us(runs, lambda: json.loads(encoded_json)),
+            "msgpack_decode_us": per_call_us(runs, lambda: msgpack.unpackb(encoded_msgpack)),
+        }
+    return summary
+
+
+def main() -> int:
+    args = parse_args()
+    summary = run(max(5, args.iterations))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"iterations={args.iterations}")
+        print(
+            f"{'payload':<16} {'json B':>8} {'msgpack B':>9} {'ratio':>6}  "
+            f"{'encode us json/msgpack':>22}  {'decode us json/msgpack':>22}"
+        )
+        for name, stats in summary.items():
+            encode = f"{stats['json_encode_us']:.2f}/{stats['msgpack_encode_us']:.2f}"
+            decode = f"{stats['json_decode_us']:.2f}/{stats['msgpack_decode_us']:.2f}"
+            print(
+                f"{name:<16} {stats['json_bytes']:>8} {stats['msgpack_bytes']:>9} {stats['size_ratio']:>6.2f}  "
+                f"{encode:>22}  {decode:>22}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())